@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+
+REPOSITORY_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_PATH = os.path.join(REPOSITORY_FOLDER, "Finance Manager.py")
+
+IMPORT_SNIPPET = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "import finance_manager.cli\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+FIRST_PROMPT = b"Enter your choice (0-2): "
+
+
+# Function to run a command in an empty working folder with the repository importable
+def run_in_empty_folder(arguments, working_folder, **options):
+    environment = dict(os.environ, PYTHONPATH=REPOSITORY_FOLDER)
+    return subprocess.Popen(arguments, cwd=working_folder, env=environment, **options)
+
+
+# Function to time 'import finance_manager.cli' in a fresh interpreter, in milliseconds
+def measure_import(working_folder):
+    process = run_in_empty_folder([sys.executable, "-c", IMPORT_SNIPPET], working_folder, stdout=subprocess.PIPE)
+    output, _ = process.communicate()
+    return float(output) * 1000
+
+
+# Function to time from starting the program to the first menu prompt, in milliseconds
+def measure_first_prompt(working_folder):
+    start = time.perf_counter()
+    process = run_in_empty_folder(
+        [sys.executable, SCRIPT_PATH], working_folder, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    )
+
+    output = b""
+    while not output.endswith(FIRST_PROMPT):
+        chunk = os.read(process.stdout.fileno(), 4096)
+        if not chunk:
+            raise RuntimeError(f"The program exited before showing the first prompt: {output!r}")
+        output += chunk
+
+    elapsed = (time.perf_counter() - start) * 1000
+
+    process.communicate(b"0\n")
+    return elapsed
+
+
+# Function to run both measurements several times and check them against the budgets
+def run_startup_benchmark(runs, import_budget, prompt_budget):
+    with tempfile.TemporaryDirectory() as working_folder:
+        import_times = [measure_import(working_folder) for _ in range(runs)]
+
+        # Importing the package must not create the data folder, only using storage does
+        touched_disk = os.listdir(working_folder)
+
+        prompt_times = [measure_first_prompt(working_folder) for _ in range(runs)]
+
+    results = {
+        "runs": runs,
+        "import_ms": statistics.median(import_times),
+        "first_prompt_ms": statistics.median(prompt_times),
+        "import_budget_ms": import_budget,
+        "first_prompt_budget_ms": prompt_budget,
+        "import_created_files": touched_disk
+    }
+    results["within_budget"] = (
+        results["import_ms"] <= import_budget
+        and results["first_prompt_ms"] <= prompt_budget
+        and not touched_disk
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and time to the first prompt against a budget.")
+    parser.add_argument("--runs", type=int, default=5, help="number of runs, the median is reported")
+    parser.add_argument("--import-budget-ms", type=float, default=150, help="maximum median import time")
+    parser.add_argument("--prompt-budget-ms", type=float, default=400, help="maximum median time to the first prompt")
+    parser.add_argument("--output", default=None, help="also write the results to this JSON file")
+    arguments = parser.parse_args()
+
+    results = run_startup_benchmark(arguments.runs, arguments.import_budget_ms, arguments.prompt_budget_ms)
+
+    print(f"Import time:        {results['import_ms']:8.1f} ms (budget {arguments.import_budget_ms:.0f} ms)")
+    print(f"First prompt:       {results['first_prompt_ms']:8.1f} ms (budget {arguments.prompt_budget_ms:.0f} ms)")
+    if results["import_created_files"]:
+        print(f"Importing created files: {', '.join(results['import_created_files'])}")
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if not results["within_budget"]:
+        print("Start-up is over budget.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
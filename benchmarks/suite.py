@@ -0,0 +1,232 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+
+REPOSITORY_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_FOLDER)
+
+# Ledgers are opened and closed many times, so don't start their background save timers
+os.environ.setdefault("FINANCE_MANAGER_FLUSH_SECONDS", "0")
+
+from finance_manager import ledger, storage
+from finance_manager.menus import initialize_financial_data
+from finance_manager.reports import TextReportSink, generate_full_report
+from finance_manager.storage import configure_storage, find_user_password, read_from_file, write_to_file
+from finance_manager.tax import calculate_income_batch
+
+
+DEFAULT_SIZES = [10, 1000, 100000]
+
+
+# ------------------ Synthetic data ------------------ #
+
+# Function to make a section of 'count' named amounts, the same for the same seed
+def make_section(count, seed=0, prefix="Item"):
+    generator = random.Random(seed)
+    return {f"{prefix} {index}": f"{generator.uniform(1, 50000):.2f}" for index in range(count)}
+
+
+# Function to make the arrays calculate_income_batch works on for 'count' employees
+def make_timesheets(count, seed=0):
+    generator = random.Random(seed)
+    hourly_rates = [generator.uniform(50, 2000) for _ in range(count)]
+    worked = [generator.randint(0, 200) for _ in range(count)]
+    double_worked = [generator.randint(0, 20) for _ in range(count)]
+    return hourly_rates, worked, double_worked
+
+
+# Function to fill every ledger file of a user with 'count' entries
+def make_user(user_name, count):
+    user_folder = storage.create_user_folder(user_name)
+    storage.get_storage().create_user_files([user_name])
+
+    for seed, file_name in enumerate(storage.LEDGER_FILES):
+        if file_name == "income.txt":
+            data = dict(ledger.DEFAULT_INCOME_DATA, income=35000, Income_TAX=5000, Income_Less_Tax=30000, TOTAl_NET_INCOME=29650)
+        elif file_name == "investment_calculator.txt":
+            data = {}
+        else:
+            data = make_section(count, seed)
+        write_to_file(user_folder, file_name, data)
+
+
+# ------------------ Timing ------------------ #
+
+# Function to switch the program to an empty data folder and a new storage engine
+def use_empty_folder(working_folder, engine):
+    os.chdir(working_folder)
+    storage.data_folder_ready = False
+    storage.created_user_folders.clear()
+    configure_storage(engine)
+
+
+# Function to run 'function' several times and return the median and fastest time in milliseconds
+def time_call(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(times), "min_ms": min(times), "runs": repeat}
+
+
+# ------------------ Benchmarks ------------------ #
+
+# Function to time reading and writing one file of every size
+def benchmark_storage(results, engine, sizes, repeat):
+    for size in sizes:
+        data = make_section(size)
+        user_folder = storage.create_user_folder("reader")
+        write_to_file(user_folder, "expenses_other.txt", data)
+
+        results[f"{engine}.read_from_file.{size}"] = time_call(
+            lambda: read_from_file("reader", "expenses_other.txt"), repeat
+        )
+
+        # Write a whole new file, then the usual save of a file with one changed value
+        file_names = iter(f"write_{size}_{run}.txt" for run in range(repeat))
+        results[f"{engine}.write_to_file.new.{size}"] = time_call(
+            lambda: write_to_file(user_folder, next(file_names), data), repeat
+        )
+
+        changes = iter(range(repeat))
+        results[f"{engine}.write_to_file.one_change.{size}"] = time_call(
+            lambda: write_to_file(user_folder, "expenses_other.txt", dict(data, **{"Item 0": f"{next(changes)}.00"})),
+            repeat
+        )
+
+
+# Function to time the income calculations for every size of payroll
+def benchmark_income(results, sizes, repeat):
+    for size in sizes:
+        hourly_rates, worked, double_worked = make_timesheets(size)
+        timing = time_call(lambda: calculate_income_batch(hourly_rates, worked, double_worked), repeat)
+        timing["rows_per_second"] = size / (timing["median_ms"] / 1000) if timing["median_ms"] else None
+        results[f"income.calculate_income_batch.{size}"] = timing
+
+
+# Function to time loading a users ledger when they log in, and rendering their full report
+def benchmark_session(results, engine, sizes, repeat):
+    for size in sizes:
+        user_name = f"user_{size}"
+        make_user(user_name, size)
+
+        def load_ledger():
+            ledger.close_user_ledger(user_name)
+            initialize_financial_data(user_name)
+
+        results[f"{engine}.initialize_financial_data.{size}"] = time_call(load_ledger, repeat)
+
+        # Rendering does not depend on the storage engine, so it is only timed once
+        if f"report.generate_full_report.{size}" in results:
+            ledger.close_user_ledger(user_name)
+            continue
+
+        debits, other_expenses, credits, investments, income_data = initialize_financial_data(user_name)
+        results[f"report.generate_full_report.{size}"] = time_call(
+            lambda: generate_full_report(income_data, debits, other_expenses, credits, investments, TextReportSink(io.StringIO())),
+            repeat
+        )
+        ledger.close_user_ledger(user_name)
+
+
+# Function to time finding passwords in a credential store of every size
+def benchmark_login(results, engine, sizes, repeat):
+    for size in sizes:
+        storage.get_storage().add_users([(f"login_{size}_{index}", f"password{index}") for index in range(size)])
+
+        usernames = [f"login_{size}_{index}" for index in random.Random(size).sample(range(size), min(size, 1000))]
+        timing = time_call(lambda: [find_user_password(username) for username in usernames], repeat)
+        timing["lookups"] = len(usernames)
+        results[f"{engine}.find_user_password.{size}"] = timing
+
+        # A new storage engine has to open the index (or database) again, as when the program starts
+        results[f"{engine}.first_login.{size}"] = time_call(
+            lambda: (configure_storage(engine), find_user_password(usernames[0])), repeat
+        )
+
+
+# Function to run every benchmark in a temporary data folder
+def run_suite(engines, sizes, repeat):
+    results = {}
+    start_folder = os.getcwd()
+
+    try:
+        benchmark_income(results, sizes, repeat)
+
+        for engine in engines:
+            with tempfile.TemporaryDirectory() as working_folder:
+                use_empty_folder(working_folder, engine)
+                benchmark_storage(results, engine, sizes, repeat)
+                benchmark_session(results, engine, sizes, repeat)
+                benchmark_login(results, engine, sizes, repeat)
+                os.chdir(start_folder)
+    finally:
+        os.chdir(start_folder)
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sizes": sizes,
+        "results": results
+    }
+
+
+# Function to list the benchmarks whose median got slower than 'threshold' times the baseline
+def find_regressions(baseline, current, threshold):
+    regressions = []
+    for name, timing in current["results"].items():
+        old_timing = baseline["results"].get(name)
+        if old_timing and old_timing["median_ms"] > 0 and timing["median_ms"] > old_timing["median_ms"] * threshold:
+            regressions.append((name, old_timing["median_ms"], timing["median_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark storage, income calculations, report rendering and logins on synthetic data.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma separated entry counts to run each benchmark with (e.g. 10,1000,100000,1000000)")
+    parser.add_argument("--storage", choices=["text", "sqlite", "both"], default="both", help="storage engines to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each benchmark, the median is reported")
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="JSON results of an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="flag a benchmark when its median is this many times the earlier run (default: 1.25)")
+    arguments = parser.parse_args()
+
+    sizes = [int(size) for size in arguments.sizes.split(",")]
+    engines = ["text", "sqlite"] if arguments.storage == "both" else [arguments.storage]
+    current = run_suite(engines, sizes, arguments.repeat)
+
+    for name, timing in current["results"].items():
+        print(f"{name:<50} {timing['median_ms']:12.3f} ms (min {timing['min_ms']:.3f} ms)")
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(current, file, indent=2)
+        print(f"\nResults written to {arguments.output}.")
+
+    if arguments.compare:
+        with open(arguments.compare, "r") as file:
+            baseline = json.load(file)
+
+        regressions = find_regressions(baseline, current, arguments.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than {arguments.threshold}x {arguments.compare}:")
+            for name, old_median, new_median in regressions:
+                print(f"  {name}: {old_median:.3f} ms -> {new_median:.3f} ms")
+            sys.exit(1)
+
+        print(f"\nNo regressions against {arguments.compare}.")
+
+
+if __name__ == "__main__":
+    main()
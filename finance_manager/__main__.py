@@ -0,0 +1,4 @@
+from finance_manager.cli import main
+
+
+main()
@@ -0,0 +1,182 @@
+import numpy as np
+
+
+# ------------------ Credit amortization ------------------ #
+
+# Payments of a schedule built at a time when going through it (see iterate_schedule_blocks)
+SCHEDULE_BLOCK_SIZE = 120
+
+# Payments a year of each payment frequency
+PAYMENT_FREQUENCIES = {
+    "weekly": 52,
+    "fortnightly": 26,
+    "monthly": 12,
+    "quarterly": 4,
+    "yearly": 1
+}
+
+
+# Function to read a 'principal|rate|term|frequency' value (raises ValueError if it isn't one)
+# Returns the principal (R), yearly interest rate (%), term (months) and frequency
+def parse_credit_terms(value):
+    principal, rate, term, frequency = str(value).split("|")
+    principal, rate, term, frequency = float(principal), float(rate), int(term), frequency.strip().lower()
+
+    if principal < 0 or rate < 0 or term <= 0 or frequency not in PAYMENT_FREQUENCIES:
+        raise ValueError(f"invalid credit terms '{value}'")
+    return principal, rate, term, frequency
+
+
+# Function to write credit terms as a 'principal|rate|term|frequency' value
+def format_credit_terms(principal, rate, term, frequency):
+    return f"{principal:.2f}|{rate:g}|{int(term)}|{frequency}"
+
+
+# Function to get the number of payments of a term in months at each frequency
+def get_payment_counts(terms, periods_per_year):
+    return np.maximum(np.rint(np.asarray(terms) * np.asarray(periods_per_year) / 12), 1).astype(np.int64)
+
+
+# Function to work out the fixed payment of many loans at once
+# Rates are yearly in percent, loans without interest are paid off in equal parts
+def get_payments(principals, rates, payment_counts, periods_per_year):
+    principals = np.asarray(principals, dtype=np.float64)
+    period_rates = np.asarray(rates, dtype=np.float64) / 100 / np.asarray(periods_per_year)
+    payment_counts = np.asarray(payment_counts)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payments = principals * period_rates / (1 - (1 + period_rates) ** -payment_counts)
+    return np.where(period_rates == 0, principals / payment_counts, payments)
+
+
+# Function to work out the balance left after 'paid' payments: B = P(1 + r)^k - A((1 + r)^k - 1) / r
+def get_balances(principals, period_rates, payments, paid):
+    period_rates = np.asarray(period_rates, dtype=np.float64)
+    growth = (1 + period_rates) ** paid
+    with np.errstate(divide="ignore", invalid="ignore"):
+        balances = principals * growth - payments * (growth - 1) / period_rates
+    balances = np.where(period_rates == 0, principals - payments * paid, balances)
+    return np.maximum(balances, 0)
+
+
+# Function to build the payment schedules of many loans at once, one row per loan and one column per payment
+# Only payments 'first' to 'last' are built when given (e.g. a page of a long schedule), every payment is worked out
+# from the loan on its own so no earlier part of the schedule is needed
+# Returns the payment, interest, principal repaid and balance arrays (rands), zero after a loan is paid off
+def build_schedules(principals, rates, terms, frequencies, first=1, last=None):
+    principals = np.asarray(principals, dtype=np.float64)[:, None]
+    periods_per_year = np.array([PAYMENT_FREQUENCIES[frequency] for frequency in frequencies])
+    payment_counts = get_payment_counts(terms, periods_per_year)
+    payments = get_payments(principals[:, 0], rates, payment_counts, periods_per_year)[:, None]
+    period_rates = (np.asarray(rates, dtype=np.float64) / 100 / periods_per_year)[:, None]
+
+    last = payment_counts.max() if last is None else last
+    paid = np.arange(first, last + 1)[None, :]
+    active = paid <= payment_counts[:, None]
+
+    balances = get_balances(principals, period_rates, payments, paid)
+    opening = get_balances(principals, period_rates, payments, paid - 1)
+
+    interest = np.where(active, opening * period_rates, 0)
+    repaid = np.where(active, opening - balances, 0)
+
+    # The last payment clears what is left, rounding on the way means it can differ a little from the others
+    balances = np.where(paid >= payment_counts[:, None], 0, balances)
+    last_payment = paid == payment_counts[:, None]
+    repaid = np.where(last_payment, opening, repaid)
+
+    return np.round(interest + repaid, 2), np.round(interest, 2), np.round(repaid, 2), np.round(balances, 2)
+
+
+# Function to go through the schedule of one loan a block of payments at a time, so a long schedule is never built whole
+# Yields (first payment number, payment, interest, principal repaid and balance arrays) for each block
+def iterate_schedule_blocks(principal, rate, term, frequency, block_size=SCHEDULE_BLOCK_SIZE):
+    payment_count = int(get_payment_counts(term, PAYMENT_FREQUENCIES[frequency]))
+
+    for first in range(1, payment_count + 1, block_size):
+        last = min(first + block_size - 1, payment_count)
+        payments, interest, repaid, balances = build_schedules([principal], [rate], [term], [frequency], first, last)
+        yield first, payments[0], interest[0], repaid[0], balances[0]
+
+
+# Function to go through the schedule of one loan a payment at a time, without building the whole schedule
+# Yields (payment number, payment, interest, principal repaid, balance after the payment) in rands
+def iterate_schedule(principal, rate, term, frequency):
+    for first, payments, interest, repaid, balances in iterate_schedule_blocks(principal, rate, term, frequency):
+        for offset, row in enumerate(zip(payments.tolist(), interest.tolist(), repaid.tolist(), balances.tolist())):
+            yield (first + offset, *row)
+
+
+# Function to get the credits that have terms: their names and principals, rates, terms and frequencies
+# Only credits still in 'credits' count, terms of removed credits are ignored
+def get_credit_terms(credits, terms_data):
+    names, principals, rates, terms, frequencies = [], [], [], [], []
+
+    for name in credits:
+        try:
+            principal, rate, term, frequency = parse_credit_terms(terms_data[name])
+        except (KeyError, ValueError):
+            continue
+        names.append(name)
+        principals.append(principal)
+        rates.append(rate)
+        terms.append(term)
+        frequencies.append(frequency)
+
+    return names, principals, rates, terms, frequencies
+
+
+# Function to work out each credits repayment per month (in cents), e.g. a weekly payment times 52 / 12
+def get_monthly_repayments(credits, terms_data):
+    names, principals, rates, terms, frequencies = get_credit_terms(credits, terms_data)
+    if not names:
+        return {}
+
+    periods_per_year = np.array([PAYMENT_FREQUENCIES[frequency] for frequency in frequencies])
+    payments = get_payments(principals, rates, get_payment_counts(terms, periods_per_year), periods_per_year)
+    monthly = np.rint(payments * periods_per_year / 12 * 100).astype(np.int64)
+    return dict(zip(names, monthly.tolist()))
+
+
+# Function to build the credit terms report model: each credits payment, cost of interest and monthly repayment
+# The interest paid over a loan is all its payments less what was borrowed, so no schedule has to be built
+def build_credit_terms_report(credits, terms_data):
+    names, principals, rates, terms, frequencies = get_credit_terms(credits, terms_data)
+    report = {"report": "credit_terms", "credits": []}
+
+    if names:
+        periods_per_year = np.array([PAYMENT_FREQUENCIES[frequency] for frequency in frequencies])
+        payment_counts = get_payment_counts(terms, periods_per_year)
+        payments = get_payments(principals, rates, payment_counts, periods_per_year)
+        interest = payments * payment_counts - np.asarray(principals, dtype=np.float64)
+        monthly = get_monthly_repayments(credits, terms_data)
+
+        for index, name in enumerate(names):
+            report["credits"].append({
+                "name": name,
+                "value": principals[index],
+                "rate": rates[index],
+                "term": terms[index],
+                "frequency": frequencies[index],
+                "payment": round(float(payments[index]), 2),
+                "payments": int(payment_counts[index]),
+                "total_interest": round(float(interest[index]), 2),
+                "monthly_repayment": monthly[name] / 100
+            })
+
+    report["total_monthly_repayments"] = sum(item["monthly_repayment"] for item in report["credits"])
+    return report
+
+
+# Function to go through the schedule of one credit a page of payments at a time, as schedule report models
+# Each page is built at once (see build_schedules), later pages only when they are asked for
+def iterate_schedule_pages(name, principal, rate, term, frequency, page_size=24):
+    payment_count = int(get_payment_counts(term, PAYMENT_FREQUENCIES[frequency]))
+
+    for first, payments, interest, repaid, balances in iterate_schedule_blocks(principal, rate, term, frequency, page_size):
+        rows = [
+            {"name": str(first + offset), "value": payment, "interest": interest_paid, "principal": principal_repaid, "balance": balance}
+            for offset, (payment, interest_paid, principal_repaid, balance)
+            in enumerate(zip(payments.tolist(), interest.tolist(), repaid.tolist(), balances.tolist()))
+        ]
+        yield {"report": "schedule", "credit": name, "payments": payment_count, "rows": rows}
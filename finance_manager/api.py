@@ -0,0 +1,178 @@
+import os
+import json
+import hashlib
+import threading
+import collections
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from finance_manager.ledger import DEFAULT_INCOME_DATA
+from finance_manager.money import MoneySection, parse_ledger_section
+from finance_manager.reports import (
+    build_credit_report,
+    build_expense_report,
+    build_full_report,
+    build_income_report_from_data,
+    build_investment_calculator_report,
+    build_investment_report,
+    build_transactions_report,
+    build_user_net_position_report
+)
+from finance_manager.storage import find_user_password, get_storage, read_from_file
+from finance_manager.transactions import get_current_month, read_rollups
+
+
+# ------------------ JSON API ------------------ #
+
+# Address the API listens on, only this computer by default as there is no login
+API_HOST = os.environ.get("FINANCE_MANAGER_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("FINANCE_MANAGER_API_PORT", 8765))
+
+# Most rendered responses kept, the least recently used are dropped first
+MAX_CACHED_RESPONSES = int(os.environ.get("FINANCE_MANAGER_API_CACHE_SIZE", 1024))
+
+# Rendered responses: (user name, endpoint, month) -> (fingerprint of the users files, ETag, body), oldest use first
+response_cache = collections.OrderedDict()
+response_cache_lock = threading.Lock()
+
+
+# Function to read a money section of a user
+def read_money_section(user_name, file_name):
+    return MoneySection(read_from_file(user_name, file_name))
+
+
+# Function to read the income data of a user
+def read_income_data(user_name):
+    return parse_ledger_section("income.txt", read_from_file(user_name, "income.txt") or DEFAULT_INCOME_DATA)
+
+
+# Function to build the full report and remaining balance of a user
+def build_user_full_report(user_name):
+    reports = build_full_report(
+        read_income_data(user_name),
+        read_money_section(user_name, "expenses_debits.txt"),
+        read_money_section(user_name, "expenses_other.txt"),
+        read_money_section(user_name, "credits.txt"),
+        read_money_section(user_name, "investments.txt")
+    )
+    reports.append(build_user_net_position_report(user_name))
+    return reports
+
+
+# Endpoint name -> function building its report model from a user name
+API_ENDPOINTS = {
+    "income": lambda user_name: build_income_report_from_data(read_income_data(user_name)),
+    "expenses": lambda user_name: build_expense_report(
+        read_money_section(user_name, "expenses_debits.txt"), read_money_section(user_name, "expenses_other.txt")
+    ),
+    "credits": lambda user_name: build_credit_report(read_money_section(user_name, "credits.txt")),
+    "investments": lambda user_name: build_investment_report(read_money_section(user_name, "investments.txt")),
+    "investment-calculator": lambda user_name: build_investment_calculator_report(
+        read_from_file(user_name, "investment_calculator.txt")
+    ),
+    "net-position": build_user_net_position_report,
+    "transactions": lambda user_name: build_transactions_report(read_rollups(user_name), get_current_month()),
+    "report": build_user_full_report
+}
+
+# Endpoints whose response also depends on the current month, so it is rendered again when the month changes
+MONTHLY_ENDPOINTS = {"transactions"}
+
+
+# Function to get the ETag and JSON body of an endpoint, rendered again only when the users files changed
+# Returns None if the user is not registered
+def get_response(user_name, endpoint):
+    fingerprint = get_storage().get_fingerprint(user_name)
+    month = get_current_month() if endpoint in MONTHLY_ENDPOINTS else None
+    cache_key = (user_name, endpoint, month)
+
+    with response_cache_lock:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            response_cache.move_to_end(cache_key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1], cached[2]
+
+    if cached is None and find_user_password(user_name) is None:
+        return None
+
+    try:
+        body = (json.dumps(API_ENDPOINTS[endpoint](user_name), indent=2) + "\n").encode()
+    finally:
+        # The API keeps no sessions, so the files it read aren't tracked (memory doesn't grow with the number of users)
+        get_storage().forget_user(user_name)
+    etag = '"' + hashlib.sha1(f"{user_name}\0{endpoint}\0{month}\0{fingerprint}".encode()).hexdigest()[:24] + '"'
+
+    with response_cache_lock:
+        response_cache[cache_key] = (fingerprint, etag, body)
+        response_cache.move_to_end(cache_key)
+        while len(response_cache) > MAX_CACHED_RESPONSES:
+            response_cache.popitem(last=False)
+    return etag, body
+
+
+# Class handling the requests: GET /users/<user>/<endpoint>
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections open, dashboards poll the same endpoints again and again
+    disable_nagle_algorithm = True  # Headers and body are separate writes, don't hold the body back
+
+    def do_GET(self):
+        parts = urllib.parse.urlsplit(self.path).path.strip("/").split("/")
+
+        if len(parts) != 3 or parts[0] != "users" or parts[2] not in API_ENDPOINTS:
+            self.send_json(404, {"error": "Not found. Use /users/<user>/<endpoint>.", "endpoints": sorted(API_ENDPOINTS)})
+            return
+
+        user_name = urllib.parse.unquote(parts[1])
+        response = get_response(user_name, parts[2])
+
+        if response is None:
+            self.send_json(404, {"error": f"Unknown user '{user_name}'."})
+            return
+
+        etag, body = response
+
+        # The client already has this version of the response
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Function to send an error as JSON
+    def send_json(self, status, document):
+        body = (json.dumps(document) + "\n").encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Requests aren't logged, hundreds of polls a second would flood the console
+    def log_message(self, format, *arguments):
+        pass
+
+
+# Function to run the JSON API until it is stopped (Ctrl+C)
+def run_api(host=API_HOST, port=API_PORT):
+    get_storage()
+    server = ThreadingHTTPServer((host, port), ApiRequestHandler)
+    server.daemon_threads = True
+    print(f"Serving the JSON API on http://{host}:{port}/users/<user>/<endpoint> ({', '.join(sorted(API_ENDPOINTS))}).")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print("JSON API stopped.")
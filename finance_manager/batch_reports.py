@@ -0,0 +1,94 @@
+import os
+import json
+import concurrent.futures
+
+from finance_manager.ledger import DEFAULT_INCOME_DATA
+from finance_manager.money import MoneySection, parse_ledger_section
+from finance_manager.reports import REPORT_SINKS, build_full_report, build_net_position_report
+from finance_manager.storage import CREDIT_TERMS_FILE_NAME, configure_storage, get_storage, read_from_file
+
+
+# ------------------ Batch reports ------------------ #
+
+# Folder the reports command writes each users full report to
+REPORTS_FOLDER = os.path.join("data", "Reports")
+
+
+# Function to render the full report and remaining balance of a user to a sink
+def write_user_report(user_name, sink):
+
+    debits = MoneySection(read_from_file(user_name, "expenses_debits.txt"))
+    other_expenses = MoneySection(read_from_file(user_name, "expenses_other.txt"))
+    credits = MoneySection(read_from_file(user_name, "credits.txt"))
+    investments = MoneySection(read_from_file(user_name, "investments.txt"))
+    income_data = parse_ledger_section("income.txt", read_from_file(user_name, "income.txt") or DEFAULT_INCOME_DATA)
+
+    reports = build_full_report(income_data, debits, other_expenses, credits, investments)
+    credit_terms = read_from_file(user_name, CREDIT_TERMS_FILE_NAME)
+    reports.append(build_net_position_report(income_data, debits, other_expenses, credits, investments, credit_terms))
+    sink.write(reports, title=f"Full report for {user_name}")
+
+    # The users files aren't needed again, so the storage doesn't keep them for every user of the run
+    get_storage().forget_user(user_name)
+
+
+# Function to render the report of a user to '<output folder>/<user>.<format>'
+def render_user_report(user_name, output_folder, report_format="text"):
+    extension = "txt" if report_format == "text" else report_format
+
+    with open(os.path.join(output_folder, f"{user_name}.{extension}"), "w", buffering=1024 * 1024) as file:
+        write_user_report(user_name, REPORT_SINKS[report_format](file))
+
+    return user_name
+
+
+# Function to read which fingerprint each user had when their report was last rendered
+def read_reports_manifest(output_folder):
+    manifest_path = os.path.join(output_folder, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r") as file:
+        return json.load(file)
+
+
+# Function to save the reports manifest
+def write_reports_manifest(output_folder, manifest):
+    manifest_path = os.path.join(output_folder, "manifest.json")
+    with open(manifest_path + ".tmp", "w") as file:
+        json.dump(manifest, file)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+# Function to render the full report of every user whose files changed since the last run, using a process pool
+def generate_all_reports(output_folder=REPORTS_FOLDER, workers=None, force=False, report_format="text"):
+    os.makedirs(output_folder, exist_ok=True)
+
+    storage = get_storage()
+    previous_manifest = read_reports_manifest(output_folder)
+    manifest = {}
+    changed_users = []
+
+    for user_name in storage.list_users():
+        fingerprint = storage.get_fingerprint(user_name)
+        manifest[user_name] = f"{report_format}:{fingerprint}"
+
+        extension = "txt" if report_format == "text" else report_format
+        report_exists = os.path.exists(os.path.join(output_folder, f"{user_name}.{extension}"))
+        if force or not report_exists or previous_manifest.get(user_name) != f"{report_format}:{fingerprint}":
+            changed_users.append(user_name)
+
+    workers = workers or os.cpu_count() or 1
+
+    if changed_users:
+        if workers == 1:
+            for user_name in changed_users:
+                render_user_report(user_name, output_folder, report_format)
+        else:
+            chunk_size = max(1, len(changed_users) // (workers * 4))
+            with concurrent.futures.ProcessPoolExecutor(workers, initializer=configure_storage, initargs=(storage.name,)) as pool:
+                for _ in pool.map(render_user_report, changed_users, [output_folder] * len(changed_users),
+                                  [report_format] * len(changed_users), chunksize=chunk_size):
+                    pass
+
+    write_reports_manifest(output_folder, manifest)
+    print(f"Rendered {len(changed_users)} of {len(manifest)} reports into {output_folder} ({len(manifest) - len(changed_users)} unchanged).")
@@ -0,0 +1,184 @@
+import re
+import bisect
+
+from finance_manager.metrics import timed
+from finance_manager.money import to_cents
+from finance_manager.storage import get_storage, read_from_file
+from finance_manager.transactions import UNCATEGORIZED
+
+
+# ------------------ Categorization rules ------------------ #
+
+# Each users category rules, as 'rule,category' in the order they were added (see parse_category_rule)
+CATEGORY_RULES_FILE_NAME = "category_rules.txt"
+
+# Types of rule: text in the description, a regular expression, the payee, or a range of amounts
+CATEGORY_RULE_TYPES = ("text", "regex", "payee", "amount")
+
+# A numbered backreference such as '\1' in a regex rule (but not an escaped backslash followed by a digit)
+BACKREFERENCE = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]")
+
+
+# Function to read a rule such as 'woolworths', 'regex:^uber( eats)?', 'payee:Netflix' or 'amount:0-50'
+# Rules without a type are text rules. Returns the type and its value: the text, the compiled expression,
+# the payee or the lowest and highest amount in cents (None for no limit). Raises ValueError for a rule that isn't one
+def parse_category_rule(rule):
+    rule_type, separator, value = str(rule).partition(":")
+    rule_type = rule_type.strip().lower()
+    if not separator or rule_type not in CATEGORY_RULE_TYPES:
+        rule_type, value = "text", str(rule)
+
+    value = value.strip()
+    if not value:
+        raise ValueError(f"empty {rule_type} rule")
+
+    if rule_type == "regex":
+        try:
+            # Compiled in a group, the way it is joined to the other rules
+            pattern = re.compile(f"(?:{value})", re.IGNORECASE)
+        except re.error as error:
+            raise ValueError(f"invalid regular expression '{value}': {error}")
+
+        # Rules are told apart by their own named groups
+        if pattern.groupindex:
+            raise ValueError(f"named groups can't be used in rules ('{value}')")
+        return rule_type, pattern
+
+    if rule_type == "amount":
+        low, separator, high = value.partition("-")
+        low = to_cents(low) if low.strip() else None
+        high = to_cents(high) if high.strip() else None
+        if not separator or (low is None and high is None) or (low is not None and high is not None and low > high):
+            raise ValueError(f"invalid amount range '{value}', use 'low-high' (either can be left out)")
+        return rule_type, (low, high)
+
+    return rule_type, value
+
+
+# Function to build one regular expression that finds any of 'texts' ((text, group name) pairs) in a single pass
+# The texts are put in a trie, e.g. 'uber|uber eats|woolworths' becomes 'uber(?: eats(?P<b>)|(?P<a>))|woolworths(?P<c>)',
+# so at each place in a description only one branch per letter is followed, however many texts there are
+# The empty named group at the end of a text tells which one was found, a longer text wins over one it starts with
+def build_trie_pattern(texts):
+    trie = {}
+    for text, group_name in texts:
+        node = trie
+        for character in text:
+            node = node.setdefault(character, {})
+        node.setdefault("", group_name)
+
+    def build(node):
+        branches = [re.escape(character) + build(child) for character, child in sorted(node.items()) if character]
+        if "" in node:
+            branches.append(f"(?P<{node['']}>)")
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return build(trie)
+
+
+# Class to match transactions against a users category rules, compiled so each transaction is checked in one pass
+# All payee rules, all text rules and all regex rules are each joined into one regular expression with a named group
+# per rule, so a description is searched once however many rules there are. Payees and texts are built as tries
+# (see build_trie_pattern), regex rules have to be tried one after the other at each place, so they cost more
+# Regex rules with numbered backreferences are searched on their own, joining them would renumber their groups
+# Amount ranges are split into bands that don't overlap, each with the category of the first rule that covers it,
+# and found with a binary search
+class CategoryMatcher:
+
+    def __init__(self, rules):
+        payees, texts, regexes = [], [], []
+        self.group_categories = {}
+        self.separate_patterns = []
+        amount_rules = []
+
+        # Rules that can't be read (e.g. edited by hand) are left out
+        for rule, category in rules.items():
+            try:
+                rule_type, value = parse_category_rule(rule)
+            except ValueError:
+                continue
+
+            if rule_type == "amount":
+                amount_rules.append((value, category))
+                continue
+
+            group_name = f"rule_{len(self.group_categories)}"
+            self.group_categories[group_name] = category
+
+            if rule_type == "payee":
+                payees.append((value.lower(), group_name))
+            elif rule_type == "text":
+                texts.append((value.lower(), group_name))
+            elif BACKREFERENCE.search(value.pattern):
+                self.separate_patterns.append((value, category))
+            else:
+                regexes.append((value, group_name))
+
+        # Descriptions are matched in lower case. The payee is the start of a description, up to ' - ' and the memo
+        self.payee_pattern = re.compile(f"{build_trie_pattern(payees)}(?= - |$)") if payees else None
+        self.text_pattern = re.compile(build_trie_pattern(texts)) if texts else None
+        self.regex_pattern = None
+        if regexes:
+            try:
+                self.regex_pattern = re.compile("|".join(f"(?P<{group_name}>(?i:{value.pattern}))" for value, group_name in regexes))
+            except re.error:
+                # Rules that only work alone are all searched on their own
+                self.separate_patterns = [(value, self.group_categories[group_name]) for value, group_name in regexes] + self.separate_patterns
+
+        # Every place a range starts or stops starts a band
+        starts = sorted({low or 0 for (low, high), category in amount_rules}
+                        | {high + 1 for (low, high), category in amount_rules if high is not None})
+        self.band_starts = starts
+        self.band_categories = [
+            next((category for (low, high), category in amount_rules
+                  if (low is None or low <= start) and (high is None or start <= high)), None)
+            for start in starts
+        ]
+
+    # Function to get the category of a description and amount (in cents), None if no rule matches
+    # The rule found first in the description wins. Of rules found at the same place, a payee rule wins, then the
+    # longest text, then the regex rule added first. Amount rules are only used when no other rule matches
+    def categorize(self, description, cents):
+        description = description.lower()
+
+        if self.payee_pattern is not None:
+            match = self.payee_pattern.match(description)
+            if match is not None:
+                return self.group_categories[match.lastgroup]
+
+        # The place and category of the first rule found so far
+        found = None
+
+        for pattern in (self.text_pattern, self.regex_pattern):
+            match = pattern.search(description) if pattern is not None else None
+            if match is not None and (found is None or match.start() < found[0]):
+                found = (match.start(), self.group_categories[match.lastgroup])
+
+        for pattern, category in self.separate_patterns:
+            match = pattern.search(description)
+            if match is not None and (found is None or match.start() < found[0]):
+                found = (match.start(), category)
+
+        if found is not None:
+            return found[1]
+
+        index = bisect.bisect_right(self.band_starts, abs(cents)) - 1
+        return self.band_categories[index] if index >= 0 else None
+
+
+# Function to compile a users category rules, read from their file unless 'rules' is given
+def read_category_matcher(user_name, rules=None):
+    return CategoryMatcher(read_from_file(user_name, CATEGORY_RULES_FILE_NAME) if rules is None else rules)
+
+
+# Function to give a users uncategorized transactions the category of the rule they match
+# Returns the number of transactions that got a category
+@timed("categories.categorize_uncategorized")
+def categorize_uncategorized(user_name, rules=None):
+    matcher = read_category_matcher(user_name, rules)
+
+    def categorize(transaction):
+        date, category, cents, memo, kind = transaction
+        return matcher.categorize(memo, cents) if category == UNCATEGORIZED else None
+
+    return get_storage().recategorize_transactions(user_name, categorize)
@@ -0,0 +1,287 @@
+import os
+import sys
+import argparse
+
+from finance_manager.categories import categorize_uncategorized
+from finance_manager.ledger import close_user_ledger, end_ledger_session, get_user_ledger, start_ledger_session
+from finance_manager.menus import (
+    authenticate_user,
+    generate_report,
+    main_menu,
+    manage_credits,
+    manage_expenses,
+    manage_income,
+    manage_investments
+)
+from finance_manager import metrics
+from finance_manager.metrics import InputWaitStream, dump_metrics, enable_metrics
+from finance_manager.reports import REPORT_SINKS, build_transactions_report, build_user_net_position_report
+from finance_manager.storage import configure_storage, migrate_text_to_sqlite, provision_users_from_file
+from finance_manager.transactions import get_current_month, parse_month, read_rollups
+
+
+# ------------------ Command line functions ------------------ #
+
+# Function to read the command line options
+def parse_arguments(arguments):
+    parser = argparse.ArgumentParser(description="Manage finances in income, expenses, credits, investment and reporting.")
+    parser.add_argument("--storage", choices=["text", "sqlite"], default=None,
+                        help="storage engine to use (default: FINANCE_MANAGER_STORAGE or 'text')")
+    parser.add_argument("--metrics", action="store_true",
+                        help="time storage calls, menu actions and reports and write them to data/metrics.jsonl at logout")
+    parser.add_argument("--profile", nargs="?", const="finance_manager.prof", default=None, metavar="FILE",
+                        help="run under cProfile and write the stats to FILE (default: finance_manager.prof)")
+
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("migrate", help="bulk import the data/Users text files into the sqlite database")
+
+    reports_command = commands.add_parser("reports", help="render the full report of every user to data/Reports/<user>.txt")
+    reports_command.add_argument("--output-folder", default=os.path.join("data", "Reports"), help="folder to write the reports to")
+    reports_command.add_argument("--workers", type=int, default=None, help="number of processes (default: number of cores)")
+    reports_command.add_argument("--force", action="store_true", help="render every report, even if the users files have not changed")
+    reports_command.add_argument("--format", choices=sorted(REPORT_SINKS), default="text", help="report format (default: text)")
+
+    balance_command = commands.add_parser("balance", help="show the remaining balance of one user from the saved totals")
+    balance_command.add_argument("user", help="username to show the balance of")
+    balance_command.add_argument("--format", choices=sorted(REPORT_SINKS), default="text", help="report format (default: text)")
+
+    report_command = commands.add_parser("report", help="write the full report of one user to standard output")
+    report_command.add_argument("user", help="username to report on")
+    report_command.add_argument("--format", choices=sorted(REPORT_SINKS), default="text", help="report format (default: text)")
+
+    history_command = commands.add_parser("history", help="show the remaining balance of one user for each recorded month")
+    history_command.add_argument("user", help="username to show the history of")
+    history_command.add_argument("--months", type=int, default=36, help="number of months up to this month (default: 36)")
+    history_command.add_argument("--format", choices=sorted(REPORT_SINKS), default="text", help="report format (default: text)")
+
+    transactions_command = commands.add_parser("transactions", help="show one users transactions of a month by kind and category")
+    transactions_command.add_argument("user", help="username to show the transactions of")
+    transactions_command.add_argument("--month", type=parse_month, default=None, help="month as YYYY-MM (default: this month)")
+    transactions_command.add_argument("--format", choices=sorted(REPORT_SINKS), default="text", help="report format (default: text)")
+
+    import_command = commands.add_parser("import", help="import bank statements (CSV, OFX or QIF) into one users transactions")
+    import_command.add_argument("user", help="username to import the transactions of")
+    import_command.add_argument("statements", nargs="+", help="statement files, read one record at a time")
+    import_command.add_argument("--format", choices=["auto", "csv", "ofx", "qif"], default="auto",
+                                help="statement format (default: from each files extension)")
+    import_command.add_argument("--date-format", default=None,
+                                help="strptime format of the statement dates, e.g. %%m/%%d/%%Y (default: tried in turn, day first)")
+
+    categorize_command = commands.add_parser("categorize", help="give one users uncategorized transactions the category of their rules")
+    categorize_command.add_argument("user", help="username to categorize the transactions of")
+
+    project_command = commands.add_parser("project", help="simulate what the investment calculation of a user (or every user) grows into")
+    project_command.add_argument("user", nargs="?", help="username to project (leave out with --all)")
+    project_command.add_argument("--all", action="store_true", help="project every user into --output-folder using a process pool")
+    project_command.add_argument("--years", type=int, default=30, help="years to project, 1 to 40 (default: 30)")
+    project_command.add_argument("--paths", type=int, default=None, help="number of simulated market paths (default: 20000)")
+    project_command.add_argument("--seed", type=int, default=None, help="random seed, to repeat a projection exactly")
+    project_command.add_argument("--workers", type=int, default=None, help="number of processes for --all (default: number of cores)")
+    project_command.add_argument("--output-folder", default=os.path.join("data", "Reports"), help="folder --all writes to")
+    project_command.add_argument("--format", choices=sorted(REPORT_SINKS), default="text", help="report format (default: text)")
+
+    forecast_command = commands.add_parser("forecast", help="forecast one users balance month by month over 1 to 30 years")
+    forecast_command.add_argument("user", help="username to forecast")
+    forecast_command.add_argument("--years", type=int, default=10, help="years to forecast, 1 to 30 (default: 10)")
+    forecast_command.add_argument("--opening-balance", type=float, default=0, help="money the user has now (default: 0)")
+    forecast_command.add_argument("--format", choices=sorted(REPORT_SINKS), default="text", help="report format (default: text)")
+
+    provision_command = commands.add_parser("provision", help="register every user in a CSV file of username,password rows")
+    provision_command.add_argument("users", help="CSV file of username,password rows (a header row is optional)")
+
+    serve_command = commands.add_parser("serve", help="run the menus for many users at once on a local socket")
+    serve_command.add_argument("--socket", default=None, help="socket to listen on (default: FINANCE_MANAGER_SOCKET or data/finance_manager.sock)")
+    serve_command.add_argument("--max-sessions", type=int, default=None, help="most sessions running at once (default: 1024)")
+
+    client_command = commands.add_parser("client", help="open a session on a running session server")
+    client_command.add_argument("--socket", default=None, help="socket of the session server")
+
+    api_command = commands.add_parser("api", help="serve every users reports as JSON over HTTP")
+    api_command.add_argument("--host", default=None, help="address to listen on (default: 127.0.0.1)")
+    api_command.add_argument("--port", type=int, default=None, help="port to listen on (default: 8765)")
+
+    payroll_command = commands.add_parser("payroll", help="calculate income.txt for every row of a CSV or JSONL timesheet file")
+    payroll_command.add_argument("timesheets", help="CSV (with a header row) or JSONL file of timesheet rows")
+    payroll_command.add_argument("--tax-year", default=None, help="tax year to calculate with (default: newest tax table)")
+    payroll_command.add_argument("--chunk-size", type=int, default=None, help="rows calculated and written at a time (default: 10000)")
+
+    return parser.parse_args(arguments)
+
+
+# Function to run a command given on the command line
+def run_command(command_line):
+
+    if command_line.command == "migrate":
+        migrate_text_to_sqlite()
+
+    elif command_line.command == "reports":
+        # Imported here so the menus start without loading the process pool
+        from finance_manager.batch_reports import generate_all_reports
+        generate_all_reports(command_line.output_folder, command_line.workers, command_line.force, command_line.format)
+
+    elif command_line.command == "balance":
+        REPORT_SINKS[command_line.format](sys.stdout).write([build_user_net_position_report(command_line.user)])
+
+    elif command_line.command == "report":
+        from finance_manager.batch_reports import write_user_report
+        write_user_report(command_line.user, REPORT_SINKS[command_line.format](sys.stdout))
+
+    elif command_line.command == "history":
+        from finance_manager.history import build_history_report
+        REPORT_SINKS[command_line.format](sys.stdout).write([build_history_report(command_line.user, command_line.months)])
+
+    elif command_line.command == "transactions":
+        report = build_transactions_report(read_rollups(command_line.user), command_line.month or get_current_month())
+        REPORT_SINKS[command_line.format](sys.stdout).write([report])
+
+    elif command_line.command == "import":
+        from finance_manager.statements import import_statements
+        import_statements(command_line.user, command_line.statements, command_line.format, command_line.date_format)
+
+    elif command_line.command == "categorize":
+        changed = categorize_uncategorized(command_line.user)
+        print(f"{changed} uncategorized transactions of {command_line.user} have been given a category.")
+
+    elif command_line.command == "project":
+        # Imported here so the menus start without loading NumPy
+        from finance_manager.projections import (
+            MAX_PROJECTION_YEARS,
+            PROJECTION_PATHS,
+            build_user_projection_report,
+            project_all_users
+        )
+        paths = command_line.paths or PROJECTION_PATHS
+
+        if not 1 <= command_line.years <= MAX_PROJECTION_YEARS:
+            print(f"Projections are 1 to {MAX_PROJECTION_YEARS} years.")
+        elif command_line.all:
+            project_all_users(command_line.output_folder, command_line.workers, command_line.years, paths,
+                              command_line.seed, command_line.format)
+        elif command_line.user:
+            report = build_user_projection_report(command_line.user, command_line.years, paths, command_line.seed)
+            REPORT_SINKS[command_line.format](sys.stdout).write([report])
+        else:
+            print("Give a username to project, or --all to project every user.")
+
+    elif command_line.command == "forecast":
+        # Imported here so the menus start without loading NumPy
+        from finance_manager.forecast import MAX_FORECAST_YEARS, build_user_forecast_report
+
+        if 1 <= command_line.years <= MAX_FORECAST_YEARS:
+            report = build_user_forecast_report(command_line.user, command_line.years, command_line.opening_balance)
+            REPORT_SINKS[command_line.format](sys.stdout).write([report])
+        else:
+            print(f"Forecasts are 1 to {MAX_FORECAST_YEARS} years.")
+
+    elif command_line.command == "provision":
+        provision_users_from_file(command_line.users)
+
+    elif command_line.command == "serve":
+        from finance_manager.server import MAX_SESSIONS, SOCKET_PATH, run_server
+        run_server(command_line.socket or SOCKET_PATH, command_line.max_sessions or MAX_SESSIONS)
+
+    elif command_line.command == "client":
+        from finance_manager.client import SOCKET_PATH, run_client
+        sys.exit(run_client(command_line.socket or SOCKET_PATH))
+
+    elif command_line.command == "api":
+        from finance_manager.api import API_HOST, API_PORT, run_api
+        run_api(command_line.host or API_HOST, command_line.port or API_PORT)
+
+    elif command_line.command == "payroll":
+        # Imported here so the menus start without loading NumPy
+        from finance_manager.payroll import run_payroll
+        run_payroll(command_line.timesheets, command_line.tax_year, command_line.chunk_size)
+
+
+
+# ------------------ Main menu loop ------------------ #
+
+# Function to run the interactive menus until the user exits
+# The session server keeps the users ledger loaded for a while after they log out, so their next session starts warm
+def run_interactive(keep_ledgers=False):
+
+    while True:
+        # Call the authentication function before the main menu
+        current_user = authenticate_user()
+        if not current_user:
+            # Exit the program if authentication fails
+            print("Exiting the program. Goodbye!")
+            break
+
+        # Load the users files once for the whole session
+        if keep_ledgers:
+            start_ledger_session(current_user)
+        else:
+            get_user_ledger(current_user)
+
+        try:
+            in_main_menu = True
+            while in_main_menu:
+                # Display the main menu
+                choice = main_menu(current_user)
+
+                if choice == "0":
+                    if not keep_ledgers:
+                        close_user_ledger(current_user)
+                    dump_metrics(current_user)
+                    print(f"Exiting the program. Goodbye {current_user}!")
+                    in_main_menu = False
+
+                elif choice == "1":
+                    manage_income(current_user)
+
+                elif choice == "2":
+                    manage_expenses(current_user)
+
+                elif choice == "3":
+                    manage_credits(current_user)
+
+                elif choice == "4":
+                    manage_investments(current_user)
+
+                elif choice == "5":
+                    # Pass the necessary arguments to generate_report
+                    generate_report(current_user)
+
+                elif choice == "6":
+                    get_user_ledger(current_user).save()
+                    print("Your changes have been saved.")
+
+                else:
+                    print("Invalid choice. Please enter a number between 0 and 6.")
+        finally:
+            # The session server saves the ledger when the session ends (also when the client disconnects),
+            # and keeps it loaded until it has been idle for a while (see ledger.evict_idle_ledgers)
+            if keep_ledgers:
+                end_ledger_session(current_user)
+
+
+# Function to start the program from the command line
+def main(arguments=None):
+    command_line = parse_arguments(sys.argv[1:] if arguments is None else arguments)
+    configure_storage(command_line.storage)
+
+    if command_line.metrics:
+        enable_metrics()
+
+    if command_line.profile:
+        # Imported here so normal start-up doesn't pay for it
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        if command_line.command:
+            run_command(command_line)
+            dump_metrics(command_line.command)
+        else:
+            # Time spent waiting for the user to type is left out of the menu timings
+            if metrics.metrics_enabled:
+                sys.stdin = InputWaitStream(sys.stdin)
+            run_interactive()
+    finally:
+        if command_line.profile:
+            profiler.disable()
+            profiler.dump_stats(command_line.profile)
+            print(f"Profile written to {command_line.profile} (view it with: python -m pstats {command_line.profile}).")
@@ -0,0 +1,77 @@
+import os
+import sys
+import socket
+import struct
+import getpass
+
+
+# ------------------ Session client ------------------ #
+
+# Socket the session server listens on and the client connects to
+SOCKET_PATH = os.environ.get("FINANCE_MANAGER_SOCKET", os.path.join("data", "finance_manager.sock"))
+
+# Every message is one type byte, the payload length and the payload
+# Server to client: OUTPUT text to show, INPUT and PASSWORD ask for a line (PASSWORD without echo), END of the session
+# Client to server: LINE of input
+FRAME_HEADER = struct.Struct(">cI")
+OUTPUT = b"o"
+INPUT = b"i"
+PASSWORD = b"p"
+END = b"e"
+LINE = b"l"
+
+
+# Function to build one message
+def make_frame(kind, payload=b""):
+    return FRAME_HEADER.pack(kind, len(payload)) + payload
+
+
+# Function to read exactly 'size' bytes from a socket file, None if the other side closed it
+def read_exactly(stream, size):
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return data
+
+
+# Function to connect to the session server and forward this terminal to it until the session ends
+def run_client(socket_path=SOCKET_PATH):
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        connection.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No session server is listening on {socket_path}. Start one with: python -m finance_manager serve")
+        return 1
+
+    stream = connection.makefile("rb")
+
+    with connection:
+        while True:
+            header = read_exactly(stream, FRAME_HEADER.size)
+            if header is None:
+                print("\nThe session server closed the connection.")
+                return 1
+
+            kind, size = FRAME_HEADER.unpack(header)
+            payload = read_exactly(stream, size) if size else b""
+
+            if kind == OUTPUT:
+                sys.stdout.write(payload.decode())
+                sys.stdout.flush()
+
+            elif kind == INPUT:
+                line = sys.stdin.readline()
+                if not line:
+                    return 0  # End of input, closing the connection ends the session
+                connection.sendall(make_frame(LINE, line.rstrip("\n").encode()))
+
+            elif kind == PASSWORD:
+                connection.sendall(make_frame(LINE, getpass.getpass(payload.decode()).encode()))
+
+            elif kind == END:
+                return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_client(sys.argv[1] if len(sys.argv) > 1 else SOCKET_PATH))
@@ -0,0 +1,251 @@
+import os
+import mmap
+import struct
+import hashlib
+
+from finance_manager.locks import FileLock
+
+
+# Class for an on-disk hash index over users.txt so a username is found without reading the whole file
+class CredentialIndex:
+    magic = b"FMUSRIX2"
+    header = struct.Struct("<8sQQQQ")  # magic, number of slots, number of users, bytes of users.txt indexed, its inode
+    slot = struct.Struct("<QQ")  # username hash, offset of the users line + 1 (0 marks an empty slot)
+    minimum_slots = 1024
+    maximum_load = 0.75
+
+    def __init__(self, users_path, index_path):
+        self.users_path = users_path
+        self.index_path = index_path
+        self.lock_path = users_path + ".lock"
+        self.users_file = None
+        self.users_inode = None
+        self.index_file = None
+        self.index_map = None
+        self.index_inode = None
+        self.capacity = 0
+        self.count = 0
+        self.indexed_size = 0
+
+    # Function to hash a username the same way in every process
+    @staticmethod
+    def hash_username(username):
+        return int.from_bytes(hashlib.blake2b(username.encode(), digest_size=8).digest(), "little")
+
+    # Function to open users.txt and its index, building the index from users.txt if needed
+    def open(self):
+        with FileLock(self.lock_path, exclusive=True):
+            open(self.users_path, "a").close()
+            self.open_users_file()
+
+            if not self.load_index():
+                self.rebuild()
+
+            self.catch_up()
+
+    # Function to open users.txt for reading the lines the index points at
+    def open_users_file(self):
+        if self.users_file is not None:
+            self.users_file.close()
+        self.users_file = open(self.users_path, "rb")
+        self.users_inode = os.fstat(self.users_file.fileno()).st_ino
+
+    # Function to map an existing index file, returns False if it is missing or unreadable
+    def load_index(self):
+        if not os.path.exists(self.index_path) or os.path.getsize(self.index_path) < self.header.size:
+            return False
+
+        index_file = open(self.index_path, "r+b")
+        index_map = mmap.mmap(index_file.fileno(), 0)
+        magic, capacity, count, indexed_size, users_inode = self.header.unpack_from(index_map, 0)
+
+        if magic != self.magic or len(index_map) != self.header.size + capacity * self.slot.size:
+            index_map.close()
+            index_file.close()
+            return False
+
+        self.close_index()
+        self.index_file = index_file
+        self.index_map = index_map
+        self.index_inode = os.fstat(index_file.fileno()).st_ino
+        self.capacity, self.count, self.indexed_size = capacity, count, indexed_size
+        return True
+
+    # Function to close the mapped index file
+    def close_index(self):
+        if self.index_map is not None:
+            self.index_map.close()
+            self.index_file.close()
+            self.index_map = None
+            self.index_file = None
+
+    # Function to write a new, empty index (or a larger copy of the current one) with room for 'minimum_count' users
+    def rebuild(self, minimum_count=0, keep_entries=False):
+        if not keep_entries:
+            with open(self.users_path, "rb") as users_file:
+                minimum_count = max(minimum_count, sum(1 for _ in users_file))
+
+        capacity = self.minimum_slots
+        while capacity * self.maximum_load < minimum_count * 2:
+            capacity *= 2
+
+        temporary_path = self.index_path + ".tmp"
+        with open(temporary_path, "w+b") as index_file:
+            index_file.truncate(self.header.size + capacity * self.slot.size)
+            new_map = mmap.mmap(index_file.fileno(), 0)
+            count, indexed_size = 0, 0
+
+            # Move every existing slot into its position in the larger table
+            if keep_entries:
+                for old_position in range(self.capacity):
+                    slot_hash, slot_offset = self.slot.unpack_from(self.index_map, self.header.size + old_position * self.slot.size)
+                    if slot_offset == 0:
+                        continue
+
+                    position = slot_hash % capacity
+                    while self.slot.unpack_from(new_map, self.header.size + position * self.slot.size)[1] != 0:
+                        position = (position + 1) % capacity
+                    self.slot.pack_into(new_map, self.header.size + position * self.slot.size, slot_hash, slot_offset)
+
+                count, indexed_size = self.count, self.indexed_size
+
+            self.header.pack_into(new_map, 0, self.magic, capacity, count, indexed_size, self.users_inode)
+            new_map.flush()
+            new_map.close()
+
+        os.replace(temporary_path, self.index_path)
+        self.load_index()
+
+    # Function to index lines added to users.txt since the index was last updated (e.g. older versions or imports)
+    def catch_up(self):
+        # users.txt was replaced by a new file (e.g. restored from a backup), read that one from now on
+        if os.stat(self.users_path).st_ino != self.users_inode:
+            self.open_users_file()
+
+        if not self.is_current():
+            self.load_index()
+
+        # Another process may have indexed new lines since this one last looked
+        magic, self.capacity, self.count, self.indexed_size, users_inode = self.header.unpack_from(self.index_map, 0)
+
+        users_size = os.fstat(self.users_file.fileno()).st_size
+
+        if users_inode != self.users_inode or users_size < self.indexed_size:
+            # users.txt was replaced or rewritten outside the program, the old offsets are no longer valid
+            self.rebuild()
+
+        if users_size == self.indexed_size:
+            return
+
+        with open(self.users_path, "rb") as users_file:
+            users_file.seek(self.indexed_size)
+            offset = self.indexed_size
+            for line in users_file:
+                if not line.endswith(b"\n"):
+                    break  # Line is still being written, pick it up next time
+                if line.strip():
+                    self.insert(line.split(b",", 1)[0].decode().strip(), offset)
+                offset += len(line)
+                self.indexed_size = offset
+
+        self.write_header()
+
+    # Function to check that the mapped index is still the index file (another process may have rebuilt it),
+    # that users.txt is still the file it indexed and that it covers every line of it
+    def is_current(self):
+        if os.stat(self.index_path).st_ino != self.index_inode:
+            return False
+
+        users_stat = os.stat(self.users_path)
+        indexed_size, users_inode = self.header.unpack_from(self.index_map, 0)[3:]
+        return users_stat.st_ino == self.users_inode == users_inode and users_stat.st_size == indexed_size
+
+    # Function to save the slot count, user count, indexed size and users.txt inode into the index header
+    def write_header(self):
+        self.header.pack_into(self.index_map, 0, self.magic, self.capacity, self.count, self.indexed_size, self.users_inode)
+
+    # Function to read the username and password stored at an offset of users.txt
+    # Uses pread rather than seek and read, so threads can look users up at the same time
+    def read_line(self, offset):
+        line = os.pread(self.users_file.fileno(), 256, offset)
+        while b"\n" not in line:
+            more = os.pread(self.users_file.fileno(), 256, offset + len(line))
+            if not more:
+                break
+            line += more
+
+        username, password = line.split(b"\n", 1)[0].decode().strip().split(",", 1)
+        return username, password
+
+    # Function to find the slot of a username, or the empty slot where it would go
+    def find_slot(self, username, username_hash):
+        position = username_hash % self.capacity
+
+        while True:
+            slot_hash, slot_offset = self.slot.unpack_from(self.index_map, self.header.size + position * self.slot.size)
+
+            if slot_offset == 0:
+                return position, None
+            if slot_hash == username_hash and self.read_line(slot_offset - 1)[0] == username:
+                return position, slot_offset - 1
+
+            position = (position + 1) % self.capacity
+
+    # Function to point a username at a line of users.txt (the latest line for a username wins)
+    def insert(self, username, offset):
+        if (self.count + 1) > self.capacity * self.maximum_load:
+            self.rebuild(self.count + 1, keep_entries=True)
+
+        username_hash = self.hash_username(username)
+        position, existing_offset = self.find_slot(username, username_hash)
+
+        if existing_offset is None:
+            self.count += 1
+
+        self.slot.pack_into(self.index_map, self.header.size + position * self.slot.size, username_hash, offset + 1)
+
+    # Function to get the password of a username, or None if the user is not registered
+    # Lookups share the lock, only bringing the index up to date needs it alone
+    def get_password(self, username):
+        with FileLock(self.lock_path, exclusive=False):
+            if self.is_current():
+                return self.find_password(username)
+
+        with FileLock(self.lock_path, exclusive=True):
+            self.catch_up()
+            return self.find_password(username)
+
+    # Function to look a username up in the index
+    def find_password(self, username):
+        position, offset = self.find_slot(username, self.hash_username(username))
+        if offset is None:
+            return None
+
+        return self.read_line(offset)[1]
+
+    # Function to append a new user to users.txt and the index
+    def add_user(self, username, password):
+        self.add_users([(username, password)])
+
+    # Function to append many new users to users.txt with a single write and index them all
+    # Holds the lock alone so appends from concurrent registrations never interleave
+    def add_users(self, users):
+        with FileLock(self.lock_path, exclusive=True):
+            self.catch_up()
+
+            lines = [f"{username},{password}\n".encode() for username, password in users]
+
+            # Grow the index once up front instead of doubling it while inserting
+            if (self.count + len(lines)) > self.capacity * self.maximum_load:
+                self.rebuild(self.count + len(lines), keep_entries=True)
+
+            with open(self.users_path, "ab") as users_file:
+                offset = users_file.tell()
+                users_file.write(b"".join(lines))
+
+            for (username, password), line in zip(users, lines):
+                self.insert(username, offset)
+                offset += len(line)
+
+            self.indexed_size = offset
+            self.write_header()
@@ -0,0 +1,170 @@
+import numpy as np
+
+from finance_manager.amortization import get_credit_terms, get_monthly_repayments
+from finance_manager.history import format_month, get_month
+from finance_manager.ledger import DEFAULT_INCOME_DATA
+from finance_manager.money import money_items, to_cents
+from finance_manager.storage import CREDIT_TERMS_FILE_NAME, read_from_file
+
+
+# ------------------ Cash-flow forecast ------------------ #
+
+# Each users forecast settings of their items, as 'part:item,start month|end month|yearly escalation %'
+# (e.g. 'debits:Netflix,2026-01||6'), items without one run from now on with no escalation
+FORECAST_TERMS_FILE_NAME = "forecast_terms.txt"
+
+# Longest forecast in years
+MAX_FORECAST_YEARS = 30
+
+# Parts of the forecast and whether their items add to (1) or take from (-1) the balance, like the net position
+FORECAST_SIGNS = {
+    "income": 1,
+    "debits": -1,
+    "expenses": -1,
+    "credits": 1,
+    "investments": -1,
+    "repayments": -1
+}
+
+# Name of the single income item (the total net income)
+NET_INCOME_ITEM = "Net income"
+
+# Month number used for items that never end
+NO_END_MONTH = np.iinfo(np.int32).max
+
+
+# Function to read a month typed as 'YYYY-MM' into a month number (see history.get_month), None if it is empty
+def parse_forecast_month(text):
+    text = str(text).strip()
+    if not text:
+        return None
+    year, month = (int(part) for part in text.split("-"))
+    if not 1 <= month <= 12:
+        raise ValueError(f"invalid month '{text}'")
+    return year * 12 + month - 1
+
+
+# Function to read a 'start|end|escalation' value, returns the start and end month numbers (or None) and the escalation %
+def parse_forecast_terms(value):
+    start, end, escalation = str(value).split("|")
+    return parse_forecast_month(start), parse_forecast_month(end), float(escalation or 0)
+
+
+# Function to write forecast settings as a 'start|end|escalation' value
+def format_forecast_terms(start, end, escalation):
+    return "|".join([format_month(start) if start is not None else "", format_month(end) if end is not None else "", f"{escalation:g}"])
+
+
+# Function to list every item of the forecast as (part, name, amount per month in cents, months it runs for or None)
+# Credits with terms add their repayments, which run for the credits term
+def get_forecast_items(income_data, debits, other_expenses, credits, investments, credit_terms=None):
+    items = [("income", NET_INCOME_ITEM, to_cents(income_data["TOTAl_NET_INCOME"]), None)]
+    for part, section in (("debits", debits), ("expenses", other_expenses), ("credits", credits), ("investments", investments)):
+        items += [(part, name, cents, None) for name, cents in money_items(section)]
+
+    if credit_terms:
+        repayments = get_monthly_repayments(credits, credit_terms)
+        for name, principal, rate, term, frequency in zip(*get_credit_terms(credits, credit_terms)):
+            items.append(("repayments", name, repayments[name], term))
+    return items
+
+
+# Function to build the cash-flow matrix: one row per item and one column per month, in cents
+# An item counts from its start month up to and including its end month, and grows by its escalation on every
+# anniversary of its start. Amounts are what the items are now (or at their start, for items that start later)
+def build_cash_flow_matrix(amounts, signs, starts, ends, escalations, first_month, months):
+    month_numbers = first_month + np.arange(months)[None, :]
+    starts = starts[:, None]
+
+    active = (month_numbers >= starts) & (month_numbers <= ends[:, None])
+
+    # Escalations that already happened before the amount was known are left out
+    base_escalations = (np.maximum(starts, first_month) - starts) // 12
+    escalation_count = np.maximum((month_numbers - starts) // 12 - base_escalations, 0)
+    growth = (1 + escalations[:, None] / 100) ** escalation_count
+
+    return np.where(active, np.rint(signs[:, None] * amounts[:, None] * growth), 0).astype(np.int64)
+
+
+# Function to find the first month a balance goes below zero, None if it never does
+def get_first_negative_month(balances, first_month):
+    negative = np.flatnonzero(balances < 0)
+    return None if len(negative) == 0 else first_month + int(negative[0])
+
+
+# Function to build the forecast report model from the forecast items and their settings
+# 'opening_balance' (R) is what the user has before the first month
+def build_forecast_report(items, forecast_terms, years=10, opening_balance=0, first_month=None):
+    if not 1 <= years <= MAX_FORECAST_YEARS:
+        raise ValueError(f"Forecasts are 1 to {MAX_FORECAST_YEARS} years.")
+
+    first_month = get_month() if first_month is None else first_month
+    months = years * 12
+
+    amounts, signs, starts, ends, escalations = [], [], [], [], []
+    for part, name, cents, duration in items:
+        try:
+            start, end, escalation = parse_forecast_terms(forecast_terms[f"{part}:{name}"])
+        except (KeyError, ValueError):
+            start, end, escalation = None, None, 0.0
+
+        start = first_month if start is None else start
+        if end is None and duration is not None:
+            end = start + duration - 1
+
+        amounts.append(cents)
+        signs.append(FORECAST_SIGNS[part])
+        starts.append(start)
+        ends.append(NO_END_MONTH if end is None else end)
+        escalations.append(escalation)
+
+    matrix = build_cash_flow_matrix(
+        np.array(amounts, dtype=np.float64), np.array(signs), np.array(starts, dtype=np.int64),
+        np.array(ends, dtype=np.int64), np.array(escalations), first_month, months
+    )
+    monthly_net = matrix.sum(axis=0)
+    balances = to_cents(opening_balance) + np.cumsum(monthly_net)
+
+    # Totals of each calendar year (the first and last can be part years)
+    years_of_months = (first_month + np.arange(months)) // 12
+    year_starts = np.flatnonzero(np.r_[True, years_of_months[1:] != years_of_months[:-1]])
+    year_ends = np.r_[year_starts[1:], months] - 1
+    incomings = np.add.reduceat(np.where(matrix > 0, matrix, 0).sum(axis=0), year_starts)
+    outgoings = np.add.reduceat(np.where(matrix < 0, -matrix, 0).sum(axis=0), year_starts)
+
+    first_negative = get_first_negative_month(balances, first_month)
+
+    return {
+        "report": "forecast",
+        "first_month": format_month(first_month),
+        "months": months,
+        "opening_balance": round(float(opening_balance), 2),
+        "first_negative_month": format_month(first_negative) if first_negative is not None else None,
+        "years": [
+            {
+                "name": str(int(years_of_months[start])),
+                "value": int(closing) / 100,
+                "incoming": int(incoming) / 100,
+                "outgoing": int(outgoing) / 100
+            }
+            for start, incoming, outgoing, closing in zip(year_starts, incomings, outgoings, balances[year_ends])
+        ],
+        "balances": [
+            {"name": format_month(first_month + index), "value": int(balance) / 100}
+            for index, balance in enumerate(balances.tolist())
+        ]
+    }
+
+
+# Function to build the forecast of a user from their saved files
+def build_user_forecast_report(user_name, years=10, opening_balance=0):
+    income_data = read_from_file(user_name, "income.txt") or DEFAULT_INCOME_DATA
+    items = get_forecast_items(
+        income_data,
+        read_from_file(user_name, "expenses_debits.txt"),
+        read_from_file(user_name, "expenses_other.txt"),
+        read_from_file(user_name, "credits.txt"),
+        read_from_file(user_name, "investments.txt"),
+        read_from_file(user_name, CREDIT_TERMS_FILE_NAME)
+    )
+    return build_forecast_report(items, read_from_file(user_name, FORECAST_TERMS_FILE_NAME), years, opening_balance)
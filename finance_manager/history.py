@@ -0,0 +1,93 @@
+import time
+
+import numpy as np
+
+from finance_manager.storage import get_storage
+
+
+# ------------------ Monthly history ------------------ #
+
+# Each users month end totals, one row per month in month order, kept by the storage engine
+# (history.bin in their folder with text storage, the history table with sqlite)
+# Month (year * 12 + month - 1) and the totals in cents, laid out like the rows of history.bin (storage.HISTORY_ROW)
+HISTORY_DTYPE = np.dtype([
+    ("month", "<i4"),
+    ("net_income", "<i8"),
+    ("expenses", "<i8"),
+    ("credits", "<i8"),
+    ("investments", "<i8")
+])
+
+
+# Function to get the month number of a date (the current month by default)
+def get_month(date=None):
+    date = date or time.localtime()
+    return date.tm_year * 12 + date.tm_mon - 1
+
+
+# Function to write a month number as 'YYYY-MM'
+def format_month(month):
+    return f"{month // 12}-{month % 12 + 1:02d}"
+
+
+# Function to save a users totals for a month, replacing that months row if it is already the last one
+def record_month(user_name, net_income, expenses, credits, investments, month=None):
+    month = get_month() if month is None else month
+    get_storage().record_history(user_name, (month, net_income, expenses, credits, investments))
+
+
+# Function to get a users history as an array of HISTORY_DTYPE rows, an empty array if they have no history yet
+# With text storage the file is memory mapped, so rows are read only when used and slices cost nothing until then
+def read_history(user_name):
+    return get_storage().read_history(user_name, HISTORY_DTYPE)
+
+
+# Function to get the rows from 'first_month' up to and including 'last_month' (a view, nothing is copied)
+def get_history_range(history, first_month=None, last_month=None):
+    start = 0 if first_month is None else np.searchsorted(history["month"], first_month, side="left")
+    end = len(history) if last_month is None else np.searchsorted(history["month"], last_month, side="right")
+    return history[start:end]
+
+
+# Function to get the rows of the last 'months' months up to this month
+def get_recent_history(history, months, current_month=None):
+    current_month = get_month() if current_month is None else current_month
+    return get_history_range(history, current_month - months + 1, current_month)
+
+
+# Function to work out the remaining balance of every row, in cents
+def get_net_positions(rows):
+    return rows["net_income"] - rows["expenses"] + rows["credits"] - rows["investments"]
+
+
+# Function to average a column (e.g. 'expenses') over the recorded months of each year
+# Returns the years and their averages in cents
+def get_yearly_averages(rows, column):
+    if len(rows) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    years = rows["month"] // 12
+    year_starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+    totals = np.add.reduceat(rows[column], year_starts)
+    counts = np.diff(np.r_[year_starts, len(rows)])
+    return years[year_starts], totals / counts
+
+
+# Function to build the history report model: the remaining balance of each of the last 'months' months
+# and the average expenses of each year
+def build_history_report(user_name, months=36):
+    history = read_history(user_name)
+    recent = get_recent_history(history, months)
+    years, average_expenses = get_yearly_averages(history, "expenses")
+
+    return {
+        "report": "history",
+        "months": [
+            {"name": format_month(int(month)), "value": int(net_position) / 100}
+            for month, net_position in zip(recent["month"], get_net_positions(recent))
+        ],
+        "yearly_average_expenses": [
+            {"name": str(int(year)), "value": round(float(average) / 100, 2)}
+            for year, average in zip(years, average_expenses)
+        ]
+    }
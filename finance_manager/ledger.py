@@ -0,0 +1,228 @@
+import os
+import time
+import threading
+
+from finance_manager.money import MoneySection, money_total, parse_ledger_section, to_cents
+from finance_manager.storage import LEDGER_FILES, create_user_folder, get_storage, read_from_file, write_to_file
+
+
+# ------------------ User ledger ------------------ #
+
+# Seconds between automatic saves of a logged in users changes
+LEDGER_FLUSH_SECONDS = float(os.environ.get("FINANCE_MANAGER_FLUSH_SECONDS", 30))
+
+# Income data used before a user has run the income calculator
+DEFAULT_INCOME_DATA = {
+    "income": 0,
+    "Income_TAX": 0,
+    "Income_Less_Tax": 0,
+    "UIF": 0.01,
+    "TOTAl_NET_INCOME": 0
+}
+
+# Seconds the session server keeps a users ledger loaded after their last session ends, and the most it keeps
+# loaded without a session (the least recently used are closed first)
+LEDGER_IDLE_SECONDS = float(os.environ.get("FINANCE_MANAGER_LEDGER_IDLE_SECONDS", 600))
+MAX_IDLE_LEDGERS = int(os.environ.get("FINANCE_MANAGER_MAX_IDLE_LEDGERS", 256))
+
+open_ledgers = {}
+open_ledgers_lock = threading.RLock()
+
+
+# Class for the sections that aren't money files: a dictionary whose changes are made holding the ledger lock
+# (two sessions of the same user share a ledger, and the timer saves it in the background)
+class LedgerSection(dict):
+
+    def __init__(self, data, lock):
+        super().__init__(data)
+        self.lock = lock
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        with self.lock:
+            super().__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        with self.lock:
+            super().update(*args, **kwargs)
+
+    def pop(self, *args):
+        with self.lock:
+            return super().pop(*args)
+
+    def clear(self):
+        with self.lock:
+            super().clear()
+
+    # Function to copy the section as a plain dictionary (used to save it)
+    def copy(self):
+        with self.lock:
+            return dict(self)
+
+
+# Class to keep a users files in memory for the whole session and write back only the changed ones
+class UserLedger:
+
+    def __init__(self, user_name):
+        self.user_name = user_name
+        self.sections = {}
+        self.dirty = set()
+        self.lock = threading.RLock()
+        self.timer = None
+        self.closed = False
+
+        # Sessions of the session server using the ledger, and when the last one ended (see evict_idle_ledgers)
+        self.sessions = 0
+        self.last_used = time.monotonic()
+
+    # Function to read every ledger file of the user once
+    def load(self):
+        for file_name in LEDGER_FILES:
+            self.sections[file_name] = self.read_section(file_name)
+        return self
+
+    # Function to read one file of the user, changes to it are made holding the ledger lock
+    def read_section(self, file_name):
+        section = parse_ledger_section(file_name, read_from_file(self.user_name, file_name) or {}, self.lock)
+        return section if isinstance(section, MoneySection) else LedgerSection(section, self.lock)
+
+    # Function to get the data of one file (menus change this dictionary in place)
+    def section(self, file_name):
+        with self.lock:
+            if file_name not in self.sections:
+                self.sections[file_name] = self.read_section(file_name)
+            return self.sections[file_name]
+
+    # Function to remember that a file has changed and needs to be saved
+    def mark_dirty(self, file_name):
+        with self.lock:
+            self.dirty.add(file_name)
+
+    # Function to write every changed file to storage
+    # A file stays marked as changed until it has been written, so a failed write is tried again at the next save
+    # The lock is held throughout, and money sections are changed under the same lock, so no change is half saved
+    def save(self):
+        with self.lock:
+            written = False
+
+            for file_name in list(self.dirty):
+                write_to_file(create_user_folder(self.user_name), file_name, self.sections[file_name].copy())
+                self.dirty.discard(file_name)
+                written = True
+
+            if written:
+                self.record_history()
+
+    # Function to save this months totals to the users monthly history
+    def record_history(self):
+        # Imported here so the menus start without loading NumPy
+        from finance_manager.history import record_month
+
+        income_data = self.section("income.txt") or DEFAULT_INCOME_DATA
+        record_month(
+            self.user_name,
+            to_cents(income_data["TOTAl_NET_INCOME"]),
+            money_total(self.section("expenses_debits.txt")) + money_total(self.section("expenses_other.txt")),
+            money_total(self.section("credits.txt")),
+            money_total(self.section("investments.txt"))
+        )
+
+    # Function to save the ledger every LEDGER_FLUSH_SECONDS in the background
+    def start_timer(self):
+        if LEDGER_FLUSH_SECONDS <= 0 or self.closed:
+            return
+
+        self.timer = threading.Timer(LEDGER_FLUSH_SECONDS, self.timed_save)
+        self.timer.daemon = True
+        self.timer.start()
+
+    # Function called by the timer to save and schedule the next save
+    # A failed save keeps the changes to try again next time, instead of stopping the timer
+    def timed_save(self):
+        try:
+            self.save()
+        except Exception as error:
+            print(f"Could not save the changes of {self.user_name}, trying again later: {error}")
+        self.start_timer()
+
+    # Function to stop the timer and save any remaining changes
+    def close(self):
+        self.closed = True
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.save()
+
+
+# Function to get the ledger of a user, loading it the first time
+def get_user_ledger(user_name):
+    with open_ledgers_lock:
+        ledger = open_ledgers.get(user_name)
+        if ledger is None:
+            ledger = UserLedger(user_name).load()
+            ledger.start_timer()
+            open_ledgers[user_name] = ledger
+        return ledger
+
+
+# Function to save and forget the ledger of a user when they log out
+def close_user_ledger(user_name):
+    with open_ledgers_lock:
+        ledger = open_ledgers.pop(user_name, None)
+    if ledger is not None:
+        ledger.close()
+        get_storage().forget_user(user_name)
+
+
+# Function to save every loaded ledger (e.g. when a session ends without logging out)
+def save_open_ledgers():
+    with open_ledgers_lock:
+        ledgers = list(open_ledgers.values())
+    for ledger in ledgers:
+        ledger.save()
+
+
+# Function to get the ledger of a user for a session of the session server, which keeps it loaded after the session
+def start_ledger_session(user_name):
+    with open_ledgers_lock:
+        ledger = get_user_ledger(user_name)
+        ledger.sessions += 1
+        return ledger
+
+
+# Function to save a users ledger when their session of the session server ends, it stays loaded for a while
+def end_ledger_session(user_name):
+    with open_ledgers_lock:
+        ledger = open_ledgers.get(user_name)
+        if ledger is None:
+            return
+        ledger.sessions -= 1
+        ledger.last_used = time.monotonic()
+    ledger.save()
+
+
+# Function to close the ledgers that have no session: those idle for 'idle_seconds', and the least recently used
+# past 'max_idle'. Their changes are saved and their timers stopped. Returns the number of ledgers closed
+def evict_idle_ledgers(idle_seconds=LEDGER_IDLE_SECONDS, max_idle=MAX_IDLE_LEDGERS):
+    now = time.monotonic()
+
+    # Closed holding the lock, so a new session of the user can't load their files before they are saved
+    with open_ledgers_lock:
+        idle = sorted((ledger for ledger in open_ledgers.values() if ledger.sessions == 0), key=lambda ledger: ledger.last_used)
+        evicted = [
+            ledger for index, ledger in enumerate(idle)
+            if now - ledger.last_used >= idle_seconds or index < len(idle) - max_idle
+        ]
+
+        for ledger in evicted:
+            del open_ledgers[ledger.user_name]
+            try:
+                ledger.close()
+            except Exception as error:
+                print(f"Could not save the changes of {ledger.user_name}: {error}")
+            get_storage().forget_user(ledger.user_name)
+
+    return len(evicted)
@@ -0,0 +1,70 @@
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # Windows has no fcntl, so locking between processes is skipped there (threads are still locked by storage)
+    fcntl = None
+
+
+# Lock files kept open by each thread, so taking a lock is one flock call instead of an open and close as well
+OPEN_LOCK_FILES = 64
+
+# Per thread: 'paths' are the locks held (lock file path -> [open lock file, exclusive, times entered])
+# and 'files' the lock files kept open (lock file path -> open file)
+held_locks = threading.local()
+
+
+# Function to get the open lock file of a path for this thread, closing the oldest one when too many are open
+def get_lock_file(path):
+    if not hasattr(held_locks, "files"):
+        held_locks.files = {}
+
+    lock_file = held_locks.files.pop(path, None)
+    if lock_file is None:
+        if len(held_locks.files) >= OPEN_LOCK_FILES:
+            oldest_path = next(open_path for open_path in held_locks.files if open_path not in held_locks.paths)
+            held_locks.files.pop(oldest_path).close()
+        lock_file = open(path, "a")
+
+    # Most recently used last
+    held_locks.files[path] = lock_file
+    return lock_file
+
+
+# Class for a reader/writer lock between processes, using flock on a lock file
+# Many readers (exclusive=False) can hold it at once, a writer (exclusive=True) holds it alone
+# A thread that already holds the lock can enter it again, e.g. a write that reads the file first
+class FileLock:
+
+    def __init__(self, path, exclusive=True):
+        self.path = path
+        self.exclusive = exclusive
+
+    def __enter__(self):
+        if not hasattr(held_locks, "paths"):
+            held_locks.paths = {}
+
+        held = held_locks.paths.get(self.path)
+        if held is not None:
+            if self.exclusive and not held[1]:
+                raise RuntimeError(f"Can't take the write lock on {self.path} while holding its read lock.")
+            held[2] += 1
+            return self
+
+        lock_file = None
+        if fcntl is not None:
+            lock_file = get_lock_file(self.path)
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+
+        held_locks.paths[self.path] = [lock_file, self.exclusive, 1]
+        return self
+
+    def __exit__(self, *exception):
+        held = held_locks.paths[self.path]
+        held[2] -= 1
+
+        if held[2] == 0:
+            del held_locks.paths[self.path]
+            if held[0] is not None:
+                fcntl.flock(held[0].fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,1376 @@
+import os
+import sys
+import time
+import getpass
+
+from finance_manager.categories import CATEGORY_RULES_FILE_NAME, categorize_uncategorized, parse_category_rule
+from finance_manager.ledger import DEFAULT_INCOME_DATA, get_user_ledger
+from finance_manager.metrics import timed, waiting_for_input
+from finance_manager.reports import (
+    TextReportSink,
+    build_credit_report,
+    build_expense_report,
+    build_income_report,
+    build_investment_calculator_report,
+    build_investment_report,
+    build_transactions_report,
+    calculate_net_position,
+    generate_full_report
+)
+from finance_manager.storage import (
+    CREDIT_TERMS_FILE_NAME,
+    create_required_files,
+    find_user_password,
+    write_user_credentials_to_file
+)
+from finance_manager.transactions import (
+    TRANSACTION_KINDS,
+    add_transactions,
+    get_current_month,
+    make_transaction,
+    parse_month,
+    read_month_rollup,
+    read_rollups
+)
+
+
+# ------------------ Additional functions ------------------ #
+
+# Function to get numerical input from the user with error handling
+def get_numerical_input(prompt):
+
+    while True:
+        try:
+            value = float(input(prompt))
+            return value
+        except ValueError as e:
+            print(f"Invalid input: Please enter a valid numerical value.")
+
+
+# Function to read a password without showing it
+# Sessions run by the session server ask their client to read it, as getpass only works on the servers terminal
+def get_password_input(prompt):
+    read_password = getattr(sys.stdin, "read_password", None)
+    if read_password is not None:
+        return read_password(prompt)
+    with waiting_for_input():
+        return getpass.getpass(prompt)
+
+
+# Function to get a month ('YYYY-MM') from the user, pressing Enter gives the current month
+def get_month_input(prompt):
+
+    while True:
+        text = input(prompt)
+        if not text.strip():
+            return get_current_month()
+        try:
+            return parse_month(text)
+        except ValueError:
+            print("Invalid month: Please enter the month as YYYY-MM.")
+
+
+# Function to initialize financial data for a specific user
+@timed("ledger.initialize_financial_data")
+def initialize_financial_data(user_name):
+
+    ledger = get_user_ledger(user_name)
+    debits = ledger.section("expenses_debits.txt")
+    other_expenses = ledger.section("expenses_other.txt")
+    credits = ledger.section("credits.txt")
+    investments = ledger.section("investments.txt")
+
+    # Initializing income data values (Good practice to add values)
+    income_data = ledger.section("income.txt")
+    if not income_data:
+        income_data.update(DEFAULT_INCOME_DATA)
+
+    return debits, other_expenses, credits, investments, income_data
+
+
+# ------------------ Register & login functions ------------------ #
+
+# Function to register new users
+@timed("menu.register_user", exclude_input=True)
+def register_user():
+    print("\nRegister:")
+    while True:
+        username = input("Enter your username: ")
+        
+        # Checking if username already exists in the credential store and asking user to re-enter
+        if find_user_password(username) is not None:
+            print("Username already exists. Please choose a different username.")
+        else:
+            break
+
+    # Use getpass to securely input the password (Does not show when inputting into console: better security)
+    password = get_password_input("Enter your password: ")
+
+    # Write the new username and password to the users.txt file
+    write_user_credentials_to_file("data", username, password)
+
+    # Create necessary files for the new user
+    create_required_files(username)
+
+    print("Registration successful. You can now log in.")
+
+
+# Function to handle user login
+@timed("menu.login_user", exclude_input=True)
+def login_user():
+
+    print("\nLogin:")
+    username = input("Enter your username: ")
+    password = get_password_input("Enter your password: ")
+
+    # Check if the username and password match
+    stored_password = find_user_password(username)
+    if stored_password is not None and stored_password == password:
+        print(f"Welcome, {username}!")
+        return username  # Return the username if login is successful
+    else:
+        print("Invalid username or password. Please try again.")
+        return None
+
+# Function to authenticate the user
+def authenticate_user():
+
+    while True:
+        print("\nAuthentication Menu:")
+        print("1. Register")
+        print("2. Login")
+        print("0. Exit")
+
+        choice = input("Enter your choice (0-2): ")
+
+        if choice == "0":
+            print("Exiting the authentication system.")
+            return None
+
+        elif choice == "1":
+            register_user()
+
+        elif choice == "2":
+            username = login_user() # returning username when completing function
+            if username:
+                return username
+
+        else:
+            print("Invalid choice. Please enter a number between 0 and 2.")
+
+
+# ------------------ Functions for Managing Income, Expenses, Credits & Investments ------------------ #
+
+
+# ------------------ Income functions ------------------ #
+
+# Function to display an income report
+def view_income_report(income, Income_TAX, Income_Less_Tax, UIF, TOTAl_NET_INCOME):
+    TextReportSink(sys.stdout).write([build_income_report(income, Income_TAX, Income_Less_Tax, UIF, TOTAl_NET_INCOME)])
+
+
+# Function menu to manage income data for a specific user
+@timed("menu.manage_income", exclude_input=True)
+def manage_income(user_name):
+    
+    # Initialize financial data for the specific user
+    debits, other_expenses, credits, investments, income_data = initialize_financial_data(user_name)
+
+    while True:
+        print("\nManage Income:")
+        print("1. Income Calculator")
+        print("2. View Income Report")
+        print("3. Go back to the main menu")
+
+        choice = input("Enter your choice (1-3): ")
+
+        # Update income_data with the results of the income_calculator
+        if choice == "1":
+            
+            income, Income_TAX, Income_Less_Tax, UIF, TOTAl_NET_INCOME = income_calculator()
+
+            # Changed together under the ledger lock, so a save never writes half of the new values
+            ledger = get_user_ledger(user_name)
+            with ledger.lock:
+                income_data["income"] = income
+                income_data["Income_TAX"] = Income_TAX
+                income_data["Income_Less_Tax"] = Income_Less_Tax
+                income_data["UIF"] = UIF
+                income_data["TOTAl_NET_INCOME"] = TOTAl_NET_INCOME
+            
+                # Mark income data to be written to the file
+                ledger.mark_dirty("income.txt")
+
+        # Call the view_income_report function with appropriate parameters
+        elif choice == "2":
+            
+            view_income_report(
+                income_data["income"],
+                income_data["Income_TAX"],
+                float(income_data["Income_Less_Tax"]),
+                float(income_data["UIF"]),
+                float(income_data["TOTAl_NET_INCOME"])
+            )
+
+        # Break out of the loop to go back to the main menu
+        elif choice == "3":
+            break  
+
+        else:
+            print("Invalid choice. Please enter a number between 1 and 3.")
+
+    return income_data
+
+
+# Function to calculate income
+@timed("menu.income_calculator", exclude_input=True)
+def income_calculator():
+    
+    print("Income calculator.\n")
+
+    calculation_type = ""
+    while calculation_type != "days" and calculation_type != "hours":
+        calculation_type = input("How would you like to calculate your future income, via 'days' or 'hours' worked? ").lower()
+        if calculation_type != "days" and calculation_type != "hours":
+            print("Please enter 'days' or 'hours'.")
+
+    hourly_rate = get_numerical_input("What is your hourly income rate?: R")
+
+    double_day_income = ""
+    while double_day_income != "yes" and double_day_income != "no":
+        
+        # calculates whether public holidays/ Sundays should be double pay or 1.5 pay depending on company requirements
+        double_day_income = input("Are you generally scheduled to work on Sundays or public holidays? Enter 'yes' or 'no': ").lower() 
+        if double_day_income != "yes" and double_day_income != "no":
+            print("Please enter 'yes' or 'no'.")
+
+
+    # - Income questions -
+
+    total_hours_per_day = 1
+
+    # Questions for calculating income via days worked
+    if calculation_type == "days":
+        total_hours_per_day = get_numerical_input("How many paid hours per day do you work? ")
+        
+        worked = get_numerical_input("How many days have you worked for the month? ")
+        double_worked = get_numerical_input("How many days out of your total days are Sundays or public holidays? ")
+
+    # Questions for calculating income via hours per month worked
+    else:
+        worked = get_numerical_input("Enter the total amount of hours you have worked for the month: ")
+        double_worked = get_numerical_input("How many hours out of your total hours are on Sundays or public holidays? ")
+
+    # Imported here so the menus start without loading NumPy
+    from finance_manager.tax import calculate_income_batch, get_tax_table
+
+    results = calculate_income_batch(
+        [hourly_rate], [worked], [double_worked],
+        by_days=calculation_type == "days",
+        hours_per_day=total_hours_per_day,
+        works_sundays=double_day_income == "yes"
+    )
+    income, Income_TAX, Income_Less_Tax, UIF_deduction, TOTAl_NET_INCOME = (float(values[0]) for values in results)
+
+
+    # Results
+
+    print("\nGross income      = R{:.2f}".format(round(income, 2)))
+    print("Income TAX        = R{:.2f}".format(Income_TAX))
+    print("Income less Tax   = R{:.2f}".format(Income_Less_Tax))
+    print("UIF deduction     = R{:.2f}".format(UIF_deduction))
+    print("\nTotal net income  = R{:.2f}".format(TOTAl_NET_INCOME))
+
+    return income, Income_TAX, Income_Less_Tax, get_tax_table().uif, float(TOTAl_NET_INCOME)
+
+
+# ------------------ Expense functions ------------------ #
+
+# Function to display an expense report
+# With a user name, their transactions of the month (the current one by default) are shown below it
+def show_expense_report(debits, other_expenses, user_name=None, month=None):
+    reports = [build_expense_report(debits, other_expenses)]
+    if user_name is not None:
+        reports.append(build_transactions_report(read_rollups(user_name), month or get_current_month()))
+    TextReportSink(sys.stdout).write(reports)
+
+
+# Function to amend or remove an expense   
+@timed("menu.amend_or_remove_expense", exclude_input=True)
+def amend_or_remove_expense(expenses):
+    
+    print("\nChoose an expense to amend or remove:")
+
+    for index, (expense, value) in enumerate(expenses.items(), 1):
+        print(f"{index}. {expense}: R{float(value):.2f}")
+
+    choice = input("Enter the number of the expense to amend or remove (or '0' to go back): ")
+
+    if choice == "0":
+        return None  # Go back to the previous menu
+
+    try:
+        choice_index = int(choice)
+        selected_expense = list(expenses.keys())[choice_index - 1]
+
+        # Capture the value before removing
+        removed_value = expenses[selected_expense]
+
+        new_value = input(f"Enter the new value for {selected_expense} or 'r' to remove it: ")
+
+        
+        if new_value.lower() == 'r':
+            # Remove expense
+            del expenses[selected_expense]
+            print(f"{selected_expense} expense of R{float(removed_value):.2f} has been successfully removed.")
+        
+        else:
+            # Amend expense
+            expenses[selected_expense] = float(new_value)
+            print(f"{selected_expense} has been successfully amended to R{float(new_value):.2f}.")
+
+    except (ValueError, IndexError):
+        print("Invalid choice. Please enter a valid number.")
+
+    return amend_or_remove_expense(expenses)
+
+
+# Function to add an additional expense
+@timed("menu.add_additional_expense", exclude_input=True)
+def add_additional_expense(expenses):  
+    
+    expense_name = input("Enter the name of the expense: ")
+    expense_value = get_numerical_input("Enter the value of the expense: ")
+    expenses[expense_name] = expense_value
+    print(f"{expense_name} expense of R{expense_value:.2f} has been successfully added.")
+
+
+# Function to add a dated transaction to a users transaction ledger (saved straight away)
+@timed("menu.add_transaction", exclude_input=True)
+def add_transaction(user_name):
+
+    print("\nAdd transaction:")
+
+    while True:
+        date = input("Enter the date (YYYY-MM-DD, or press Enter for today): ").strip() or time.strftime("%Y-%m-%d")
+        try:
+            time.strptime(date, "%Y-%m-%d")
+            break
+        except ValueError:
+            print("Invalid date. Please enter the date as YYYY-MM-DD.")
+
+    category = input("Enter the category: ")
+    amount = get_numerical_input("Enter the amount: ")
+    memo = input("Enter a memo (optional): ")
+
+    while True:
+        kind = input(f"Enter the kind ({', '.join(TRANSACTION_KINDS)}, or press Enter for expense): ").strip().lower() or "expense"
+        if kind in TRANSACTION_KINDS:
+            break
+        print(f"Invalid kind. Please enter one of: {', '.join(TRANSACTION_KINDS)}.")
+
+    transaction = make_transaction(date, category, amount, memo, kind)
+    add_transactions(user_name, [transaction])
+    print(f"{transaction[4].capitalize()} of R{transaction[2] / 100:.2f} on {transaction[0]} has been added to {transaction[1]}.")
+
+
+# Function to show a users transactions of a month, by kind and category
+def show_transactions_report(user_name):
+    month = get_month_input("Enter the month (YYYY-MM, or press Enter for this month): ")
+    TextReportSink(sys.stdout).write([build_transactions_report(read_rollups(user_name), month)])
+
+
+# Function to show the menu of a users category rules and categorize their uncategorized transactions
+@timed("menu.categorize_menu", exclude_input=True)
+def categorize_menu(user_name):
+
+    ledger = get_user_ledger(user_name)
+    rules = ledger.section(CATEGORY_RULES_FILE_NAME)
+
+    while True:
+        print("\nCategorize transactions:")
+        print("1. Show category rules")
+        print("2. Add or change a rule")
+        print("3. Remove a rule")
+        print("4. Categorize uncategorized transactions")
+        print("0. Back to manage expenses")
+
+        choice = input("Enter your choice (0-4): ")
+
+        if choice == "0":
+            return
+
+        elif choice == "1":
+            show_category_rules(rules)
+
+        elif choice == "2":
+            print("\nRules are text in the description (e.g. 'woolworths'), 'regex:<expression>',")
+            print("'payee:<name>' or 'amount:<low>-<high>' (either amount can be left out). Rules can't contain commas.")
+            rule = input("Enter the rule: ").strip()
+            try:
+                parse_category_rule(rule)
+            except ValueError as error:
+                print(f"Invalid rule: {error}.")
+                continue
+            if "," in rule:
+                print("Invalid rule: rules can't contain commas.")
+                continue
+
+            category = " ".join(input("Enter the category: ").split())
+            if not category:
+                print("Invalid category: Please enter a category.")
+                continue
+
+            rules[rule] = category
+            ledger.mark_dirty(CATEGORY_RULES_FILE_NAME)
+            print(f"Transactions matching '{rule}' will be categorized as {category}.")
+
+        elif choice == "3":
+            show_category_rules(rules)
+            rule = input("Enter the rule to remove: ").strip()
+            if rule in rules:
+                del rules[rule]
+                ledger.mark_dirty(CATEGORY_RULES_FILE_NAME)
+                print(f"The rule '{rule}' has been removed.")
+            else:
+                print("Invalid rule. Please enter a rule from the list.")
+
+        elif choice == "4":
+            changed = categorize_uncategorized(user_name, rules)
+            print(f"{changed} uncategorized transactions have been given a category.")
+
+        else:
+            print("Invalid choice. Please enter a number between 0 and 4.")
+
+
+# Function to list a users category rules in the order they are applied
+def show_category_rules(rules):
+    if not rules:
+        print("\nNo category rules yet.")
+        return
+
+    print(f"\n{'Rule':<35} Category")
+    print("-" * 50)
+    for rule, category in rules.items():
+        print(f"{rule:<35} {category}")
+
+
+# Function to manage expenses data & menu for a specific user
+@timed("menu.manage_expenses", exclude_input=True)
+def manage_expenses(current_user):
+    
+    ledger = get_user_ledger(current_user)
+    debits_data = ledger.section("expenses_debits.txt")
+    other_expenses_data = ledger.section("expenses_other.txt")
+
+    while True:
+        
+        # Expense menu
+        print("\nManage Expenses:")
+        print("1. Show expense report")
+        print("2. Amend or remove expenses")
+        print("3. Add expense")
+        print("4. Add transaction")
+        print("5. Transactions by month")
+        print("6. Categorize uncategorized transactions")
+        print("7. Go back to the main menu")
+
+        choice = input("Enter your choice (1-7): ")
+
+        # Show expense report menu option
+        if choice == "1":
+            show_expense_report(debits_data, other_expenses_data, current_user)
+
+        # Amend or remove expenses menu option
+        elif choice == "2":
+            while True:
+                expense_type = input("Enter '1' for debit order expenses or '2' for additional expenses: ")
+
+                # Debit expenses
+                if expense_type == "1":
+                    print("\nDebit expenses:")
+                    selected_expense = amend_or_remove_expense(debits_data)
+                    if selected_expense is not None:
+                        new_value = input(f"Enter the new value for {selected_expense} or 'r' to remove it: ")
+                        if new_value.lower() == "r":
+                            del debits_data[selected_expense]
+                            print(f"{selected_expense} expense has been removed successfully.")
+                        else:
+                            try:
+                                debits_data[selected_expense] = float(new_value)
+                                print(f"{selected_expense} expense has been amended successfully.")
+                            except ValueError:
+                                print("Invalid input. Please enter a valid numerical value.")
+                                continue  # Ask the user to re-enter
+                    break  # Exit the loop once a valid choice is made
+                
+                # additional expenses
+                elif expense_type == "2":
+                    print("\nDebit expenses:")
+                    selected_expense = amend_or_remove_expense(other_expenses_data)
+                    if selected_expense is not None:
+                        new_value = input(f"Enter the new value for {selected_expense} or 'r' to remove it: ")
+                        if new_value.lower() == "r":
+                            del other_expenses_data[selected_expense]
+                            print(f"{selected_expense} has been removed successfully.")
+                        else:
+                            try:
+                                other_expenses_data[selected_expense] = float(new_value)
+                                print(f"{selected_expense} has been amended successfully.")
+                            except ValueError:
+                                print("Invalid input. Please enter a valid numerical value.")
+                                continue
+                    break
+
+                else:
+                    print("Invalid option. Please enter '1' or '2'.")
+
+            # Mark expenses data to be written to the files
+            ledger.mark_dirty("expenses_debits.txt")
+            ledger.mark_dirty("expenses_other.txt")
+
+        # Add expense menu option
+        elif choice == "3":
+            while True:
+                expense_type = input("Enter '1' for debit order expenses or '2' for additional expenses: ")
+
+                if expense_type == "1":
+                    print("\nAdd debit expense:\n")
+                    add_additional_expense(debits_data)
+                    break
+                elif expense_type == "2":
+                    print("\nAdd additional expense:\n")
+                    add_additional_expense(other_expenses_data)
+                    break
+                else:
+                    print("Invalid expense type. Please enter '1' or '2'.")
+
+            # Mark expenses data to be written to the files
+            ledger.mark_dirty("expenses_debits.txt")
+            ledger.mark_dirty("expenses_other.txt")
+
+        # Add transaction menu option
+        elif choice == "4":
+            add_transaction(current_user)
+
+        # Transactions by month menu option
+        elif choice == "5":
+            show_transactions_report(current_user)
+
+        # Categorize uncategorized transactions menu option
+        elif choice == "6":
+            categorize_menu(current_user)
+
+        # Back to main menu option
+        elif choice == "7":
+            return
+
+        else:
+            print("Invalid choice. Please enter a number between 1 and 7.")
+
+
+# ------------------ Credit functions ------------------ #
+
+# Function to display a credit report
+# With the users credit terms, each credits payments and interest are shown below it
+def show_credit_report(credits, credit_terms=None):
+    reports = [build_credit_report(credits)]
+
+    if credit_terms:
+        # Imported here so the menus start without loading NumPy
+        from finance_manager.amortization import build_credit_terms_report
+        reports.append(build_credit_terms_report(credits, credit_terms))
+
+    TextReportSink(sys.stdout).write(reports)
+
+
+# Function to amend or remove a credit
+@timed("menu.amend_or_remove_credit", exclude_input=True)
+def amend_or_remove_credit(credits_data, user_name):
+    
+    print("\nAmend or remove credit:")
+
+    if not credits_data:
+        print("There are no credits available.")
+        return None
+
+    print("\nChoose a credit to amend or remove:")
+
+    for index, (credit, value) in enumerate(credits_data.items(), 1):
+        print(f"{index}. {credit}: R{float(value):.2f}")
+
+    choice = input("Enter the number of the credit to amend or remove (or '0' to go back): ")
+
+    if choice == "0":
+        return None
+
+    try:
+        choice_index = int(choice)
+        selected_credit = list(credits_data.keys())[choice_index - 1]
+
+        while True:
+            new_value = input(f"Enter the new value for {selected_credit} or 'r' to remove it: ")
+
+            if new_value.lower() == 'r':
+                del credits_data[selected_credit]
+                print(f"{selected_credit} has been successfully removed.")
+                break
+            else:
+                try:
+                    credits_data[selected_credit] = float(new_value)
+                    print(f"{selected_credit} has been successfully amended to R{float(new_value):.2f}.")
+                    break
+                except ValueError:
+                    print("Invalid input. Please enter a valid numerical value.")
+
+        # Mark credits data to be written to the file
+        get_user_ledger(user_name).mark_dirty("credits.txt")
+
+    except (ValueError, IndexError):
+        print("Invalid choice. Please enter a valid number.")
+
+    return amend_or_remove_credit(credits_data, user_name)
+
+
+# Function to add a new credit
+@timed("menu.add_credit", exclude_input=True)
+def add_credit(credits_data, user_name):
+    
+    print("\nAdd credit:")
+    credit_name = input("Enter the name of the credit: ")
+
+    credit_value = get_numerical_input("Enter the value of the credit: ")
+
+    credits_data[credit_name] = credit_value
+    print(f"{credit_name} with a value of R{float(credit_value):.2f} has been successfully added.")
+
+    # Mark credits data to be written to the file
+    get_user_ledger(user_name).mark_dirty("credits.txt")
+
+
+# Function to choose one of the credits, returns its name or None to go back
+def choose_credit(credits_data, prompt):
+
+    for index, credit in enumerate(credits_data, 1):
+        print(f"{index}. {credit}: R{float(credits_data[credit]):.2f}")
+
+    choice = input(prompt)
+    if choice == "0":
+        return None
+
+    try:
+        return list(credits_data)[int(choice) - 1]
+    except (ValueError, IndexError):
+        print("Invalid choice. Please enter a valid number.")
+        return None
+
+
+# Function to set the principal, interest rate, term and payment frequency of a credit
+@timed("menu.set_credit_terms", exclude_input=True)
+def set_credit_terms(credits_data, user_name):
+
+    # Imported here so the menus start without loading NumPy
+    from finance_manager.amortization import PAYMENT_FREQUENCIES, format_credit_terms
+
+    if not credits_data:
+        print("There are no credits available.")
+        return
+
+    print("\nChoose a credit to set the terms of:")
+    selected_credit = choose_credit(credits_data, "Enter the number of the credit (or '0' to go back): ")
+    if selected_credit is None:
+        return
+
+    while True:
+        principal = get_numerical_input(f"Enter the amount borrowed for {selected_credit}: ")
+        rate = get_numerical_input("Enter the yearly interest rate (%): ")
+        term = get_numerical_input("Enter the term in months: ")
+        if principal >= 0 and rate >= 0 and term >= 1 and term == int(term):
+            break
+        print("Invalid input. The amount and rate can't be negative and the term must be a whole number of months.")
+
+    while True:
+        frequency = input(f"Enter the payment frequency ({', '.join(PAYMENT_FREQUENCIES)}, or press Enter for monthly): ").strip().lower() or "monthly"
+        if frequency in PAYMENT_FREQUENCIES:
+            break
+        print(f"Invalid frequency. Please enter one of: {', '.join(PAYMENT_FREQUENCIES)}.")
+
+    ledger = get_user_ledger(user_name)
+    ledger.section(CREDIT_TERMS_FILE_NAME)[selected_credit] = format_credit_terms(principal, rate, int(term), frequency)
+    ledger.mark_dirty(CREDIT_TERMS_FILE_NAME)
+    print(f"{selected_credit} is now R{principal:.2f} at {rate:.2f}% over {int(term)} months, paid {frequency}.")
+
+
+# Function to show the repayment schedule of a credit, a page at a time
+@timed("menu.show_repayment_schedule", exclude_input=True)
+def show_repayment_schedule(credits_data, user_name):
+
+    # Imported here so the menus start without loading NumPy
+    from finance_manager.amortization import iterate_schedule_pages, parse_credit_terms
+
+    credit_terms = get_user_ledger(user_name).section(CREDIT_TERMS_FILE_NAME)
+    credits_with_terms = {credit: value for credit, value in credits_data.items() if credit in credit_terms}
+
+    if not credits_with_terms:
+        print("\nNo credits have terms yet. Set them with 'Set credit terms' first.")
+        return
+
+    print("\nChoose a credit to show the repayment schedule of:")
+    selected_credit = choose_credit(credits_with_terms, "Enter the number of the credit (or '0' to go back): ")
+    if selected_credit is None:
+        return
+
+    try:
+        terms = parse_credit_terms(credit_terms[selected_credit])
+    except ValueError:
+        print(f"The terms of {selected_credit} could not be read. Please set them again.")
+        return
+
+    # Only the payments that are shown are worked out
+    for page in iterate_schedule_pages(selected_credit, *terms):
+        TextReportSink(sys.stdout).write([page])
+        if page["rows"][-1]["name"] != str(page["payments"]):
+            if input("Press Enter for the next payments (or '0' to go back): ") == "0":
+                break
+
+
+# Function to manage credits and menu for a specific user
+@timed("menu.manage_credits", exclude_input=True)
+def manage_credits(user_name):
+
+    # Construct the file path for credits.txt in the user's folder
+    credits_file_path = os.path.join("data", "Users", user_name, "credits.txt")
+
+    # Existing credits data from the users ledger
+    credits_data = get_user_ledger(user_name).section("credits.txt")
+
+    while True:
+        print("\nManage Credits:")
+        print("1. Show credit report")
+        print("2. Amend or remove credits")
+        print("3. Add credit")
+        print("4. Set credit terms")
+        print("5. Repayment schedule")
+        print("6. Go back to main menu")
+
+        choice = input("Enter your choice (1-6): ")
+        
+        # Show credit report menu option
+        if choice == "1":
+            show_credit_report(credits_data, get_user_ledger(user_name).section(CREDIT_TERMS_FILE_NAME))
+
+        # Amend or remove credit menu option
+        elif choice == "2":
+            selected_credit = amend_or_remove_credit(credits_data, user_name)
+            if selected_credit is not None:
+                new_value = input(f"Enter the new value for {selected_credit} or 'r' to remove it: ")
+                if new_value.lower() == "r":
+                    del credits_data[selected_credit]
+                else:
+                    credits_data[selected_credit] = float(new_value)
+
+        # Add new credit menu option
+        elif choice == "3":
+            add_credit(credits_data, user_name)
+
+        # Set credit terms menu option
+        elif choice == "4":
+            set_credit_terms(credits_data, user_name)
+
+        # Repayment schedule menu option
+        elif choice == "5":
+            show_repayment_schedule(credits_data, user_name)
+
+        # Go back to the main menu option
+        elif choice == "6":
+            break  
+
+        else:
+            print("Invalid choice. Please enter a number between 1 and 6.")
+
+
+# ------------------ Investment functions ------------------ #
+
+
+# Function to manage investments data and menu
+@timed("menu.manage_investments", exclude_input=True)
+def manage_investments(user_name):
+    
+    
+    # Construct the file path for investments.txt in the user's folder
+    investments_file_path = os.path.join("data", "Users", user_name, "investments.txt")
+
+    # Existing investments data from the users ledger
+    ledger = get_user_ledger(user_name)
+    investments_data = ledger.section("investments.txt")
+
+    while True:
+        print("\nManage Investments:")
+        print("1. View investments")
+        print("2. Amend or remove investments")
+        print("3. Add investment")
+        print("4. Percentage Calculator and Report")
+        print("5. Go back to main menu")
+
+        choice = input("Enter your choice (1-5): ")
+
+        if choice == "1":
+            show_investment_report(investments_data)
+
+        elif choice == "2":
+            selected_investment = amend_or_remove_investment(investments_data, user_name)
+            if selected_investment is None:
+                continue
+            ledger.mark_dirty("investments.txt")
+
+        elif choice == "3":
+            add_investment(investments_data)
+            ledger.mark_dirty("investments.txt")
+
+        elif choice == "4":
+            percentage_calculator_menu(user_name)
+
+        elif choice == "5":
+            ledger.mark_dirty("investments.txt")
+            break
+
+        else:
+            print("Invalid choice. Please enter a number between 1 and 5.")
+
+
+# Function to display an investment report
+def show_investment_report(investments):
+    TextReportSink(sys.stdout).write([build_investment_report(investments)])
+
+
+# Function to amend or remove an investment
+@timed("menu.amend_or_remove_investment", exclude_input=True)
+def amend_or_remove_investment(investments, user_name):
+    
+    if not investments:
+        print("\nThere are no investments available to amend or remove.")
+        return None  # Go back to the previous menu
+
+    print("\nAmend or remove investment:")
+    print("\nChoose an investment to amend or remove:")
+
+    for index, (investment, value) in enumerate(investments.items(), 1):
+        print(f"{index}. {investment}: R{float(value):.2f}")
+
+    choice = input("Enter the number of the investment to amend or remove (or '0' to go back): ")
+
+    if choice == "0":
+        return None  # Go back to the previous menu
+
+    try:
+        choice_index = int(choice)
+        selected_investment = list(investments.keys())[choice_index - 1]
+
+        while True:
+            new_value = input(f"Enter the new value for {selected_investment} or 'r' to remove it: ")
+
+            if new_value.lower() == 'r':
+                print(f"{selected_investment} investment has been removed successfully.")
+                del investments[selected_investment]
+                break
+            else:
+                try:
+                    new_value = float(new_value)
+                    investments[selected_investment] = new_value
+                    print(f"\n{selected_investment} value has been updated to R{new_value:.2f}.")
+                    break
+                except ValueError:
+                    print("\nInvalid input. Please enter a valid numerical value for the investment or 'r' to remove it.")
+
+        # Mark the investments.txt file to be updated
+        get_user_ledger(user_name).mark_dirty("investments.txt")
+
+    except (ValueError, IndexError):
+        print("\nInvalid choice. Please enter a valid number.")
+        return amend_or_remove_investment(investments, user_name)
+
+
+# Function to add a new investment
+@timed("menu.add_investment", exclude_input=True)
+def add_investment(investments):
+    
+    print("\nAdd investment:")
+    investment_name = input("Enter the name of the investment: ")
+    
+    investment_value = get_numerical_input(f"Enter the value for {investment_name}: ")
+
+    investments[investment_name] = investment_value
+    print(f"\n{investment_name} of R{investment_value:.2f} has been added successfully.")
+
+
+#------------Percentage Calculator------------#
+
+# Function to read data from file
+def get_calculator_file_path(user_name):
+    return os.path.join("data", "Users", user_name, "investment_calculator.txt")
+
+
+# Function to show investment calculator menu
+@timed("menu.percentage_calculator_menu", exclude_input=True)
+def percentage_calculator_menu(user_name):
+    
+    # Construct the file path for investment_calculator.txt in the user's folder
+    get_calculator_file_path(user_name)  
+    
+    # Existing calculator data from the users ledger (kept up to date by the calculator functions)
+    calculator_data = get_user_ledger(user_name).section("investment_calculator.txt")
+
+    # Assuming original_total_budget is defined somewhere in your code
+    original_total_budget = 0
+
+    while True:
+
+        print("\nPercentage Calculator:")
+        print("1. Create a new investment percentage calculation")
+        print("2. Amend or remove investments from current investment calculation data")
+        print("3. View investment calculator report")
+        print("4. Set expected return and volatility of an investment")
+        print("5. Project investment growth")
+        print("6. Go back to the main menu")
+
+        sub_choice = input("Enter your choice (1-6): ")
+
+        if sub_choice == "1":
+            create_new_investment_calculator(user_name, calculator_data)
+
+        elif sub_choice == "2":
+            amend_or_remove_investment_calculator(user_name, calculator_data, original_total_budget)
+
+        elif sub_choice == "3":
+            view_investment_calculator_report(calculator_data)
+
+        elif sub_choice == "4":
+            set_investment_return(user_name, calculator_data)
+
+        elif sub_choice == "5":
+            project_investment_growth(user_name, calculator_data)
+
+        elif sub_choice == "6":
+            break  # Go back to the main menu
+
+        else:
+            print("Invalid choice. Please enter a number between 1 and 6.")
+
+
+@timed("menu.create_new_investment_calculator", exclude_input=True)
+def create_new_investment_calculator(user_name, calculator_data):
+    # Function to create new investment calculator
+    
+    # Construct the file path for investment_calculator.txt in the user's folder
+    get_calculator_file_path(user_name)
+
+    # Clear the existing data in the calculator_data
+    calculator_data.clear()
+
+    total_budget = float(get_numerical_input("Enter the total investment budget: "))
+    remaining_budget = total_budget
+
+    print("\nPercentage Calculator:")
+    new_investments = {}
+
+    while True:
+        print(f"\nRemaining budget: R{remaining_budget:.2f}/R{total_budget:.2f}")
+        print(f"Remaining percentage: {remaining_budget / total_budget * 100:.2f}%")
+        print("\nAdd an investment or type 'done' to finish:")
+        investment_name = input("Enter the name of the investment: ")
+
+        if investment_name.lower() == 'done':
+            # Update the investment_calculator.txt data
+            calculator_data.update({"total_budget": total_budget, **new_investments})
+            get_user_ledger(user_name).mark_dirty("investment_calculator.txt")
+            print("\nInvestment calculator has been updated")
+            break
+
+        try:
+            investment_percentage = float(input(f"Enter the percentage for {investment_name} (remaining: {round(remaining_budget / total_budget * 100, 2)}%): "))
+            if  0 <= investment_percentage <= remaining_budget:
+                investment_value = (total_budget * investment_percentage) / 100
+                if investment_value <= remaining_budget:
+                    new_investments[investment_name] = investment_value
+                    remaining_budget -= investment_value
+                    print(f"\nR{investment_value:.2f} has been allocated to {investment_name} for your investment plan")
+                else:
+                    print(f"\nInvalid input. The calculated value exceeds the remaining balance.")
+            else:
+                print(f"\nInvalid input. Percentage must be between 0 and {remaining_budget:.2f}. Percentage exceeds remaining balance.")
+
+        except ValueError:
+            print("\nInvalid input. Please enter the new investment name and a valid numerical value for the percentage.")
+
+
+    print("\nPercentage Calculator Report:")
+    print(f"\n{'Total Investment Budget:':<25} R{total_budget:>8.2f}")
+
+    # Calculate and print allocated and unallocated percentages
+    allocated_percentage = (total_budget - remaining_budget) / total_budget * 100
+    unallocated_percentage = remaining_budget / total_budget * 100
+
+    print(f"{'Allocated Percentage:':<25} R{total_budget - remaining_budget:>8.2f} ({allocated_percentage:.0f}%)")
+    print(f"{'Unallocated Percentage:':<25} R{remaining_budget:>8.2f} ({unallocated_percentage:.0f}%)")
+
+
+    # Print individual investments
+    print(f"\n{'Investments':<20} {'Value (R)':>8}")
+    print("-" * 50)
+    
+    total_value = 0
+    for investment, value in new_investments.items():
+        total_value += value
+        percentage = (value / total_budget) * 100
+        print(f"{investment:<20} R{value:.2f} ({percentage:.2f}%)")
+        
+    print(f"\n{'Total':<20} R{total_value:.2f}")
+
+    # Update the investment_calculator.txt data
+    calculator_data.update({"total_budget": total_budget, **new_investments})
+    get_user_ledger(user_name).mark_dirty("investment_calculator.txt")
+
+
+# Function to amend or remove investment calculator investments
+@timed("menu.amend_or_remove_investment_calculator", exclude_input=True)
+def amend_or_remove_investment_calculator(user_name, calculator_data, original_total_budget):
+    
+    # Construct the file path for investment_calculator.txt in the user's folder
+    calculator_file_path = os.path.join("data", "Users", user_name, "investment_calculator.txt")
+
+    # Existing calculator data from the users ledger
+    calculator_data = get_user_ledger(user_name).section("investment_calculator.txt")
+
+    # Check if there are no investments in the calculator
+    if not calculator_data or len(calculator_data) == 1:
+        print("\nThere are no investments in the investment calculator available.")
+        return
+
+    # Extract total budget from the first line
+    total_budget = float(calculator_data.get("total_budget", original_total_budget))
+    remaining_budget = total_budget  # Initialize remaining budget
+
+    print("\nAmend or remove investment from the current calculation:")
+    print("Choose an investment to amend or remove:")
+    
+    print(f"\n{'Total budget':<23} R{total_budget:>8.2f}")
+    print(f"\n{'Investments':<23} {'Value (R)':>8}")
+    print("-" * 50)
+
+    # Print investments excluding 'total_budget' and start enumeration from 1
+    for index, (investment, value) in enumerate(list(calculator_data.items())[1:], 1):
+        value = float(value)
+        percentage = (value / total_budget) * 100
+        print(f"{index}. {investment:<20} R{value:>8.2f} ({percentage:.2f}%)")
+
+    choice = get_numerical_input("\nEnter the number of the investment to amend or remove (or '0' to go back): ")
+
+    if choice == "0":
+        return
+
+    try:
+        choice_index = int(choice)
+
+        selected_investment = list(calculator_data.keys())[choice_index]
+
+        original_value = float(calculator_data[selected_investment])
+        original_percentage = (original_value / total_budget) * 100
+
+        allocated_amount = sum(float(value) for key, value in calculator_data.items() if key != "total_budget")
+        unallocated_amount = total_budget - allocated_amount
+
+        print(f"\nUnallocated amount: R{unallocated_amount:.2f} ({(unallocated_amount / total_budget) * 100:.2f}%)")
+
+        # Declare max_allowed_value here
+        max_allowed_value = (unallocated_amount + original_value) / total_budget * 100
+
+        while True:
+            new_value = input(f"Enter the new percentage value for {selected_investment} or 'r' to remove it "
+                            f"({max_allowed_value:.2f}% unallocated including {selected_investment} investment): ")
+
+            if new_value.lower() == "r":
+                remaining_budget += original_value  # Add back the value to remaining budget
+                del calculator_data[selected_investment]
+                break
+
+            try:
+                new_value = float(new_value)
+                max_allowed_value = (unallocated_amount + original_value) / total_budget * 100  # Include original value
+                if 0 <= new_value <= max_allowed_value:
+                    remaining_budget += original_value  # Add back the original value to remaining budget
+                    remaining_budget -= new_value  # Deduct the new value from remaining budget
+                    calculator_data[selected_investment] = (total_budget * new_value) / 100
+                    print(f"{selected_investment} value has been updated to {new_value:.2f}%.")
+                    
+                    # Mark the investment_calculator.txt file to be updated with the modified data
+                    get_user_ledger(user_name).mark_dirty("investment_calculator.txt")
+                    break
+                else:
+                    print(f"Invalid input. Value must be between 0 and {max_allowed_value:.2f}.")
+            except ValueError:
+                print("Invalid input. Please enter a valid numerical value for the investment or 'r' to remove it.")
+
+        # Mark the investment_calculator.txt file to be updated
+        get_user_ledger(user_name).mark_dirty("investment_calculator.txt")
+
+    except (ValueError, IndexError):
+        print("Invalid choice. Please enter a valid number.")
+        amend_or_remove_investment_calculator(user_name, calculator_data, original_total_budget)
+
+
+def view_investment_calculator_report(calculator_data):
+    # Function to view investment calculator report
+    TextReportSink(sys.stdout).write([build_investment_calculator_report(calculator_data)])
+
+
+# Function to set the expected yearly return and volatility of an investment in the calculation
+@timed("menu.set_investment_return", exclude_input=True)
+def set_investment_return(user_name, calculator_data):
+
+    # Imported here so the menus start without loading NumPy
+    from finance_manager.projections import (
+        DEFAULT_EXPECTED_RETURN,
+        DEFAULT_VOLATILITY,
+        RETURNS_FILE_NAME,
+        format_return_assumption,
+        parse_return_assumption
+    )
+
+    investments = [name for name in calculator_data if name != "total_budget"]
+    if not investments:
+        print("\nThere are no investments in the investment calculator available.")
+        return
+
+    ledger = get_user_ledger(user_name)
+    returns_data = ledger.section(RETURNS_FILE_NAME)
+
+    print(f"\n{'Investments':<23} {'Return':>8} {'Volatility':>11}")
+    print("-" * 50)
+    for index, investment in enumerate(investments, 1):
+        try:
+            expected_return, volatility = parse_return_assumption(returns_data[investment])
+        except (KeyError, ValueError):
+            expected_return, volatility = DEFAULT_EXPECTED_RETURN, DEFAULT_VOLATILITY
+        print(f"{index}. {investment:<20} {expected_return:>7.2f}% {volatility:>10.2f}%")
+
+    choice = input("\nEnter the number of the investment to set (or '0' to go back): ")
+    if choice == "0":
+        return
+
+    try:
+        selected_investment = investments[int(choice) - 1]
+    except (ValueError, IndexError):
+        print("Invalid choice. Please enter a valid number.")
+        return
+
+    expected_return = get_numerical_input(f"Enter the expected yearly return of {selected_investment} (%): ")
+    while True:
+        volatility = get_numerical_input(f"Enter the yearly volatility of {selected_investment} (%): ")
+        if volatility >= 0:
+            break
+        print("Invalid input. Volatility can't be negative.")
+
+    returns_data[selected_investment] = format_return_assumption(expected_return, volatility)
+    ledger.mark_dirty(RETURNS_FILE_NAME)
+    print(f"{selected_investment} is expected to return {expected_return:.2f}% a year with {volatility:.2f}% volatility.")
+
+
+# Function to project what the investment calculation grows into, with bands of likely values
+@timed("menu.project_investment_growth", exclude_input=True)
+def project_investment_growth(user_name, calculator_data):
+
+    # Imported here so the menus start without loading NumPy
+    from finance_manager.projections import MAX_PROJECTION_YEARS, RETURNS_FILE_NAME, build_projection_report
+
+    while True:
+        years = get_numerical_input(f"Enter the number of years to project (1-{MAX_PROJECTION_YEARS}): ")
+        if years == int(years) and 1 <= years <= MAX_PROJECTION_YEARS:
+            break
+        print(f"Invalid input. Please enter a whole number of years between 1 and {MAX_PROJECTION_YEARS}.")
+
+    returns_data = get_user_ledger(user_name).section(RETURNS_FILE_NAME)
+    TextReportSink(sys.stdout).write([build_projection_report(calculator_data, returns_data, int(years))])
+
+
+# ------------------ Generate reports Functions ------------------ #
+
+# Modified generate_report function
+@timed("menu.generate_report", exclude_input=True)
+def generate_report(current_user):
+    user_name = current_user
+    debits, other_expenses, credits, investments, income_data = initialize_financial_data(user_name)
+
+    while True:
+        print("\nGenerate report:")
+        print("1. Income report")
+        print("2. Expense report")
+        print("3. Credit report")
+        print("4. Investment report")
+        print("5. Calculate remaining balance")
+        print("6. Full finance report")
+        print("7. Monthly history")
+        print("8. Cash-flow forecast")
+        print("0. Back to main menu")
+
+        choice = input("Enter your choice (0-8): ")
+
+        if choice == "0":
+            return
+
+        elif choice == "1":
+            view_income_report(
+                income_data["income"],
+                income_data["Income_TAX"],
+                float(income_data["Income_Less_Tax"]),
+                float(income_data["UIF"]),
+                float(income_data["TOTAl_NET_INCOME"]))
+
+        elif choice == "2":
+            show_expense_report(debits, other_expenses, user_name)
+
+        elif choice == "3":
+            show_credit_report(credits, get_user_ledger(user_name).section(CREDIT_TERMS_FILE_NAME))
+
+        elif choice == "4":
+            show_investment_report(investments)
+
+        elif choice == "5":
+            month = get_month_input("Enter the month for its transactions (YYYY-MM, or press Enter for this month): ")
+            calculate_net_position(
+                income_data, debits, other_expenses, credits, investments,
+                month=month, month_rollup=read_month_rollup(user_name, month),
+                credit_terms=get_user_ledger(user_name).section(CREDIT_TERMS_FILE_NAME)
+            )
+
+        elif choice == "6":
+            generate_full_report(income_data, debits, other_expenses, credits, investments)
+
+        elif choice == "7":
+            # Save first so this month shows the latest totals
+            get_user_ledger(user_name).save()
+
+            # Imported here so the menus start without loading NumPy
+            from finance_manager.history import build_history_report
+            TextReportSink(sys.stdout).write([build_history_report(user_name)])
+
+        elif choice == "8":
+            forecast_menu(user_name)
+
+        else:
+            print("Invalid choice. Please enter a number between 0 and 8.")
+
+
+# Function to show the cash-flow forecast menu
+@timed("menu.forecast_menu", exclude_input=True)
+def forecast_menu(user_name):
+
+    while True:
+        print("\nCash-flow forecast:")
+        print("1. Show forecast")
+        print("2. Set start, end and escalation of an item")
+        print("0. Back to generate report")
+
+        choice = input("Enter your choice (0-2): ")
+
+        if choice == "0":
+            return
+
+        elif choice == "1":
+            show_forecast(user_name)
+
+        elif choice == "2":
+            set_forecast_terms(user_name)
+
+        else:
+            print("Invalid choice. Please enter a number between 0 and 2.")
+
+
+# Function to get the forecast items of a user from their ledger, see forecast.get_forecast_items
+def get_user_forecast_items(user_name):
+
+    # Imported here so the menus start without loading NumPy
+    from finance_manager.forecast import get_forecast_items
+
+    debits, other_expenses, credits, investments, income_data = initialize_financial_data(user_name)
+    return get_forecast_items(
+        income_data, debits, other_expenses, credits, investments,
+        get_user_ledger(user_name).section(CREDIT_TERMS_FILE_NAME)
+    )
+
+
+# Function to show a users cash-flow forecast and the first month their balance goes below zero
+def show_forecast(user_name):
+
+    # Imported here so the menus start without loading NumPy
+    from finance_manager.forecast import FORECAST_TERMS_FILE_NAME, MAX_FORECAST_YEARS, build_forecast_report
+
+    while True:
+        years = get_numerical_input(f"Enter the number of years to forecast (1-{MAX_FORECAST_YEARS}): ")
+        if years == int(years) and 1 <= years <= MAX_FORECAST_YEARS:
+            break
+        print(f"Invalid input. Please enter a whole number of years between 1 and {MAX_FORECAST_YEARS}.")
+
+    opening_balance = get_numerical_input("Enter the money you have now: ")
+
+    forecast_terms = get_user_ledger(user_name).section(FORECAST_TERMS_FILE_NAME)
+    report = build_forecast_report(get_user_forecast_items(user_name), forecast_terms, int(years), opening_balance)
+    TextReportSink(sys.stdout).write([report])
+
+
+# Function to set when an item of the forecast starts and ends and how much it grows every year
+@timed("menu.set_forecast_terms", exclude_input=True)
+def set_forecast_terms(user_name):
+
+    # Imported here so the menus start without loading NumPy
+    from finance_manager.forecast import FORECAST_TERMS_FILE_NAME, format_forecast_terms, parse_forecast_month
+
+    items = get_user_forecast_items(user_name)
+    ledger = get_user_ledger(user_name)
+    forecast_terms = ledger.section(FORECAST_TERMS_FILE_NAME)
+
+    print(f"\n{'Items':<35} {'Per month (R)':>14}  Start|End|Escalation")
+    print("-" * 75)
+    for index, (part, name, cents, duration) in enumerate(items, 1):
+        print(f"{index}. {part + ': ' + name:<32} R{cents / 100:>13.2f}  {forecast_terms.get(f'{part}:{name}', '')}")
+
+    choice = input("\nEnter the number of the item to set (or '0' to go back): ")
+    if choice == "0":
+        return
+
+    try:
+        part, name, cents, duration = items[int(choice) - 1]
+    except (ValueError, IndexError):
+        print("Invalid choice. Please enter a valid number.")
+        return
+
+    months = []
+    for prompt in ("Enter the first month (YYYY-MM, or press Enter for now): ", "Enter the last month (YYYY-MM, or press Enter for no end): "):
+        while True:
+            try:
+                months.append(parse_forecast_month(input(prompt)))
+                break
+            except ValueError:
+                print("Invalid month: Please enter the month as YYYY-MM.")
+
+    escalation = get_numerical_input("Enter how much it grows every year (%): ")
+
+    forecast_terms[f"{part}:{name}"] = format_forecast_terms(months[0], months[1], escalation)
+    ledger.mark_dirty(FORECAST_TERMS_FILE_NAME)
+    print(f"The forecast settings of {name} have been saved.")
+
+
+# ------------------ Main menu Functions ------------------ #
+
+# Function to display the main menu and get user choice
+def main_menu(current_user):
+    print("\nMain Menu:")
+    print("1. Manage Income")
+    print("2. Manage Expenses")
+    print("3. Manage Credits")
+    print("4. Manage Investments")
+    print("5. Generate report")
+    print("6. Save changes")
+    print("0. Logout")
+
+    choice = input("Enter your choice (0-6): ")
+    return choice
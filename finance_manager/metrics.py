@@ -0,0 +1,166 @@
+import io
+import os
+import json
+import time
+import threading
+import functools
+
+
+# ------------------ Metrics ------------------ #
+
+# Set FINANCE_MANAGER_METRICS=1 (or pass --metrics) to time storage calls, menu actions and report renders
+metrics_enabled = os.environ.get("FINANCE_MANAGER_METRICS", "") not in ("", "0")
+
+# File every session's metrics are appended to (one JSON object per line) when the user logs out
+METRICS_FILE = os.environ.get("FINANCE_MANAGER_METRICS_FILE", os.path.join("data", "metrics.jsonl"))
+
+# Metrics of the session running on the current thread, so sessions of the session server are kept apart
+# timings: name -> list of milliseconds, counters: name -> running count, input_wait: seconds spent waiting for input
+session_metrics = threading.local()
+
+
+# Function to start recording metrics (used by the --metrics option)
+def enable_metrics():
+    global metrics_enabled
+    metrics_enabled = True
+
+
+# Function to get the metrics of the current session, started empty on each thread
+def get_session_metrics():
+    if not hasattr(session_metrics, "timings"):
+        reset_metrics()
+    return session_metrics
+
+
+# Function to start counting the current sessions metrics again
+def reset_metrics():
+    session_metrics.timings = {}
+    session_metrics.counters = {}
+    session_metrics.input_wait = 0.0
+
+
+# Function to record how long one call took
+def record_timing(name, milliseconds):
+    get_session_metrics().timings.setdefault(name, []).append(milliseconds)
+
+
+# Function to add to a counter, e.g. the number of bytes read
+def add_count(name, amount):
+    counters = get_session_metrics().counters
+    counters[name] = counters.get(name, 0) + amount
+
+
+# Function to get the seconds the current session has spent waiting for its user to type
+def get_input_wait():
+    return get_session_metrics().input_wait if metrics_enabled else 0.0
+
+
+# Class to count a block of code as time spent waiting for the user: 'with waiting_for_input():'
+class waiting_for_input:
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        if metrics_enabled:
+            get_session_metrics().input_wait += time.perf_counter() - self.start
+
+
+# Class that stands in for sys.stdin while metrics are enabled and counts the time input() waits for a line
+# It has no file number, so input() reads through readline instead of the terminal (line editing is left out)
+class InputWaitStream:
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __getattr__(self, attribute):
+        return getattr(self.stream, attribute)
+
+    def fileno(self):
+        raise io.UnsupportedOperation("fileno")
+
+    def readline(self, size=-1):
+        with waiting_for_input():
+            return self.stream.readline(size)
+
+
+# Class to time a block of code: 'with measure("report.text"):'
+class measure:
+
+    def __init__(self, name, clock=time.perf_counter):
+        self.name = name
+        self.clock = clock
+
+    def __enter__(self):
+        if metrics_enabled:
+            self.start = self.clock()
+        return self
+
+    def __exit__(self, *exception):
+        if metrics_enabled:
+            record_timing(self.name, (self.clock() - self.start) * 1000)
+
+
+# Function to make a decorator that times every call of a function while metrics are enabled
+# Menu actions pass 'exclude_input' so the time spent waiting for the user to type is left out (see waiting_for_input)
+def timed(name, clock=time.perf_counter, exclude_input=False):
+    def decorate(function):
+
+        @functools.wraps(function)
+        def wrapper(*arguments, **keyword_arguments):
+            if not metrics_enabled:
+                return function(*arguments, **keyword_arguments)
+
+            start = clock()
+            input_wait = get_input_wait() if exclude_input else 0.0
+            try:
+                return function(*arguments, **keyword_arguments)
+            finally:
+                elapsed = clock() - start
+                if exclude_input:
+                    elapsed -= get_input_wait() - input_wait
+                record_timing(name, elapsed * 1000)
+
+        return wrapper
+    return decorate
+
+
+# Function to get a percentile from a sorted list of timings (nearest rank)
+def get_percentile(sorted_values, percent):
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+# Function to summarise the current sessions timings as call counts, totals and p50/p95/p99
+def summarise_metrics():
+    metrics = get_session_metrics()
+    summary = {}
+    for name, values in sorted(metrics.timings.items()):
+        values = sorted(values)
+        summary[name] = {
+            "calls": len(values),
+            "total_ms": round(sum(values), 3),
+            "p50_ms": round(get_percentile(values, 50), 3),
+            "p95_ms": round(get_percentile(values, 95), 3),
+            "p99_ms": round(get_percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3)
+        }
+    return {"timings": summary, "counters": dict(metrics.counters)}
+
+
+# Function to append the metrics of the current session to METRICS_FILE and start counting again
+def dump_metrics(session_name):
+    metrics = get_session_metrics()
+    if not metrics_enabled or not (metrics.timings or metrics.counters):
+        return
+
+    record = {"session": session_name, "ended": time.strftime("%Y-%m-%dT%H:%M:%S"), **summarise_metrics()}
+
+    os.makedirs(os.path.dirname(METRICS_FILE) or ".", exist_ok=True)
+    with open(METRICS_FILE, "a") as file:
+        file.write(json.dumps(record) + "\n")
+
+    reset_metrics()
+
+    print(f"Session metrics written to {METRICS_FILE}.")
@@ -0,0 +1,200 @@
+import sys
+import array
+import threading
+import collections.abc
+
+
+# ------------------ Money values ------------------ #
+
+# Files whose values are amounts of money, kept as whole cents once loaded
+MONEY_FILES = {
+    "expenses_debits.txt",
+    "expenses_other.txt",
+    "credits.txt",
+    "investments.txt",
+    "investment_calculator.txt"
+}
+
+
+# Names left out of the aggregates of a money file: the investment calculators budget isn't an amount of its own
+AGGREGATE_SKIPPED_NAMES = {
+    "investment_calculator.txt": frozenset({"total_budget"})
+}
+
+
+# Function to convert an amount in rands (number or text) to whole cents, rounded the same way reports display it
+def to_cents(value):
+    return int(f"{float(value):.2f}".replace(".", ""))
+
+
+# Class to hold the names and amounts of a money file: names are interned and amounts are int64 cents in an array
+# It behaves like the dictionary read_from_file returns, giving amounts back as rands
+# Changes are made holding 'lock' (a users ledger passes its own), so a background save never sees half a change
+# A removed name leaves a gap (None) in the arrays so nothing has to move, the gaps are closed once they are half of them
+# Amounts of the 'skipped' names are kept but left out of the aggregates
+class MoneySection(collections.abc.MutableMapping):
+
+    def __init__(self, data=None, lock=None, skipped=()):
+        self.lock = lock or threading.RLock()
+        self.skipped = frozenset(skipped)
+        self.names = []
+        self.cents = array.array("q")
+        self.positions = {}
+        self.gaps = 0
+
+        # Running aggregates, the minimum and maximum are only rescanned after the current one is removed or moved away
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        self.extremes_stale = False
+
+        if data:
+            for name, value in data.items():
+                self[name] = value
+
+    def __getitem__(self, name):
+        return self.cents[self.positions[name]] / 100
+
+    def __setitem__(self, name, value):
+        self.set_cents(name, to_cents(value))
+
+    def __delitem__(self, name):
+        with self.lock:
+            position = self.positions.pop(name)
+            if name not in self.skipped:
+                self.remove_from_aggregates(self.cents[position])
+            self.names[position] = None
+            self.cents[position] = 0
+            self.gaps += 1
+
+            if self.gaps * 2 > len(self.names):
+                self.compact()
+
+    def __iter__(self):
+        return (name for name in self.names if name is not None)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __repr__(self):
+        return f"MoneySection({dict(self.items())})"
+
+    # Function to close the gaps left by removed names, keeping the order of the others
+    def compact(self):
+        with self.lock:
+            pairs = list(self.items_cents())
+            self.names = [name for name, cents in pairs]
+            self.cents = array.array("q", (cents for name, cents in pairs))
+            self.positions = {name: index for index, name in enumerate(self.names)}
+            self.gaps = 0
+
+    # Function to set an amount in cents, new names are added to the end like a dictionary
+    def set_cents(self, name, cents):
+        with self.lock:
+            position = self.positions.get(name)
+
+            if position is None:
+                name = sys.intern(str(name))
+                self.positions[name] = len(self.names)
+                self.names.append(name)
+                self.cents.append(cents)
+            else:
+                if name not in self.skipped:
+                    self.remove_from_aggregates(self.cents[position])
+                self.cents[position] = cents
+
+            if name not in self.skipped:
+                self.add_to_aggregates(cents)
+
+    # Function to include an amount in the running aggregates
+    def add_to_aggregates(self, cents):
+        self.total += cents
+        if not self.extremes_stale:
+            self.minimum = cents if self.minimum is None else min(self.minimum, cents)
+            self.maximum = cents if self.maximum is None else max(self.maximum, cents)
+
+    # Function to take an amount out of the running aggregates
+    def remove_from_aggregates(self, cents):
+        self.total -= cents
+        if cents == self.minimum or cents == self.maximum:
+            self.extremes_stale = True
+
+    # Function to get the amount of a name in cents
+    def get_cents(self, name):
+        return self.cents[self.positions[name]]
+
+    # Function to get (name, cents) pairs in order
+    def items_cents(self):
+        return ((name, cents) for name, cents in zip(self.names, self.cents) if name is not None)
+
+    # Function to add every amount together in cents (but the skipped names)
+    def total_cents(self):
+        return self.total
+
+    # Function to get the total, count, minimum and maximum of the amounts in cents (but the skipped names)
+    def get_aggregates(self):
+        with self.lock:
+            if self.extremes_stale:
+                counted = [cents for name, cents in self.items_cents() if name not in self.skipped]
+                self.minimum = min(counted) if counted else None
+                self.maximum = max(counted) if counted else None
+                self.extremes_stale = False
+
+            count = len(self.positions) - sum(1 for name in self.skipped if name in self.positions)
+            return {"total_cents": self.total, "count": count, "min_cents": self.minimum, "max_cents": self.maximum}
+
+    # Function to copy the section (used to save it while the menus keep changing the original), without its gaps
+    def copy(self):
+        with self.lock:
+            section = MoneySection(skipped=self.skipped)
+            pairs = list(self.items_cents())
+            section.names = [name for name, cents in pairs]
+            section.cents = array.array("q", (cents for name, cents in pairs))
+            section.positions = {name: index for index, name in enumerate(section.names)}
+            section.total, section.minimum, section.maximum = self.total, self.minimum, self.maximum
+            section.extremes_stale = self.extremes_stale
+            return section
+
+    def clear(self):
+        with self.lock:
+            self.__init__(lock=self.lock, skipped=self.skipped)
+
+
+# Function to get (name, cents) pairs from a money section or a dictionary of rand values
+def money_items(data):
+    if isinstance(data, MoneySection):
+        return data.items_cents()
+    return ((name, to_cents(value)) for name, value in data.items())
+
+
+# Function to add together a money section or a dictionary of rand values, in cents
+def money_total(data):
+    if isinstance(data, MoneySection):
+        return data.total_cents()
+    return sum(to_cents(value) for value in data.values())
+
+
+# Function to get the total, count, minimum and maximum (in cents) of a money section or dictionary of rand values
+# Names skipped in the aggregates of 'file_name' (see AGGREGATE_SKIPPED_NAMES) are left out
+def get_money_aggregates(data, file_name=None):
+    if isinstance(data, MoneySection):
+        return data.get_aggregates()
+
+    skipped = AGGREGATE_SKIPPED_NAMES.get(file_name, ())
+    cents = [cents for name, cents in money_items(data) if name not in skipped]
+    return {
+        "total_cents": sum(cents),
+        "count": len(cents),
+        "min_cents": min(cents) if cents else None,
+        "max_cents": max(cents) if cents else None
+    }
+
+
+# Function to parse the values of a file once when it is loaded (amounts to cents, income values to numbers)
+# Money sections are changed holding 'lock' if given
+def parse_ledger_section(file_name, data, lock=None):
+    if file_name in MONEY_FILES:
+        return MoneySection(data, lock, AGGREGATE_SKIPPED_NAMES.get(file_name, ()))
+    if file_name == "income.txt":
+        return {key: float(value) for key, value in data.items()}
+    return data
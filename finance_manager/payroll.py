@@ -0,0 +1,99 @@
+import csv
+import json
+
+from finance_manager.storage import get_storage
+from finance_manager.tax import calculate_income_batch, get_tax_table
+
+
+# ------------------ Batch payroll ------------------ #
+
+# Number of timesheet rows calculated and written together by the payroll command
+PAYROLL_CHUNK_SIZE = 10000
+
+
+# Function to read timesheet rows one at a time from a CSV file (with a header row) or a JSONL file
+def read_timesheet_rows(file_path):
+    with open(file_path, "r", newline="") as file:
+        if file_path.lower().endswith((".jsonl", ".json")):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+# Function to check whether a timesheet value means yes
+def is_yes(value):
+    return str(value).strip().lower() in ("yes", "y", "true", "1")
+
+
+# Function to turn a timesheet row into (user, hourly rate, worked, double worked, by days, hours per day, works sundays)
+# Rows with 'days' filled in are calculated via days worked, otherwise via 'hours'
+def parse_timesheet_row(row):
+    user_name = str(row["user"]).strip()
+    if not user_name:
+        raise ValueError("missing user")
+
+    days = row.get("days")
+    by_days = days is not None and str(days).strip() != ""
+
+    if by_days:
+        worked = float(days)
+        double_worked = float(row.get("double_days") or 0)
+        hours_per_day = float(row["hours_per_day"])
+    else:
+        worked = float(row["hours"])
+        double_worked = float(row.get("double_hours") or 0)
+        hours_per_day = 1
+
+    return user_name, float(row["hourly_rate"]), worked, double_worked, by_days, hours_per_day, is_yes(row.get("works_sundays", "no"))
+
+
+# Function to calculate one chunk of parsed timesheet rows and write every users income.txt
+def write_payroll_chunk(rows, tax_table):
+    user_names, hourly_rates, worked, double_worked, by_days, hours_per_day, works_sundays = zip(*rows)
+
+    results = calculate_income_batch(
+        hourly_rates, worked, double_worked, by_days, hours_per_day, works_sundays, tax_table.tax_year
+    )
+    income, Income_TAX, Income_Less_Tax, UIF_deduction, TOTAl_NET_INCOME = (values.tolist() for values in results)
+
+    get_storage().write_many(
+        (user_name, "income.txt", {
+            "income": income[index],
+            "Income_TAX": Income_TAX[index],
+            "Income_Less_Tax": Income_Less_Tax[index],
+            "UIF": tax_table.uif,
+            "TOTAl_NET_INCOME": TOTAl_NET_INCOME[index]
+        })
+        for index, user_name in enumerate(user_names)
+    )
+
+
+# Function to run payroll for every row of a timesheet file, in chunks so memory use stays the same for any file size
+def run_payroll(file_path, tax_year=None, chunk_size=PAYROLL_CHUNK_SIZE):
+    tax_table = get_tax_table(tax_year)
+    chunk_size = chunk_size or PAYROLL_CHUNK_SIZE
+
+    chunk = []
+    processed = 0
+    skipped = 0
+
+    for line_number, row in enumerate(read_timesheet_rows(file_path), 1):
+        try:
+            chunk.append(parse_timesheet_row(row))
+        except (KeyError, TypeError, ValueError) as error:
+            skipped += 1
+            print(f"Skipping timesheet row {line_number}: {error}")
+            continue
+
+        if len(chunk) == chunk_size:
+            write_payroll_chunk(chunk, tax_table)
+            processed += len(chunk)
+            chunk = []
+
+    if chunk:
+        write_payroll_chunk(chunk, tax_table)
+        processed += len(chunk)
+
+    print(f"Payroll for the {tax_table.tax_year} tax year written for {processed} timesheet rows ({skipped} skipped).")
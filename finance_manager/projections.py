@@ -0,0 +1,161 @@
+import os
+import concurrent.futures
+
+import numpy as np
+
+from finance_manager.reports import REPORT_SINKS
+from finance_manager.storage import configure_storage, get_storage, read_from_file
+
+
+# ------------------ Investment projections ------------------ #
+
+# Each users expected yearly return and volatility of their holdings, as 'holding,return|volatility' in percent
+RETURNS_FILE_NAME = "investment_returns.txt"
+
+# Expected yearly return and volatility (in percent) of holdings that have none set
+DEFAULT_EXPECTED_RETURN = float(os.environ.get("FINANCE_MANAGER_EXPECTED_RETURN", 8))
+DEFAULT_VOLATILITY = float(os.environ.get("FINANCE_MANAGER_VOLATILITY", 15))
+
+# Number of simulated market paths, and the longest projection in years
+PROJECTION_PATHS = int(os.environ.get("FINANCE_MANAGER_PROJECTION_PATHS", 20000))
+MAX_PROJECTION_YEARS = 40
+
+# Percentiles of the simulated portfolio values shown for every year
+PROJECTION_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Folder the project command writes each users projection to
+PROJECTIONS_FOLDER = os.path.join("data", "Reports")
+
+
+# Function to read a 'return|volatility' value, returns both in percent (raises ValueError if it isn't one)
+def parse_return_assumption(value):
+    expected_return, volatility = (float(part) for part in str(value).split("|"))
+    if volatility < 0:
+        raise ValueError("volatility can't be negative")
+    return expected_return, volatility
+
+
+# Function to write an expected return and volatility (in percent) as a 'return|volatility' value
+def format_return_assumption(expected_return, volatility):
+    return f"{expected_return:g}|{volatility:g}"
+
+
+# Function to get the holdings of an investment calculation with their expected return and volatility
+# Returns the names and arrays of the values (R), expected returns and volatilities (as fractions)
+def get_holdings(calculator_data, returns_data):
+    names, values, expected_returns, volatilities = [], [], [], []
+
+    for name, value in calculator_data.items():
+        if name == "total_budget" or float(value) <= 0:
+            continue
+
+        try:
+            expected_return, volatility = parse_return_assumption(returns_data[name])
+        except (KeyError, ValueError):
+            expected_return, volatility = DEFAULT_EXPECTED_RETURN, DEFAULT_VOLATILITY
+
+        names.append(name)
+        values.append(float(value))
+        expected_returns.append(expected_return / 100)
+        volatilities.append(volatility / 100)
+
+    return names, np.array(values), np.array(expected_returns), np.array(volatilities)
+
+
+# Function to simulate the value of a portfolio at the end of each year over many market paths
+# Each holding grows by a lognormal yearly return with the given expected return and volatility
+# Returns an array of (paths, years) portfolio values
+def simulate_portfolio(values, expected_returns, volatilities, years, paths=PROJECTION_PATHS, seed=None):
+    random = np.random.default_rng(seed)
+    totals = np.zeros((paths, years))
+
+    # Yearly log growth whose average growth factor is 1 + expected return
+    drifts = np.log1p(expected_returns) - volatilities ** 2 / 2
+
+    # One holding at a time, every path and year at once, so memory stays at two (paths, years) arrays
+    for value, drift, volatility in zip(values, drifts, volatilities):
+        growth = random.standard_normal((paths, years))
+        growth *= volatility
+        growth += drift
+        np.cumsum(growth, axis=1, out=growth)
+        np.exp(growth, out=growth)
+        growth *= value
+        totals += growth
+
+    return totals
+
+
+# Function to build the projection report model: the holdings and, for every percentile, the value at each year end
+def build_projection_report(calculator_data, returns_data, years=30, paths=PROJECTION_PATHS, seed=None):
+    if not 1 <= years <= MAX_PROJECTION_YEARS:
+        raise ValueError(f"Projections are 1 to {MAX_PROJECTION_YEARS} years.")
+
+    names, values, expected_returns, volatilities = get_holdings(calculator_data, returns_data)
+
+    if names:
+        bands = np.percentile(simulate_portfolio(values, expected_returns, volatilities, years, paths, seed), PROJECTION_PERCENTILES, axis=0)
+    else:
+        bands = np.zeros((len(PROJECTION_PERCENTILES), years))
+
+    report = {
+        "report": "projection",
+        "years": years,
+        "paths": paths,
+        "starting_value": round(float(values.sum()), 2),
+        "holdings": [
+            {"name": name, "value": round(value, 2), "expected_return": round(expected_return * 100, 2), "volatility": round(volatility * 100, 2)}
+            for name, value, expected_return, volatility in zip(names, values.tolist(), expected_returns.tolist(), volatilities.tolist())
+        ]
+    }
+
+    for percentile, band in zip(PROJECTION_PERCENTILES, bands):
+        report[f"p{percentile}"] = [{"name": f"Year {year}", "value": round(value, 2)} for year, value in enumerate(band.tolist(), 1)]
+
+    return report
+
+
+# Function to build the projection of a user from their saved investment calculation
+def build_user_projection_report(user_name, years=30, paths=PROJECTION_PATHS, seed=None):
+    return build_projection_report(
+        read_from_file(user_name, "investment_calculator.txt"),
+        read_from_file(user_name, RETURNS_FILE_NAME),
+        years,
+        paths,
+        seed
+    )
+
+
+# Function to render the projection of a user to '<output folder>/<user>.projection.<format>'
+def render_user_projection(user_name, output_folder, years, paths, seed, report_format="text"):
+    extension = "txt" if report_format == "text" else report_format
+
+    with open(os.path.join(output_folder, f"{user_name}.projection.{extension}"), "w") as file:
+        REPORT_SINKS[report_format](file).write(
+            [build_user_projection_report(user_name, years, paths, seed)], title=f"Investment projection for {user_name}"
+        )
+
+    return user_name
+
+
+# Function to project the investments of every user, using a process pool
+# Each user gets their own random stream from 'seed', so a run can be repeated whatever the number of workers
+def project_all_users(output_folder=PROJECTIONS_FOLDER, workers=None, years=30, paths=PROJECTION_PATHS, seed=None, report_format="text"):
+    os.makedirs(output_folder, exist_ok=True)
+
+    storage = get_storage()
+    user_names = storage.list_users()
+    seeds = np.random.SeedSequence(seed).spawn(len(user_names))
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for user_name, user_seed in zip(user_names, seeds):
+            render_user_projection(user_name, output_folder, years, paths, user_seed, report_format)
+    elif user_names:
+        count = len(user_names)
+        chunk_size = max(1, count // (workers * 4))
+        with concurrent.futures.ProcessPoolExecutor(workers, initializer=configure_storage, initargs=(storage.name,)) as pool:
+            for _ in pool.map(render_user_projection, user_names, [output_folder] * count, [years] * count, [paths] * count,
+                              seeds, [report_format] * count, chunksize=chunk_size):
+                pass
+
+    print(f"Projected the investments of {len(user_names)} users over {years} years into {output_folder}.")
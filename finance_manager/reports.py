@@ -0,0 +1,491 @@
+import io
+import sys
+import csv
+import json
+
+from finance_manager.ledger import DEFAULT_INCOME_DATA
+from finance_manager.metrics import measure
+from finance_manager.money import money_items, money_total, to_cents
+from finance_manager.storage import CREDIT_TERMS_FILE_NAME, read_from_file, read_section_aggregates
+from finance_manager.transactions import TRANSACTION_KINDS, get_kind_totals, get_net_cents
+
+
+# ------------------ Generate reports Functions ------------------ #
+
+# Function to generate the full report
+def generate_full_report(income_data, debits, other_expenses, credits, investments, sink=None):
+    reports = build_full_report(income_data, debits, other_expenses, credits, investments)
+    (sink or TextReportSink(sys.stdout)).write(reports, title="Full report")
+
+
+# Function to calculate net financial position
+# With a month and its transaction rollups, that months transactions are shown under the balance
+# With the users credit terms, the monthly repayments of those credits are taken off the balance
+def calculate_net_position(income_data, debits, other_expenses, credits, investments, sink=None, month=None, month_rollup=None,
+                           credit_terms=None):
+    report = build_net_position_report(income_data, debits, other_expenses, credits, investments, credit_terms)
+    if month is not None:
+        add_month_transactions(report, month, month_rollup or {})
+    (sink or TextReportSink(sys.stdout)).write([report])
+    return report["remaining_balance"]
+
+
+# ------------------ Report rendering ------------------ #
+
+# Each report is first built as a model (a dictionary of rounded values), then written to a sink in one write
+
+
+# Function to turn a money section (or dictionary of names and values) into report items
+def build_report_items(data, skip=()):
+    return [{"name": name, "value": cents / 100} for name, cents in money_items(data) if name not in skip]
+
+
+# Function to add each items percentage of a total, largest value first
+def add_report_percentages(items, total):
+    items = sorted(items, key=lambda item: item["value"], reverse=True)
+    for item in items:
+        item["percentage"] = round(item["value"] / total * 100, 2) if total else 0.0
+    return items
+
+
+# Function to build the income report model
+def build_income_report(income, Income_TAX, Income_Less_Tax, UIF, TOTAl_NET_INCOME):
+    return {
+        "report": "income",
+        "gross_income": round(float(income), 2),
+        "income_tax": round(float(Income_TAX), 2),
+        "income_less_tax": round(float(Income_Less_Tax), 2),
+        "uif_deduction": round(float(income) * float(UIF), 2),
+        "total_net_income": round(float(TOTAl_NET_INCOME), 2)
+    }
+
+
+# Function to build the income report model from a users income data
+def build_income_report_from_data(income_data):
+    return build_income_report(
+        income_data["income"],
+        income_data["Income_TAX"],
+        income_data["Income_Less_Tax"],
+        income_data["UIF"],
+        income_data["TOTAl_NET_INCOME"]
+    )
+
+
+# Function to build the expense report model
+def build_expense_report(debits, other_expenses):
+    return {
+        "report": "expenses",
+        "debit_orders": build_report_items(debits),
+        "additional": build_report_items(other_expenses),
+        "total_expenses": (money_total(debits) + money_total(other_expenses)) / 100
+    }
+
+
+# Function to build the credit report model
+def build_credit_report(credits):
+    return {
+        "report": "credits",
+        "credits": build_report_items(credits),
+        "total_credits": money_total(credits) / 100
+    }
+
+
+# Function to build the investment report model
+def build_investment_report(investments):
+    total_investments = money_total(investments) / 100
+    return {
+        "report": "investments",
+        "total_investments": total_investments,
+        "investments": add_report_percentages(build_report_items(investments), total_investments)
+    }
+
+
+# Function to build the investment calculator report model
+def build_investment_calculator_report(calculator_data):
+
+    # Extract total budget
+    total_budget_raw = calculator_data.get("total_budget")
+
+    if total_budget_raw is None or str(total_budget_raw).strip() == "":
+        total_budget = 0
+    else:
+        total_budget = float(total_budget_raw)
+
+    # Extract individual investments
+    investments = build_report_items(calculator_data, skip=("total_budget",))
+    allocated_amount = sum(to_cents(item["value"]) for item in investments) / 100
+
+    return {
+        "report": "investment_calculator",
+        "total_budget": round(total_budget, 2),
+        "allocated_amount": round(allocated_amount, 2),
+        "unallocated_amount": round(total_budget - allocated_amount, 2),
+        "allocated_percentage": round(allocated_amount / total_budget * 100, 2) if total_budget else 0.0,
+        "unallocated_percentage": round((total_budget - allocated_amount) / total_budget * 100, 2) if total_budget else 0.0,
+        "investments": add_report_percentages(investments, total_budget)
+    }
+
+
+# Function to add up the monthly repayments (in cents) of the credits that have loan terms
+def get_total_repayments(credits, credit_terms):
+    if not credit_terms:
+        return 0
+
+    # Imported here so the menus start without loading NumPy
+    from finance_manager.amortization import get_monthly_repayments
+    return sum(get_monthly_repayments(credits, credit_terms).values())
+
+
+# Function to build the net financial position model
+def build_net_position_report(income_data, debits, other_expenses, credits, investments, credit_terms=None):
+    return build_net_position_report_from_totals(
+        to_cents(income_data["TOTAl_NET_INCOME"]),
+        money_total(debits) + money_total(other_expenses),
+        money_total(credits),
+        money_total(investments),
+        get_total_repayments(credits, credit_terms)
+    )
+
+
+# Function to build the net financial position model from totals in cents
+def build_net_position_report_from_totals(total_net_income, total_expenses, total_credits, total_investments, total_repayments=0):
+    return {
+        "report": "net_position",
+        "total_net_income": total_net_income / 100,
+        "total_expenses": total_expenses / 100,
+        "total_credits": total_credits / 100,
+        "total_investments": total_investments / 100,
+        "total_repayments": total_repayments / 100,
+        "remaining_balance": (total_net_income - total_expenses + total_credits - total_investments - total_repayments) / 100
+    }
+
+
+# Function to build the net financial position of a user from the saved aggregates, without reading every value
+# (the credits themselves are only read when the user has credit terms)
+def build_user_net_position_report(user_name):
+    income_data = read_from_file(user_name, "income.txt") or DEFAULT_INCOME_DATA
+    credit_terms = read_from_file(user_name, CREDIT_TERMS_FILE_NAME)
+
+    return build_net_position_report_from_totals(
+        to_cents(income_data["TOTAl_NET_INCOME"]),
+        read_section_aggregates(user_name, "expenses_debits.txt")["total_cents"]
+        + read_section_aggregates(user_name, "expenses_other.txt")["total_cents"],
+        read_section_aggregates(user_name, "credits.txt")["total_cents"],
+        read_section_aggregates(user_name, "investments.txt")["total_cents"],
+        get_total_repayments(read_from_file(user_name, "credits.txt"), credit_terms) if credit_terms else 0
+    )
+
+
+# Function to add the totals of a months transactions to a net position report model
+def add_month_transactions(report, month, month_rollup):
+    report["month"] = month
+    report["month_transactions"] = [
+        {"name": TRANSACTION_KINDS[kind].capitalize(), "value": total_cents / 100}
+        for kind, total_cents in get_kind_totals(month_rollup).items()
+    ]
+    report["month_net"] = get_net_cents(month_rollup) / 100
+    return report
+
+
+# Function to build the transactions report model of a month from a users rollups (see transactions.read_rollups)
+# Every kind lists its categories, largest first, and 'months' has what each month added to the balance
+def build_transactions_report(rollups, month):
+    month_rollup = rollups.get(month, {})
+    report = {"report": "transactions", "month": month}
+
+    for kind, total_cents in get_kind_totals(month_rollup).items():
+        items = [
+            {"name": category, "value": category_cents / 100, "count": count}
+            for category, (category_cents, count) in month_rollup.get(kind, {}).items()
+        ]
+        report[TRANSACTION_KINDS[kind]] = add_report_percentages(items, total_cents / 100)
+        report["total_" + TRANSACTION_KINDS[kind]] = total_cents / 100
+
+    report["net"] = get_net_cents(month_rollup) / 100
+    report["months"] = [{"name": name, "value": get_net_cents(rollups[name]) / 100} for name in sorted(rollups)]
+    return report
+
+
+# Function to build the income, expense, credit and investment report models of a full report
+def build_full_report(income_data, debits, other_expenses, credits, investments):
+    return [
+        build_income_report_from_data(income_data),
+        build_expense_report(debits, other_expenses),
+        build_credit_report(credits),
+        build_investment_report(investments)
+    ]
+
+
+# - Console text layouts, one function per report returning the lines to print -
+
+# Function to lay out the income report
+def income_report_lines(report):
+    return [
+        "\nIncome report:",
+        "\nGross income      = R{:.2f}".format(report["gross_income"]),
+        "income TAX        = R{:.2f}".format(report["income_tax"]),
+        "income less Tax   = R{:.2f}".format(report["income_less_tax"]),
+        "UIF deduction     = R{:.2f}".format(report["uif_deduction"]),
+        "Total net income  = R{:.2f}".format(report["total_net_income"])
+    ]
+
+
+# Function to lay out the expense report
+def expense_report_lines(report):
+    lines = ["\nExpense report:\n", f"{'- Debit orders -':<20} {'Value (R)':>8}", "-" * 35]
+    lines += [f"{item['name']:<20} R{item['value']:>7.2f}" for item in report["debit_orders"]]
+    lines += [f"\n{'- Additional -':<20} {'Value (R)':>8}", "-" * 35]
+    lines += [f"{item['name']:<20} R{item['value']:>7.2f}" for item in report["additional"]]
+    lines += ["\n", "-" * 35, f"{'Total Expenses':<20} R{report['total_expenses']:>7.2f}"]
+    return lines
+
+
+# Function to lay out the credit report
+def credit_report_lines(report):
+    lines = ["\nCredit report:", f"\n{'Credits':<20} {'Value (R)':>8}", "-" * 35]
+    lines += [f"{item['name']:<20} R{item['value']:>7.2f}" for item in report["credits"]]
+    lines.append(f"\n{'Total credits':<20} R{report['total_credits']:>7.2f}")
+    return lines
+
+
+# Function to lay out the investment report
+def investment_report_lines(report):
+    lines = [
+        "\nInvestment report:",
+        f"\n{'Total Investments':<20} R{report['total_investments']:.2f}",
+        f"\n{'Investment':<20} {'Value (R)':<15}",
+        "-" * 50
+    ]
+    lines += [f"{item['name']:<20} R{item['value']:.2f} ({item['percentage']:.2f}%)" for item in report["investments"]]
+    return lines
+
+
+# Function to lay out the investment calculator report
+def investment_calculator_report_lines(report):
+    lines = ["\nInvestment Calculator Report:", f"\n{'Total budget:':<20} R{report['total_budget']:>8.2f}"]
+
+    if report["total_budget"] != 0:
+        lines.append(f"{'Allocated amount:':<20} R{report['allocated_amount']:>8.2f} ({report['allocated_percentage']:.2f}%)")
+        lines.append(f"{'Unallocated amount:':<20} R{report['unallocated_amount']:>8.2f} ({report['unallocated_percentage']:.2f}%)")
+    else:
+        lines.append("Total budget is zero. Please make sure a credit calculation has been created.")
+
+    lines += [f"\n{'Investments':<20} {'Value (R)':>8}", "-" * 50]
+    lines += [f"{item['name']:<20} R{item['value']:.2f} ({item['percentage']:.2f}%)" for item in report["investments"]]
+    return lines
+
+
+# Function to lay out the net position report
+def net_position_report_lines(report):
+    lines = [
+        "\nBalance breakdown:\n",
+        f"{'Total Net Income':.<20} R{report['total_net_income']:.2f}",
+        f"{'Total Expenses':.<20} R{report['total_expenses']:.2f}",
+        f"{'Total Credits':.<20} R{report['total_credits']:.2f}",
+        f"{'Total Investments':.<20} R{report['total_investments']:.2f}",
+        f"\n{'Remaining balance':.<20} R{report['remaining_balance']:.2f}"
+    ]
+
+    # Only users with credit terms have repayments, shown above the balance they were taken off
+    if report.get("total_repayments"):
+        lines.insert(-1, f"{'Credit repayments':.<20} R{report['total_repayments']:.2f}")
+
+    # Check if net_position is below 0
+    if report["remaining_balance"] < 0:
+        lines.append("Your expenses exceed your income")
+
+    if "month" in report:
+        lines.append(f"\nTransactions in {report['month']}:\n")
+        lines += [f"{item['name']:.<20} R{item['value']:.2f}" for item in report["month_transactions"]]
+        lines.append(f"\n{'Month net':.<20} R{report['month_net']:.2f}")
+    return lines
+
+
+# Function to lay out the monthly history report
+def history_report_lines(report):
+    lines = ["\nMonthly history:", f"\n{'Month':<20} {'Remaining (R)':>16}", "-" * 37]
+    lines += [f"{item['name']:<20} R{item['value']:>15.2f}" for item in report["months"]]
+    if not report["months"]:
+        lines.append("No history yet. Totals are recorded every time your changes are saved.")
+
+    lines += [f"\n{'Year':<20} {'Avg expenses (R)':>16}", "-" * 37]
+    lines += [f"{item['name']:<20} R{item['value']:>15.2f}" for item in report["yearly_average_expenses"]]
+    return lines
+
+
+# Function to lay out the transactions report of a month
+def transactions_report_lines(report):
+    lines = [f"\nTransactions in {report['month']}:"]
+
+    for kind, name in TRANSACTION_KINDS.items():
+        if not report[name]:
+            continue
+        lines += [f"\n{'- ' + name.capitalize() + ' -':<20} {'Value (R)':>10} {'Count':>6}", "-" * 45]
+        lines += [
+            f"{item['name']:<20} R{item['value']:>9.2f} {item['count']:>6} ({item['percentage']:.2f}%)"
+            for item in report[name]
+        ]
+        lines.append(f"{'Total ' + name:<20} R{report['total_' + name]:>9.2f}")
+
+    if not any(report[name] for name in TRANSACTION_KINDS.values()):
+        lines.append("No transactions this month.")
+
+    lines += [f"\n{'Month net':<20} R{report['net']:>9.2f}", f"\n{'Month':<20} {'Net (R)':>10}", "-" * 45]
+    lines += [f"{item['name']:<20} R{item['value']:>9.2f}" for item in report["months"]]
+    return lines
+
+
+# Function to lay out the investment projection report, one row per year with a column per percentile
+def projection_report_lines(report):
+    bands = [key for key in report if key[0] == "p" and key[1:].isdigit()]
+
+    lines = [
+        f"\nInvestment projection ({report['paths']} simulated paths):",
+        f"\n{'Starting value':<20} R{report['starting_value']:.2f}",
+        f"\n{'Investment':<20} {'Value (R)':>12} {'Return':>8} {'Volatility':>11}",
+        "-" * 54
+    ]
+    lines += [
+        f"{item['name']:<20} R{item['value']:>11.2f} {item['expected_return']:>7.2f}% {item['volatility']:>10.2f}%"
+        for item in report["holdings"]
+    ]
+    if not report["holdings"]:
+        lines.append("No investments to project. Create an investment percentage calculation first.")
+        return lines
+
+    lines += ["\n" + f"{'Year':<8}" + "".join(f"{key[1:] + '%':>14}" for key in bands), "-" * (8 + 14 * len(bands))]
+    for year in range(report["years"]):
+        lines.append(f"{year + 1:<8}" + "".join(f"{'R' + format(report[key][year]['value'], '.2f'):>14}" for key in bands))
+    return lines
+
+
+# Function to lay out the credit terms report
+def credit_terms_report_lines(report):
+    lines = [
+        "\nCredit terms:",
+        f"\n{'Credit':<20} {'Principal (R)':>14} {'Rate':>7} {'Payments':>14} {'Payment (R)':>12} {'Interest (R)':>13} {'Per month (R)':>14}",
+        "-" * 100
+    ]
+    lines += [
+        f"{item['name']:<20} R{item['value']:>13.2f} {item['rate']:>6.2f}% {str(item['payments']) + ' ' + item['frequency']:>14} "
+        f"R{item['payment']:>11.2f} R{item['total_interest']:>12.2f} R{item['monthly_repayment']:>13.2f}"
+        for item in report["credits"]
+    ]
+    if not report["credits"]:
+        lines.append("No credits have terms yet. Set them under Manage Credits > Set credit terms.")
+    lines.append(f"\n{'Total repayments per month':<30} R{report['total_monthly_repayments']:.2f}")
+    return lines
+
+
+# Function to lay out a page of a repayment schedule
+def schedule_report_lines(report):
+    lines = [
+        f"\nRepayment schedule of {report['credit']} (payments {report['rows'][0]['name']} to {report['rows'][-1]['name']} of {report['payments']}):",
+        f"\n{'Payment':<8} {'Payment (R)':>12} {'Interest (R)':>13} {'Principal (R)':>14} {'Balance (R)':>13}",
+        "-" * 64
+    ]
+    lines += [
+        f"{item['name']:<8} R{item['value']:>11.2f} R{item['interest']:>12.2f} R{item['principal']:>13.2f} R{item['balance']:>12.2f}"
+        for item in report["rows"]
+    ]
+    return lines
+
+
+# Function to lay out the cash-flow forecast report, one row per year
+def forecast_report_lines(report):
+    lines = [
+        f"\nCash-flow forecast from {report['first_month']} ({report['months']} months):",
+        f"\n{'Opening balance':<20} R{report['opening_balance']:.2f}",
+        f"\n{'Year':<8} {'Incoming (R)':>16} {'Outgoing (R)':>16} {'Closing balance (R)':>20}",
+        "-" * 63
+    ]
+    lines += [
+        f"{item['name']:<8} R{item['incoming']:>15.2f} R{item['outgoing']:>15.2f} R{item['value']:>19.2f}"
+        for item in report["years"]
+    ]
+
+    if report["first_negative_month"]:
+        lines.append(f"\nYour balance first goes below zero in {report['first_negative_month']}.")
+    else:
+        lines.append("\nYour balance stays above zero for the whole forecast.")
+    return lines
+
+
+TEXT_REPORT_LAYOUTS = {
+    "income": income_report_lines,
+    "expenses": expense_report_lines,
+    "credits": credit_report_lines,
+    "investments": investment_report_lines,
+    "investment_calculator": investment_calculator_report_lines,
+    "net_position": net_position_report_lines,
+    "history": history_report_lines,
+    "transactions": transactions_report_lines,
+    "projection": projection_report_lines,
+    "credit_terms": credit_terms_report_lines,
+    "schedule": schedule_report_lines,
+    "forecast": forecast_report_lines
+}
+
+
+# Class to write report models to a stream in one write
+class ReportSink:
+    name = None
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    # Function to render the reports and write them with a single call
+    def write(self, reports, title=None):
+        with measure(f"report.{self.name}"):
+            self.stream.write(self.render(reports, title))
+            self.stream.flush()
+
+    def render(self, reports, title=None):
+        raise NotImplementedError
+
+
+# Class to write reports in the console layout
+class TextReportSink(ReportSink):
+    name = "text"
+
+    def render(self, reports, title=None):
+        blocks = ["\n".join(TEXT_REPORT_LAYOUTS[report["report"]](report)) + "\n" for report in reports]
+        text = "\n\n".join(blocks)
+
+        if title:
+            text = f"\n{title}:\n\n" + text
+        return text
+
+
+# Class to write reports as CSV rows of report, section, name, value and percentage
+class CsvReportSink(ReportSink):
+    name = "csv"
+
+    def render(self, reports, title=None):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(["report", "section", "name", "value", "percentage"])
+
+        for report in reports:
+            for field, value in report.items():
+                if field == "report":
+                    continue
+                if isinstance(value, list):
+                    for item in value:
+                        writer.writerow([report["report"], field, item["name"], item["value"], item.get("percentage", "")])
+                else:
+                    writer.writerow([report["report"], "", field, value, ""])
+
+        return buffer.getvalue()
+
+
+# Class to write reports as a JSON document
+class JsonReportSink(ReportSink):
+    name = "json"
+
+    def render(self, reports, title=None):
+        document = {"title": title, "reports": reports} if title else reports
+        return json.dumps(document, indent=2) + "\n"
+
+
+REPORT_SINKS = {sink.name: sink for sink in (TextReportSink, CsvReportSink, JsonReportSink)}
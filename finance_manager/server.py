@@ -0,0 +1,258 @@
+import os
+import sys
+import stat
+import queue
+import signal
+import socket
+import asyncio
+import threading
+import traceback
+import concurrent.futures
+
+from finance_manager.cli import run_interactive
+from finance_manager.client import END, FRAME_HEADER, INPUT, OUTPUT, PASSWORD, SOCKET_PATH, make_frame
+from finance_manager.ledger import evict_idle_ledgers, save_open_ledgers
+from finance_manager.metrics import reset_metrics, waiting_for_input
+from finance_manager.storage import get_storage
+
+
+# ------------------ Session server ------------------ #
+
+# Most sessions that run at the same time, more connections wait for a free one
+MAX_SESSIONS = int(os.environ.get("FINANCE_MANAGER_MAX_SESSIONS", 1024))
+
+# Stack size of the session threads, sessions are mostly waiting for input so they need little
+SESSION_STACK_SIZE = 512 * 1024
+
+# Output a session keeps before sending it when it isn't waiting for input
+OUTPUT_BUFFER_SIZE = 64 * 1024
+
+# Seconds between checks for ledgers that have been idle long enough to close (see ledger.evict_idle_ledgers)
+EVICT_INTERVAL_SECONDS = 60
+
+# The input and output of the session running on the current thread
+session_streams = threading.local()
+
+# Sessions of the connected clients (only changed on the event loop thread)
+live_sessions = set()
+
+
+# Class that stands in for sys.stdin and sys.stdout and passes every call on to the current sessions stream
+# (or the servers own stream on threads that aren't running a session)
+class SessionStreamRouter:
+
+    def __init__(self, name, default):
+        self.name = name
+        self.default = default
+
+    def __getattr__(self, attribute):
+        return getattr(getattr(session_streams, self.name, None) or self.default, attribute)
+
+
+# Class for the text a session prints, sent to its client in as few messages as possible
+class SessionOutput:
+
+    def __init__(self, session):
+        self.session = session
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size > OUTPUT_BUFFER_SIZE:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.parts:
+            self.session.send(OUTPUT, "".join(self.parts).encode())
+            self.parts = []
+            self.size = 0
+
+
+# Class for the lines a session reads, asked for from its client when the menus call input()
+class SessionInput:
+
+    def __init__(self, session):
+        self.session = session
+
+    # Returns "" (end of input, so input() raises EOFError) once the client has gone
+    def readline(self, size=-1):
+        self.session.output.flush()
+        self.session.send(INPUT)
+        line = self.session.read_line()
+        return "" if line is None else line + "\n"
+
+    # Used by menus.get_password_input, the client reads the password without showing it
+    def read_password(self, prompt):
+        self.session.output.flush()
+        self.session.send(PASSWORD, prompt.encode())
+        line = self.session.read_line()
+        if line is None:
+            raise EOFError
+        return line
+
+
+# Class for one connected client running the menus on a session thread
+class Session:
+
+    def __init__(self, loop, writer):
+        self.loop = loop
+        self.writer = writer
+        self.lines = queue.Queue()
+        self.output = SessionOutput(self)
+        self.input = SessionInput(self)
+
+    # Function to wait for the next line from the client, None once it has gone or the server is stopping
+    # The None is put back, so every later read ends too
+    def read_line(self):
+        with waiting_for_input():
+            line = self.lines.get()
+        if line is None:
+            self.lines.put(None)
+        return line
+
+    # Function to send a message to the client from the session thread
+    def send(self, kind, payload=b""):
+        self.loop.call_soon_threadsafe(self.writer.write, make_frame(kind, payload))
+
+    # Function to run the menus for the client (on a session thread)
+    def run(self):
+        session_streams.stdout = self.output
+        session_streams.stdin = self.input
+
+        # Session threads are reused, so nothing is left over from a session that ended without logging out
+        reset_metrics()
+
+        try:
+            run_interactive(keep_ledgers=True)
+        except (EOFError, SystemExit):
+            pass  # The client disconnected part way through a menu
+        except Exception:
+            traceback.print_exc(file=sys.__stderr__)
+            print("\nSomething went wrong, the session has ended.")
+        finally:
+            # The users changes were saved when their session ended, ledgers idle too long are closed
+            evict_idle_ledgers()
+            self.output.flush()
+            self.send(END)
+            session_streams.stdout = None
+            session_streams.stdin = None
+
+
+# Function to read one message from a client, None once it has disconnected
+async def read_frame(reader):
+    try:
+        kind, size = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+        return kind, await reader.readexactly(size)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+
+# Function to serve one client: its menus run on a session thread while this passes its input lines on
+async def handle_client(reader, writer, session_pool):
+    loop = asyncio.get_running_loop()
+    session = Session(loop, writer)
+    live_sessions.add(session)
+    session_done = loop.run_in_executor(session_pool, session.run)
+
+    try:
+        while True:
+            frame = await read_frame(reader)
+            if frame is None:
+                session.lines.put(None)
+                break
+            session.lines.put(frame[1].decode())
+
+        await session_done
+    except asyncio.CancelledError:
+        pass  # The server is stopping, the session was told its input has ended
+    finally:
+        live_sessions.discard(session)
+        writer.close()
+
+
+# Function to remove the socket left behind by a session server that didn't stop cleanly
+# Returns False (and nothing is removed) if the path isn't a socket or a server is still listening on it
+def remove_stale_socket(socket_path):
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return True
+
+    if not stat.S_ISSOCK(mode):
+        print(f"'{socket_path}' exists and is not a socket, choose another path with --socket.")
+        return False
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            os.remove(socket_path)
+            return True
+        except OSError as error:
+            print(f"Could not check the socket '{socket_path}': {error}")
+            return False
+
+    print(f"A session server is already running on {socket_path}.")
+    return False
+
+
+# Function to close the ledgers of users that have been idle too long, every EVICT_INTERVAL_SECONDS
+async def evict_ledgers_periodically():
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(EVICT_INTERVAL_SECONDS)
+        await loop.run_in_executor(None, evict_idle_ledgers)
+
+
+# Function to run the session server until it is stopped (Ctrl+C)
+async def serve_sessions(socket_path, max_sessions):
+    if not remove_stale_socket(socket_path):
+        return
+
+    threading.stack_size(SESSION_STACK_SIZE)
+    session_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_sessions, thread_name_prefix="session")
+
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: handle_client(reader, writer, session_pool), path=socket_path
+    )
+    print(f"Serving sessions on {socket_path} (up to {max_sessions} at once). Connect with: python -m finance_manager.client")
+
+    # Stop cleanly on Ctrl+C or when the service is stopped
+    stop = asyncio.Event()
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(stop_signal, stop.set)
+
+    evicting = asyncio.create_task(evict_ledgers_periodically())
+
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        evicting.cancel()
+
+        # Sessions waiting for input read the end of it, so their threads finish and the server can exit
+        for session in list(live_sessions):
+            session.lines.put(None)
+        session_pool.shutdown(wait=False, cancel_futures=True)
+        save_open_ledgers()
+        os.remove(socket_path)
+
+
+# Function to start the session server
+def run_server(socket_path=SOCKET_PATH, max_sessions=MAX_SESSIONS):
+    # Set up storage before the first session, so sessions start warm
+    get_storage()
+
+    sys.stdout = SessionStreamRouter("stdout", sys.stdout)
+    sys.stdin = SessionStreamRouter("stdin", sys.stdin)
+
+    try:
+        asyncio.run(serve_sessions(socket_path, max_sessions))
+    finally:
+        sys.stdout = sys.__stdout__
+        sys.stdin = sys.__stdin__
+
+    print("Session server stopped.")
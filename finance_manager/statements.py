@@ -0,0 +1,291 @@
+import os
+import re
+import csv
+import html
+import time
+import hashlib
+
+from finance_manager.categories import read_category_matcher
+from finance_manager.storage import TRANSACTION_KEY_SIZE, get_storage
+from finance_manager.transactions import UNCATEGORIZED
+
+
+# ------------------ Bank statement import ------------------ #
+
+# Statement formats by file extension
+STATEMENT_FORMATS = {
+    ".csv": "csv",
+    ".ofx": "ofx",
+    ".qfx": "ofx",
+    ".qif": "qif"
+}
+
+# Date formats tried for statement dates, in order (day before month, as on South African statements)
+STATEMENT_DATE_FORMATS = (
+    "%Y-%m-%d", "%Y/%m/%d", "%Y%m%d", "%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y", "%d.%m.%Y",
+    "%d %b %Y", "%d %B %Y", "%d-%b-%Y", "%m/%d/%Y"
+)
+
+# Column names of CSV statements (compared in lower case)
+CSV_DATE_COLUMNS = ("date", "transaction date", "posting date", "posted date", "value date")
+CSV_PAYEE_COLUMNS = ("payee", "name", "counterparty", "beneficiary")
+CSV_MEMO_COLUMNS = ("description", "narrative", "details", "memo", "reference", "transaction description")
+CSV_AMOUNT_COLUMNS = ("amount", "transaction amount", "value")
+CSV_DEBIT_COLUMNS = ("debit", "debit amount", "money out", "withdrawal", "withdrawals")
+CSV_CREDIT_COLUMNS = ("credit", "credit amount", "money in", "deposit", "deposits")
+CSV_CATEGORY_COLUMNS = ("category",)
+
+# Characters of an OFX file read at a time
+OFX_CHUNK_SIZE = 64 * 1024
+
+# An OFX tag and the text after it, e.g. '<TRNAMT>-120.50'
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+# Function to find the first of 'names' in a CSV header row, returns its column number or None
+def find_column(header, names):
+    for name in names:
+        if name in header:
+            return header.index(name)
+    return None
+
+
+# Function to read the records of a CSV statement one at a time
+# Rows before the header row (a bank's account details) are skipped, amounts are one column or debit and credit columns
+def read_csv_statement(file):
+    columns = None
+
+    for row in csv.reader(file):
+        if columns is None:
+            header = [value.strip().lower() for value in row]
+            if find_column(header, CSV_DATE_COLUMNS) is not None:
+                columns = {
+                    part: find_column(header, names)
+                    for part, names in (
+                        ("date", CSV_DATE_COLUMNS), ("payee", CSV_PAYEE_COLUMNS), ("memo", CSV_MEMO_COLUMNS),
+                        ("amount", CSV_AMOUNT_COLUMNS), ("debit", CSV_DEBIT_COLUMNS), ("credit", CSV_CREDIT_COLUMNS),
+                        ("category", CSV_CATEGORY_COLUMNS)
+                    )
+                }
+            continue
+
+        if not any(value.strip() for value in row):
+            continue
+
+        record = {part: row[column] if column is not None and column < len(row) else "" for part, column in columns.items()}
+
+        # Money out is taken off, whether the bank writes it as a positive or a negative number
+        if not record["amount"].strip():
+            debit = record["debit"].strip().lstrip("-")
+            record["amount"] = "-" + debit if debit else record["credit"]
+        yield record
+
+
+# Function to go through the tags of an OFX file a chunk at a time, yields (is closing tag, tag name, text after it)
+def iterate_ofx_tags(file):
+    buffer = ""
+
+    for chunk in iter(lambda: file.read(OFX_CHUNK_SIZE), ""):
+        buffer += chunk
+
+        # Keep the last tag back, its text may go on in the next chunk
+        end = buffer.rfind("<")
+        if end <= 0:
+            continue
+
+        for match in OFX_TAG.finditer(buffer, 0, end):
+            yield match.group(1) == "/", match.group(2).upper(), html.unescape(match.group(3).strip())
+        buffer = buffer[end:]
+
+    for match in OFX_TAG.finditer(buffer):
+        yield match.group(1) == "/", match.group(2).upper(), html.unescape(match.group(3).strip())
+
+
+# Function to read the records of an OFX (or QFX) statement one at a time, from its <STMTTRN> blocks
+# Works for both SGML (OFX 1) files, whose values have no closing tags, and XML (OFX 2) files
+def read_ofx_statement(file):
+    fields = None
+
+    for closing, tag, text in iterate_ofx_tags(file):
+        if tag == "STMTTRN":
+            if not closing:
+                fields = {}
+            elif fields is not None:
+                yield {
+                    "date": fields.get("DTPOSTED", "")[:8],
+                    "payee": fields.get("NAME", fields.get("PAYEE", "")),
+                    "memo": fields.get("MEMO", ""),
+                    "amount": fields.get("TRNAMT", ""),
+                    "category": ""
+                }
+                fields = None
+        elif fields is not None and not closing:
+            fields[tag] = text
+
+
+# Function to read the records of a QIF statement one at a time
+# Each record is a line per field (D date, T amount, P payee, M memo, L category) and ends with a '^' line
+def read_qif_statement(file):
+    fields = {}
+
+    for line in file:
+        line = line.strip()
+        if not line or line.startswith("!"):
+            continue
+
+        if line == "^":
+            if fields:
+                yield {
+                    "date": fields.get("D", "").replace("'", "/"),
+                    "payee": fields.get("P", ""),
+                    "memo": fields.get("M", ""),
+                    "amount": fields.get("T", fields.get("U", "")),
+                    "category": fields.get("L", "")
+                }
+            fields = {}
+        elif line[0] not in fields:
+            fields[line[0]] = line[1:]
+
+
+# Readers of each statement format
+STATEMENT_READERS = {
+    "csv": read_csv_statement,
+    "ofx": read_ofx_statement,
+    "qif": read_qif_statement
+}
+
+
+# Function to get the format of a statement file, from its extension unless 'statement_format' is given
+# Raises ValueError if it can't be told
+def get_statement_format(file_path, statement_format="auto"):
+    if statement_format != "auto":
+        return statement_format
+
+    statement_format = STATEMENT_FORMATS.get(os.path.splitext(file_path)[1].lower())
+    if statement_format is None:
+        raise ValueError(f"Can't tell the format of '{file_path}', give it with --format.")
+    return statement_format
+
+
+# Function to read the records of a statement file one at a time
+def read_statement(file_path, statement_format):
+    with open(file_path, "r", newline="", encoding="utf-8-sig", errors="replace") as file:
+        yield from STATEMENT_READERS[statement_format](file)
+
+
+# Function to read a statement date as 'YYYY-MM-DD', trying each of 'date_formats' in turn
+# The format that worked is moved to the front of the list, as every date of a statement is written the same way
+def parse_statement_date(text, date_formats):
+    text = " ".join(text.split())
+
+    for index, date_format in enumerate(date_formats):
+        try:
+            date = time.strftime("%Y-%m-%d", time.strptime(text, date_format))
+        except ValueError:
+            continue
+        if index:
+            date_formats.insert(0, date_formats.pop(index))
+        return date
+    raise ValueError(f"unknown date '{text}'")
+
+
+# Function to read a statement amount into signed cents, e.g. 'R -1 200.50', '1,200.50' or '(1200.50)'
+def parse_statement_amount(text):
+    text = text.strip().replace("R", "").replace(",", "").replace(" ", "")
+
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+
+    amount = int(f"{float(text):.2f}".replace(".", ""))
+    return -amount if negative else amount
+
+
+# Function to turn statement records into (date, signed cents, payee and memo, statement category)
+# Records that can't be read are skipped and counted in 'counts["invalid"]'
+def normalize_records(records, counts, date_format=None):
+    date_formats = [date_format] if date_format else list(STATEMENT_DATE_FORMATS)
+    date_text = date = None
+
+    for record_number, record in enumerate(records, 1):
+        try:
+            # Statements list many transactions a day, so a date is only parsed when it changes
+            if record["date"] != date_text:
+                date = parse_statement_date(record["date"], date_formats)
+                date_text = record["date"]
+            cents = parse_statement_amount(record["amount"])
+        except ValueError as error:
+            counts["invalid"] += 1
+            print(f"Skipping statement record {record_number}: {error}")
+            continue
+
+        if cents == 0:
+            continue
+
+        description = " - ".join(part for part in (" ".join(record["payee"].split()), " ".join(record["memo"].split())) if part)
+        yield date, cents, description, " ".join(record["category"].split())
+
+
+# Function to give normalized records their category and kind, as transactions (date, category, cents, memo, kind)
+# The category is that of the users rules (see categories.CategoryMatcher), then the statements own category
+# Money in is income and money out an expense
+def categorize_records(records, matcher):
+    for date, cents, description, category in records:
+        category = matcher.categorize(description, cents) or category or UNCATEGORIZED
+        yield date, category, abs(cents), description, "income" if cents > 0 else "expense"
+
+
+# Function to get the key of a transaction that tells whether it was imported before: a hash of its date, amount,
+# description and how many times the same transaction came before it that day (so two equal coffees both count)
+def get_transaction_key(date, cents, description, occurrence):
+    text = f"{date}|{cents}|{description.casefold()}|{occurrence}"
+    return hashlib.blake2b(text.encode(), digest_size=TRANSACTION_KEY_SIZE // 2).hexdigest()
+
+
+# Function to pair the transactions of one statement with their keys (see get_transaction_key)
+# Repeats are counted across the whole statement, so one that isn't sorted by date still gives each its own key.
+# Each statement is counted on its own, so a day that two overlapping statements both list gets the same keys from each
+def key_transactions(transactions):
+    seen = {}
+
+    for transaction in transactions:
+        date, category, cents, memo, kind = transaction
+
+        # Counted by the key of the first one, which takes less memory than the transaction
+        signed_cents = cents if kind == "income" else -cents
+        key = get_transaction_key(date, signed_cents, memo, 0)
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+
+        yield key if occurrence == 0 else get_transaction_key(date, signed_cents, memo, occurrence), transaction
+
+
+# Function to import statement files into a users transactions in one write
+# Records stream from the files through each step to the storage one at a time, only their keys are kept
+def import_statements(user_name, file_paths, statement_format="auto", date_format=None):
+    # Check every file before anything is written
+    try:
+        statements = [(file_path, get_statement_format(file_path, statement_format)) for file_path in file_paths]
+    except ValueError as error:
+        print(error)
+        return 0, 0, 0
+
+    missing = [file_path for file_path in file_paths if not os.path.isfile(file_path)]
+    if missing:
+        print(f"Statement file not found: {', '.join(missing)}")
+        return 0, 0, 0
+
+    counts = {"invalid": 0}
+    matcher = read_category_matcher(user_name)
+
+    keyed_transactions = (
+        keyed_transaction
+        for file_path, file_format in statements
+        for keyed_transaction in key_transactions(
+            categorize_records(normalize_records(read_statement(file_path, file_format), counts, date_format), matcher)
+        )
+    )
+    added, skipped = get_storage().import_transactions(user_name, keyed_transactions)
+
+    print(f"Imported {added} transactions for {user_name} ({skipped} already imported, {counts['invalid']} invalid).")
+    return added, skipped, counts["invalid"]
@@ -0,0 +1,1396 @@
+import os
+import csv
+import json
+import mmap
+import heapq
+import hashlib
+import itertools
+import struct
+import sqlite3
+import threading
+
+from finance_manager import metrics
+from finance_manager.credentials import CredentialIndex
+from finance_manager.locks import FileLock
+from finance_manager.metrics import timed
+from finance_manager.money import MONEY_FILES, get_money_aggregates
+
+
+# ------------------ Start-up functions ------------------ #
+
+# Function to create the 'data' folder if it doesn't exist
+def create_data_folder():
+    data_folder = "data"
+    os.makedirs(data_folder, exist_ok=True)
+
+
+# Function to create the 'users.txt' file inside the 'data' folder
+def create_users_file():
+
+    # Call create_data_folder to ensure 'data' folder exists
+    users_txt_path = os.path.join("data", "users.txt")
+    open(users_txt_path, "a").close()
+
+
+data_folder_ready = False
+
+
+# Function to create the 'data' folder and 'users.txt' the first time storage is used (not when the module is imported)
+def prepare_data_folder():
+    global data_folder_ready
+
+    if not data_folder_ready:
+        create_data_folder()
+        create_users_file()
+        data_folder_ready = True
+
+
+# Files every user gets when they register
+REQUIRED_FILES = [
+    "expenses_debits.txt",
+    "expenses_other.txt",
+    "income.txt",
+    "credits.txt",
+    "investments.txt",
+    "investment_calculator.txt",
+    "reports.txt"
+]
+
+# User folders this process has already made sure exist, forgotten once there are more than MAX_CREATED_USER_FOLDERS
+# so batch commands over many users don't keep one entry per user
+created_user_folders = set()
+MAX_CREATED_USER_FOLDERS = 1024
+
+
+# Function to create individual users folder to add their files to
+def create_user_folder(user_name):
+    user_folder = os.path.join("data", "Users", user_name)
+
+    if user_folder not in created_user_folders:
+        os.makedirs(user_folder, exist_ok=True)
+        if len(created_user_folders) >= MAX_CREATED_USER_FOLDERS:
+            created_user_folders.clear()
+        created_user_folders.add(user_folder)
+
+    return user_folder
+
+
+# Function to create files if they do not exist already
+def create_file_if_not_exists(file_path):
+    os.close(os.open(file_path, os.O_WRONLY | os.O_CREAT, 0o666))
+
+
+# Function to create all user files when the user registers
+def create_required_files(user_name):
+    get_storage().create_user_files([user_name])
+
+
+# ------------------ Storage backends ------------------ #
+
+# Storage engine used when nothing else is configured ('text' or 'sqlite')
+DEFAULT_STORAGE = os.environ.get("FINANCE_MANAGER_STORAGE", "text")
+
+# Location of the single database file used by the sqlite storage engine
+SQLITE_DATABASE_PATH = os.environ.get("FINANCE_MANAGER_DATABASE", os.path.join("data", "finance_manager.db"))
+
+# Size a users journal may grow to before it is folded back into the users file
+JOURNAL_COMPACTION_BYTES = int(os.environ.get("FINANCE_MANAGER_JOURNAL_BYTES", 64 * 1024))
+
+# Files loaded into a users ledger when they log in
+LEDGER_FILES = [
+    "expenses_debits.txt",
+    "expenses_other.txt",
+    "income.txt",
+    "credits.txt",
+    "investments.txt",
+    "investment_calculator.txt"
+]
+
+# Each users dated transactions (text storage), and the monthly totals kept up to date as they are added
+TRANSACTIONS_FILE_NAME = "transactions.csv"
+TRANSACTION_ROLLUPS_FILE_NAME = "transactions.rollups.json"
+
+# Keys of each users imported transactions, so importing the same statement again adds nothing
+# The keys are kept sorted, one per line and all the same width, so a key is found without loading the file
+# (see TransactionKeyIndex). Files written before they were sorted are converted when next imported into
+TRANSACTION_KEYS_FILE_NAME = "transactions.keyindex"
+UNSORTED_TRANSACTION_KEYS_FILE_NAME = "transactions.keys"
+TRANSACTION_KEY_SIZE = 16
+
+# Keys added during an import that are held in memory before they are merged into the sorted file
+KEY_MERGE_SIZE = 50000
+
+# Each users month end totals (text storage, see history.py), one fixed-width row per month in month order:
+# the month (year * 12 + month - 1) and the net income, expenses, credits and investments in cents
+HISTORY_FILE_NAME = "history.bin"
+HISTORY_ROW = struct.Struct("<iqqqq")
+
+# Imported transactions written to the database at a time
+IMPORT_CHUNK_SIZE = 1000
+
+# Each users loan terms of their credits, as 'credit,principal|yearly rate %|term in months|frequency'
+CREDIT_TERMS_FILE_NAME = "credit_terms.txt"
+
+storage_engine = None
+
+
+# Function to work out the journal records that turn one version of a file into another
+# Returns None when the keys were reordered, as the journal can't express that and the file must be rewritten
+def get_journal_records(old_data, new_data):
+
+    records = [f"-{key}\n" for key in old_data if key not in new_data]
+    expected_order = [key for key in old_data if key in new_data]
+
+    for key, value in new_data.items():
+        if key not in old_data:
+            expected_order.append(key)
+            records.append(f"+{key},{value}\n")
+        elif old_data[key] != value:
+            records.append(f"+{key},{value}\n")
+
+    if expected_order != list(new_data):
+        return None
+
+    return records
+
+
+# Function to apply the changes between two versions of a file (base to new) on top of the current version
+def merge_changes(current_data, base_data, new_data):
+    merged = dict(current_data)
+
+    for key in base_data:
+        if key not in new_data:
+            merged.pop(key, None)
+
+    for key, value in new_data.items():
+        if base_data.get(key) != value:
+            merged[key] = value
+
+    return merged
+
+
+# Function to add transactions (date, category, amount in cents, memo, kind) to monthly rollups
+# The rollups are {month: {kind: {category: [total in cents, number of transactions]}}}
+def add_to_rollups(rollups, transactions):
+    for date, category, amount_cents, memo, kind in transactions:
+        totals = rollups.setdefault(date[:7], {}).setdefault(kind, {}).setdefault(category, [0, 0])
+        totals[0] += amount_cents
+        totals[1] += 1
+    return rollups
+
+
+# Class to look up a users transaction keys on disk (see TRANSACTION_KEYS_FILE_NAME)
+# A key is found with a binary search over the memory mapped file, keys added are held in memory until KEY_MERGE_SIZE
+# of them are merged into it in one pass, so memory stays the same however many keys a user has
+class TransactionKeyIndex:
+
+    def __init__(self, user_folder):
+        self.path = os.path.join(user_folder, TRANSACTION_KEYS_FILE_NAME)
+        self.pending = set()
+        self.keys = None
+        self.open_file()
+
+        # Keys written before the file was kept sorted are sorted into it (KEY_MERGE_SIZE at a time)
+        unsorted_path = os.path.join(user_folder, UNSORTED_TRANSACTION_KEYS_FILE_NAME)
+        if os.path.exists(unsorted_path):
+            with open(unsorted_path, "r") as file:
+                for line in file:
+                    key = line.strip()
+                    if key and key not in self:
+                        self.add(key)
+            self.merge()
+            os.remove(unsorted_path)
+
+    # Function to map the sorted file for searching (an empty file can't be mapped, it has no keys to find)
+    def open_file(self):
+        try:
+            with open(self.path, "rb") as file:
+                if os.fstat(file.fileno()).st_size:
+                    self.keys = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            pass
+
+    # The number of keys in the file
+    def __len__(self):
+        return len(self.keys) // (TRANSACTION_KEY_SIZE + 1) if self.keys is not None else 0
+
+    # Keys are hashes, spread evenly over their range, so each guess is where the key would be if the keys
+    # between the current bounds were evenly spaced (an interpolation search, a few reads even for millions of keys)
+    def __contains__(self, key):
+        if key in self.pending:
+            return True
+
+        number = int(key, 16)
+        low, high = 0, len(self)
+        low_number, high_number = 0, 16 ** TRANSACTION_KEY_SIZE
+        keys, width = self.keys, TRANSACTION_KEY_SIZE + 1
+
+        while low < high:
+            guess = low + (number - low_number) * (high - low) // (high_number - low_number)
+            guess = min(max(guess, low), high - 1)
+            found = int(keys[guess * width:guess * width + TRANSACTION_KEY_SIZE], 16)
+
+            if found == number:
+                return True
+            if found < number:
+                low, low_number = guess + 1, found
+            else:
+                high, high_number = guess, found
+        return False
+
+    # Function to add a key (raises ValueError for a key that isn't TRANSACTION_KEY_SIZE characters)
+    def add(self, key):
+        if len(key) != TRANSACTION_KEY_SIZE:
+            raise ValueError(f"invalid transaction key '{key}'")
+        self.pending.add(key)
+        if len(self.pending) >= KEY_MERGE_SIZE:
+            self.merge()
+
+    # Function to go through the keys of the sorted file in order
+    def iterate(self):
+        if self.keys is not None:
+            self.keys.seek(0)
+            for line in iter(self.keys.readline, b""):
+                yield line[:TRANSACTION_KEY_SIZE].decode()
+
+    # Function to write the file again with the keys added since the last merge
+    def merge(self):
+        if not self.pending:
+            return
+
+        with open(self.path + ".tmp", "w") as file:
+            file.writelines(key + "\n" for key in heapq.merge(self.iterate(), sorted(self.pending)))
+        self.close()
+        os.replace(self.path + ".tmp", self.path)
+
+        self.pending = set()
+        self.open_file()
+
+    def close(self):
+        if self.keys is not None:
+            self.keys.close()
+            self.keys = None
+
+
+# Class to store each user's data as separate 'key,value' text files (original layout)
+# Every file is a checkpoint plus an append-only '.journal' of the changes made since it was written
+class TextStorage:
+    name = "text"
+
+    def __init__(self):
+        self.credentials = None
+        self.snapshots = {}  # file path -> (file signature, last data read or written)
+        self.merged = set()  # file paths holding changes from other sessions that their snapshot doesn't have
+        self.locks = {}
+        self.locks_lock = threading.Lock()
+        self.compacting = set()
+
+    # Function to open the credential index the first time it is needed
+    def get_credentials(self):
+        if self.credentials is None:
+            os.makedirs("data", exist_ok=True)
+            self.credentials = CredentialIndex(os.path.join("data", "users.txt"), os.path.join("data", "users.idx"))
+            self.credentials.open()
+        return self.credentials
+
+    # Function to get the lock that guards a users files against other processes (see locks.FileLock)
+    @staticmethod
+    def get_user_lock(user_name, exclusive):
+        user_folder = create_user_folder(user_name)
+        return FileLock(os.path.join(user_folder, ".lock"), exclusive)
+
+    # Function to get the lock that guards one users file inside this process
+    def get_lock(self, file_path):
+        with self.locks_lock:
+            if file_path not in self.locks:
+                self.locks[file_path] = threading.RLock()
+            return self.locks[file_path]
+
+    # Function to get the size and modified time of a file and its journal, to notice changes made by other processes
+    @staticmethod
+    def get_signature(file_path):
+        signature = []
+        for path in (file_path, file_path + ".journal"):
+            try:
+                file_stat = os.stat(path)
+                signature.append((file_stat.st_size, file_stat.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    # Function to read a 'key,value' checkpoint file into a dictionary
+    @staticmethod
+    def read_checkpoint(file_path):
+        if os.path.exists(file_path):
+            with open(file_path, "r") as file:
+                lines = file.readlines()
+                if not lines:
+                    return {}  # Return an empty dictionary if the file is empty
+                data = {}
+                for line in lines:
+                    key, value = line.strip().split(',', 1)
+                    data[key] = value
+                return data
+        else:
+            return {}  # Return an empty dictionary if the file doesn't exist
+
+    # Function to apply the '+key,value' (add or amend) and '-key' (remove) records of a journal to the data
+    @staticmethod
+    def replay_journal(journal_path, data):
+        if not os.path.exists(journal_path):
+            return data
+
+        with open(journal_path, "r") as journal:
+            for line in journal:
+                if not line.endswith("\n"):
+                    break  # Ignore a record that was cut off part way through being written
+                if line[0] == "+":
+                    key, value = line[1:-1].split(",", 1)
+                    data[key] = value
+                elif line[0] == "-":
+                    data.pop(line[1:-1], None)
+        return data
+
+    # Function to rewrite a checkpoint with the full data and start a new, empty journal
+    @staticmethod
+    def write_checkpoint(file_path, data):
+        temporary_path = file_path + ".tmp"
+
+        with open(temporary_path, "w") as file:
+            file.write("".join(f"{key},{value}\n" for key, value in data.items()))
+
+        os.replace(temporary_path, file_path)
+
+        if os.path.exists(file_path + ".journal"):
+            os.remove(file_path + ".journal")
+
+    # Function to read a users file into a dictionary
+    def read(self, user_name, file_name, create=False):
+
+        if file_name == "users.txt":
+            with FileLock(os.path.join("data", "users.txt.lock"), exclusive=False):
+                return self.read_checkpoint(os.path.join("data", file_name))
+
+        user_folder = create_user_folder(user_name)
+        file_path = os.path.join(user_folder, file_name)
+
+        # If the file doesn't exist and create is True, create an empty file
+        if not os.path.exists(file_path) and create:
+
+            with open(file_path, "w"):
+                pass
+
+        with self.get_user_lock(user_name, exclusive=False), self.get_lock(file_path):
+            data = self.replay_journal(file_path + ".journal", self.read_checkpoint(file_path))
+            signature = self.get_signature(file_path)
+            self.snapshots[file_path] = (signature, dict(data))
+            self.merged.discard(file_path)
+
+        if metrics.metrics_enabled:
+            metrics.add_count("bytes_read", sum(part[0] for part in signature if part))
+
+        return data
+
+    # Function to write a dictionary to a users file by appending only the changes to its journal
+    # Only the keys this process changed since it last read or wrote the file are written, so changes another
+    # session made to other keys in the meantime are kept. Returns False when the file now also holds such changes
+    def write(self, user_name, file_name, data):
+
+        file_path = os.path.join("data", "Users", user_name, file_name)
+
+        # Create the folder if it doesn't exist
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        new_data = {key: str(value) for key, value in data.items()}
+
+        with self.get_user_lock(user_name, exclusive=True), self.get_lock(file_path):
+            signature, old_data = self.snapshots.get(file_path, (None, None))
+
+            # Nothing to compare against if this process has not seen the file yet
+            if old_data is None:
+                self.read(user_name, file_name)
+                signature, old_data = self.snapshots[file_path]
+
+            if signature != self.get_signature(file_path):
+                self.merged.add(file_path)
+            records = get_journal_records(old_data, new_data)
+
+            if records is None:
+                # Keys were reordered so the file is rewritten, with the other sessions changes merged in
+                checkpoint_data = new_data
+                if file_path in self.merged:
+                    current_data = self.replay_journal(file_path + ".journal", self.read_checkpoint(file_path))
+                    checkpoint_data = merge_changes(current_data, old_data, new_data)
+                self.write_checkpoint(file_path, checkpoint_data)
+                written = self.get_signature(file_path)[0][0]
+            elif records:
+                with open(file_path + ".journal", "a") as journal:
+                    written = journal.write("".join(records))
+            else:
+                written = 0
+
+            if metrics.metrics_enabled:
+                metrics.add_count("bytes_written", written)
+
+            self.snapshots[file_path] = (self.get_signature(file_path), new_data)
+
+            journal_signature = self.snapshots[file_path][0][1]
+            if journal_signature and journal_signature[0] > JOURNAL_COMPACTION_BYTES:
+                self.start_compaction(user_name, file_name)
+
+            return file_path not in self.merged
+
+    # Function to fold a journal back into its checkpoint on a background thread
+    def start_compaction(self, user_name, file_name):
+        file_path = os.path.join("data", "Users", user_name, file_name)
+
+        with self.locks_lock:
+            if file_path in self.compacting:
+                return
+            self.compacting.add(file_path)
+
+        threading.Thread(target=self.compact, args=(user_name, file_name), daemon=True).start()
+
+    # Function to rewrite a checkpoint from the checkpoint and journal on disk
+    def compact(self, user_name, file_name):
+        file_path = os.path.join("data", "Users", user_name, file_name)
+
+        try:
+            with self.get_user_lock(user_name, exclusive=True), self.get_lock(file_path):
+                data = self.replay_journal(file_path + ".journal", self.read_checkpoint(file_path))
+                aggregates_current = self.read_aggregates(user_name, file_name) is not None
+                self.write_checkpoint(file_path, data)
+                self.snapshots[file_path] = (self.get_signature(file_path), data)
+
+                # Rewriting the checkpoint changes its signature, so carry up to date aggregates over to it
+                if aggregates_current:
+                    self.write_aggregates(user_name, file_name, get_money_aggregates(data, file_name))
+        finally:
+            with self.locks_lock:
+                self.compacting.discard(file_path)
+
+    # Function to save the aggregates of a money file with the signature of the file they were calculated from
+    def write_aggregates(self, user_name, file_name, aggregates):
+        file_path = os.path.join("data", "Users", user_name, file_name)
+
+        with self.get_user_lock(user_name, exclusive=True), self.get_lock(file_path):
+            with open(file_path + ".agg.tmp", "w") as file:
+                json.dump({"signature": self.get_signature(file_path), **aggregates}, file)
+            os.replace(file_path + ".agg.tmp", file_path + ".agg")
+
+    # Function to read the saved aggregates of a money file, None if there are none or the file changed since
+    def read_aggregates(self, user_name, file_name):
+        file_path = os.path.join("data", "Users", user_name, file_name)
+
+        with self.get_user_lock(user_name, exclusive=False):
+            try:
+                with open(file_path + ".agg", "r") as file:
+                    aggregates = json.load(file)
+            except (FileNotFoundError, ValueError):
+                return None
+
+            signature = aggregates.pop("signature")
+            if tuple(tuple(part) if part else None for part in signature) != self.get_signature(file_path):
+                return None
+            return aggregates
+
+    # Function to get a value that changes whenever any of a users ledger files change (sizes and modified times)
+    def get_fingerprint(self, user_name):
+        fingerprint = hashlib.sha1()
+        for file_name in LEDGER_FILES + [CREDIT_TERMS_FILE_NAME]:
+            file_path = os.path.join("data", "Users", user_name, file_name)
+            fingerprint.update(repr((file_name, self.get_signature(file_path))).encode())
+
+        transactions_path = os.path.join("data", "Users", user_name, TRANSACTIONS_FILE_NAME)
+        fingerprint.update(repr(self.get_signature(transactions_path)).encode())
+        return fingerprint.hexdigest()
+
+    # Function to write many users files (user name, file name, data), one after the other
+    # Files no session has read are forgotten again after their write, so memory doesn't grow with the number of users
+    def write_many(self, items):
+        for user_name, file_name, data in items:
+            file_path = os.path.join("data", "Users", user_name, file_name)
+            tracked = file_path in self.snapshots
+
+            self.write(user_name, file_name, data)
+            if not tracked:
+                self.forget(file_path)
+
+    # Function to drop the snapshot and lock this process keeps for a file (they are made again when next needed)
+    # A lock some thread is holding is kept
+    def forget(self, file_path):
+        with self.locks_lock:
+            lock = self.locks.get(file_path)
+            if lock is not None:
+                if not lock.acquire(blocking=False):
+                    return
+                del self.locks[file_path]
+                lock.release()
+
+            self.snapshots.pop(file_path, None)
+            self.merged.discard(file_path)
+
+    # Function to forget every file of a user, e.g. when their session ends
+    def forget_user(self, user_name):
+        user_folder = os.path.join("data", "Users", user_name) + os.sep
+        for file_path in [file_path for file_path in list(self.snapshots) if file_path.startswith(user_folder)]:
+            self.forget(file_path)
+
+    # Function to read the 'date,category,amount_cents,memo,kind' lines of a transactions file from 'offset'
+    # Returns the transactions and the offset just after the last whole line
+    @staticmethod
+    def read_transaction_lines(file_path, offset=0):
+        try:
+            with open(file_path, "rb") as file:
+                file.seek(offset)
+                data = file.read()
+        except FileNotFoundError:
+            return [], 0
+
+        end = data.rfind(b"\n") + 1  # Ignore a line that was cut off part way through being written
+        transactions = [
+            (date, category, int(amount_cents), memo, kind)
+            for date, category, amount_cents, memo, kind in csv.reader(data[:end].decode().splitlines())
+        ]
+
+        if metrics.metrics_enabled:
+            metrics.add_count("bytes_read", end)
+
+        return transactions, offset + end
+
+    # Function to read a users saved rollups, adding the transactions appended after they were saved
+    # Returns {"size": bytes of the transactions file they cover, "months": rollups}
+    def read_rollups_file(self, user_name):
+        user_folder = os.path.join("data", "Users", user_name)
+        transactions_path = os.path.join(user_folder, TRANSACTIONS_FILE_NAME)
+
+        try:
+            with open(os.path.join(user_folder, TRANSACTION_ROLLUPS_FILE_NAME), "r") as file:
+                rollups = json.load(file)
+        except (FileNotFoundError, ValueError):
+            rollups = {"size": 0, "months": {}}
+
+        # The transactions file was replaced by a shorter one, so add it up again from the start
+        try:
+            if rollups["size"] > os.path.getsize(transactions_path):
+                rollups = {"size": 0, "months": {}}
+        except FileNotFoundError:
+            return {"size": 0, "months": {}}
+
+        new_transactions, rollups["size"] = self.read_transaction_lines(transactions_path, rollups["size"])
+        add_to_rollups(rollups["months"], new_transactions)
+        return rollups
+
+    # Function to append transactions to a users transactions file and add them to the saved rollups
+    def append_transactions(self, user_name, transactions):
+        self.import_transactions(user_name, ((None, transaction) for transaction in transactions))
+
+    # Function to go through the keys of a users imported transactions in order (see import_transactions)
+    def iterate_transaction_keys(self, user_name):
+        with self.get_user_lock(user_name, exclusive=True):
+            keys = TransactionKeyIndex(create_user_folder(user_name))
+            try:
+                yield from keys.iterate()
+            finally:
+                keys.close()
+
+    # Function to append (key, transaction) pairs to a users transactions, skipping keys that were added before
+    # (transactions with the key None are always added), including keys added earlier in the same call
+    # The pairs are streamed to the file under a single hold of the users lock and the rollups are saved once
+    # Keys are looked up on disk (see TransactionKeyIndex), so memory doesn't grow with the number of keys
+    # Returns the number of transactions added and skipped
+    def import_transactions(self, user_name, keyed_transactions):
+        user_folder = create_user_folder(user_name)
+        transactions_path = os.path.join(user_folder, TRANSACTIONS_FILE_NAME)
+        added = skipped = 0
+
+        with self.get_user_lock(user_name, exclusive=True):
+            rollups = self.read_rollups_file(user_name)
+            keys = None
+
+            try:
+                with open(transactions_path, "a", newline="") as file:
+                    file.truncate(rollups["size"])  # Drop a line that was cut off part way through being written
+                    writer = csv.writer(file, lineterminator="\n")
+
+                    for key, transaction in keyed_transactions:
+                        if key is not None:
+                            if keys is None:
+                                keys = TransactionKeyIndex(user_folder)
+                            if key in keys:
+                                skipped += 1
+                                continue
+                            keys.add(key)
+
+                        writer.writerow(transaction)
+                        add_to_rollups(rollups["months"], [transaction])
+                        added += 1
+
+                if keys is not None:
+                    keys.merge()
+            finally:
+                if keys is not None:
+                    keys.close()
+
+            written = os.path.getsize(transactions_path) - rollups["size"]
+            rollups["size"] += written
+            self.write_rollups_file(user_name, rollups)
+
+        if metrics.metrics_enabled:
+            metrics.add_count("bytes_written", written)
+
+        return added, skipped
+
+    # Function to replace a users saved rollups (see read_rollups_file)
+    @staticmethod
+    def write_rollups_file(user_name, rollups):
+        rollups_path = os.path.join("data", "Users", user_name, TRANSACTION_ROLLUPS_FILE_NAME)
+        with open(rollups_path + ".tmp", "w") as file:
+            json.dump(rollups, file)
+        os.replace(rollups_path + ".tmp", rollups_path)
+
+    # Function to change the category of a users transactions: 'categorize' is given each transaction and returns
+    # its new category, or None to leave it. The file is rewritten a line at a time and its rollups added up again
+    # Returns the number of transactions changed
+    def recategorize_transactions(self, user_name, categorize):
+        transactions_path = os.path.join("data", "Users", user_name, TRANSACTIONS_FILE_NAME)
+        rollups = {"size": 0, "months": {}}
+        changed = 0
+
+        with self.get_user_lock(user_name, exclusive=True):
+            try:
+                file = open(transactions_path, "r", newline="")
+            except FileNotFoundError:
+                return 0
+
+            with file, open(transactions_path + ".tmp", "w", newline="") as new_file:
+                writer = csv.writer(new_file, lineterminator="\n")
+
+                # A line that was cut off part way through being written is left out
+                lines = itertools.takewhile(lambda line: line.endswith("\n"), file)
+                for date, category, amount_cents, memo, kind in csv.reader(lines):
+                    transaction = (date, category, int(amount_cents), memo, kind)
+
+                    new_category = categorize(transaction)
+                    if new_category is not None and new_category != category:
+                        transaction = (date, new_category, int(amount_cents), memo, kind)
+                        changed += 1
+
+                    writer.writerow(transaction)
+                    add_to_rollups(rollups["months"], [transaction])
+
+            if not changed:
+                os.remove(transactions_path + ".tmp")
+                return 0
+
+            os.replace(transactions_path + ".tmp", transactions_path)
+            rollups["size"] = os.path.getsize(transactions_path)
+            self.write_rollups_file(user_name, rollups)
+
+        if metrics.metrics_enabled:
+            metrics.add_count("bytes_written", rollups["size"])
+
+        return changed
+
+    # Function to read a users transactions in the order they were added, only those of 'month' ('YYYY-MM') if given
+    def read_transactions(self, user_name, month=None):
+        transactions_path = os.path.join("data", "Users", user_name, TRANSACTIONS_FILE_NAME)
+
+        with self.get_user_lock(user_name, exclusive=False):
+            transactions = self.read_transaction_lines(transactions_path)[0]
+
+        if month is None:
+            return transactions
+        return [transaction for transaction in transactions if transaction[0].startswith(month + "-")]
+
+    # Function to read a users monthly rollups (see add_to_rollups), only those of 'month' if given
+    def read_rollups(self, user_name, month=None):
+        with self.get_user_lock(user_name, exclusive=False):
+            months = self.read_rollups_file(user_name)["months"]
+
+        if month is None:
+            return months
+        return {month: months[month]} if month in months else {}
+
+    # Function to save a users totals for a month (see HISTORY_ROW), replacing that months row if it is the last one
+    # Rows are only written over or added, the file never shrinks while readers may have it memory mapped
+    def record_history(self, user_name, row):
+        history_path = os.path.join(create_user_folder(user_name), HISTORY_FILE_NAME)
+
+        with self.get_user_lock(user_name, exclusive=True):
+            open(history_path, "ab").close()
+
+            with open(history_path, "r+b") as file:
+                size = file.seek(0, os.SEEK_END)
+                size -= size % HISTORY_ROW.size  # A row cut off part way through being written is written over
+
+                last_month = None
+                if size:
+                    file.seek(size - HISTORY_ROW.size)
+                    last_month = HISTORY_ROW.unpack(file.read(HISTORY_ROW.size))[0]
+
+                if last_month is not None and row[0] < last_month:
+                    return  # Only the latest month can change, earlier months are history
+
+                # Overwrite this months row, or add it after the last whole row
+                if row[0] == last_month:
+                    size -= HISTORY_ROW.size
+                file.seek(size)
+                file.write(HISTORY_ROW.pack(*row))
+
+    # Function to map a users history file as an array of 'dtype' rows, empty if they have no history yet
+    # The rows are read from the file only when used, so slices of it cost nothing until then
+    def read_history(self, user_name, dtype):
+        # Imported here so the menus start without loading NumPy
+        import numpy as np
+
+        history_path = os.path.join("data", "Users", user_name, HISTORY_FILE_NAME)
+
+        with self.get_user_lock(user_name, exclusive=False):
+            try:
+                rows = os.path.getsize(history_path) // HISTORY_ROW.size
+            except FileNotFoundError:
+                rows = 0
+
+            if rows == 0:
+                return np.zeros(0, dtype=dtype)
+            return np.memmap(history_path, dtype=dtype, mode="r", shape=(rows,))
+
+    # Function to create the empty files of many users, one folder and one open per file
+    def create_user_files(self, user_names):
+        for user_name in user_names:
+            user_folder = create_user_folder(user_name)
+
+            for file_name in REQUIRED_FILES:
+                create_file_if_not_exists(os.path.join(user_folder, file_name))
+
+    # Function to append a new username and password to users.txt
+    def add_user(self, username, password):
+        self.get_credentials().add_user(username, password)
+
+    # Function to append many usernames and passwords to users.txt in one write
+    def add_users(self, users):
+        self.get_credentials().add_users(users)
+
+    # Function to look up the password of a user through the credential index
+    def get_password(self, username):
+        return self.get_credentials().get_password(username)
+
+    # Function to list every user that has a folder
+    def list_users(self):
+        users_folder = os.path.join("data", "Users")
+        if not os.path.isdir(users_folder):
+            return []
+        return sorted(entry.name for entry in os.scandir(users_folder) if entry.is_dir())
+
+
+# Class to store all users and their files in one SQLite database, indexed by user and section
+class SqliteStorage:
+    name = "sqlite"
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS users (
+            user_name TEXT PRIMARY KEY,
+            password TEXT NOT NULL
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS entries (
+            user_name TEXT NOT NULL,
+            section TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (user_name, section, position)
+        ) WITHOUT ROWID;
+
+        CREATE UNIQUE INDEX IF NOT EXISTS entries_by_key ON entries (user_name, section, key);
+
+        CREATE TABLE IF NOT EXISTS aggregates (
+            user_name TEXT NOT NULL,
+            section TEXT NOT NULL,
+            total_cents INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            min_cents INTEGER,
+            max_cents INTEGER,
+            PRIMARY KEY (user_name, section)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS versions (
+            user_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY,
+            user_name TEXT NOT NULL,
+            date TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount_cents INTEGER NOT NULL,
+            memo TEXT NOT NULL,
+            kind TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS transactions_by_date ON transactions (user_name, date);
+
+        CREATE TABLE IF NOT EXISTS transaction_rollups (
+            user_name TEXT NOT NULL,
+            month TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total_cents INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (user_name, month, kind, category)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS transaction_keys (
+            user_name TEXT NOT NULL,
+            key TEXT NOT NULL,
+            PRIMARY KEY (user_name, key)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS history (
+            user_name TEXT NOT NULL,
+            month INTEGER NOT NULL,
+            net_income INTEGER NOT NULL,
+            expenses INTEGER NOT NULL,
+            credits INTEGER NOT NULL,
+            investments INTEGER NOT NULL,
+            PRIMARY KEY (user_name, month)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, database_path):
+        self.database_path = database_path
+        self.local = threading.local()
+        self.snapshots = {}  # (user name, section) -> last data read or written by this process
+
+    # Function to open the database the first time a thread needs it
+    # Each thread has its own connection, so readers run in parallel and SQLite serializes the writers
+    def connect(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.database_path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.database_path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self.schema)
+            self.local.connection = connection
+        return connection
+
+    # Function to read one section of a user into a dictionary (keeps the original order)
+    def read(self, user_name, file_name, create=False):
+        connection = self.connect()
+
+        if file_name == "users.txt":
+            rows = connection.execute("SELECT user_name, password FROM users")
+        else:
+            rows = connection.execute(
+                "SELECT key, value FROM entries WHERE user_name = ? AND section = ? ORDER BY position",
+                (user_name, file_name)
+            )
+        data = dict(rows)
+
+        if file_name != "users.txt":
+            self.snapshots[(user_name, file_name)] = dict(data)
+
+        # Counted as the size the rows would have as 'key,value' lines
+        if metrics.metrics_enabled:
+            metrics.add_count("bytes_read", sum(len(key) + len(value) + 2 for key, value in data.items()))
+
+        return data
+
+    # Function to save one section of a user, only touching the rows that changed
+    # Like TextStorage.write, keeps changes other sessions made since this process read the section
+    def write(self, user_name, file_name, data):
+        connection = self.connect()
+        base_data = self.snapshots.get((user_name, file_name))
+
+        with connection:
+            unchanged_elsewhere = self.write_rows(connection, user_name, file_name, data, base_data)
+
+        self.snapshots[(user_name, file_name)] = {key: str(value) for key, value in data.items()}
+        return unchanged_elsewhere
+
+    # Function to forget the sections of a user this process read or wrote, e.g. when their session ends
+    def forget_user(self, user_name):
+        for key in [key for key in list(self.snapshots) if key[0] == user_name]:
+            self.snapshots.pop(key, None)
+
+    # Function to save many sections (user name, file name, data) in a single transaction
+    # No snapshots are kept, so memory doesn't grow with the number of users
+    def write_many(self, items):
+        connection = self.connect()
+
+        with connection:
+            for user_name, file_name, data in items:
+                self.write_rows(connection, user_name, file_name, data)
+
+    # Function to update the rows of one section inside the current transaction
+    # Returns False when other changes made since 'base_data' was read were merged in
+    @staticmethod
+    def write_rows(connection, user_name, file_name, data, base_data=None):
+        new_data = {key: str(value) for key, value in data.items()}
+
+        if metrics.metrics_enabled:
+            metrics.add_count("bytes_written", sum(len(key) + len(value) + 2 for key, value in new_data.items()))
+
+        # Saved aggregates no longer match until write_aggregates is called for the new rows
+        connection.execute("DELETE FROM aggregates WHERE user_name = ? AND section = ?", (user_name, file_name))
+
+        rows = connection.execute(
+            "SELECT key, value, position FROM entries WHERE user_name = ? AND section = ? ORDER BY position",
+            (user_name, file_name)
+        ).fetchall()
+        old_data = {key: value for key, value, position in rows}
+
+        # The first write statement above locked the database, so no other session can change the rows now
+        changed_elsewhere = base_data is not None and base_data != old_data
+        if changed_elsewhere:
+            new_data = merge_changes(old_data, base_data, new_data)
+
+        records = get_journal_records(old_data, new_data)
+
+        if records != []:
+            SqliteStorage.add_version(connection, user_name)
+
+        # Keys were reordered so the section is replaced as a whole
+        if records is None:
+            connection.execute("DELETE FROM entries WHERE user_name = ? AND section = ?", (user_name, file_name))
+            connection.executemany(
+                "INSERT INTO entries (user_name, section, position, key, value) VALUES (?, ?, ?, ?, ?)",
+                ((user_name, file_name, position, key, value) for position, (key, value) in enumerate(new_data.items()))
+            )
+            return not changed_elsewhere
+
+        next_position = rows[-1][2] + 1 if rows else 0
+        for key in old_data:
+            if key not in new_data:
+                connection.execute("DELETE FROM entries WHERE user_name = ? AND section = ? AND key = ?", (user_name, file_name, key))
+
+        for key, value in new_data.items():
+            if key not in old_data:
+                connection.execute(
+                    "INSERT INTO entries (user_name, section, position, key, value) VALUES (?, ?, ?, ?, ?)",
+                    (user_name, file_name, next_position, key, value)
+                )
+                next_position += 1
+            elif old_data[key] != value:
+                connection.execute(
+                    "UPDATE entries SET value = ? WHERE user_name = ? AND section = ? AND key = ?",
+                    (value, user_name, file_name, key)
+                )
+
+        return not changed_elsewhere
+
+    # Function to count a change to a users sections, so get_fingerprint doesn't have to read them
+    @staticmethod
+    def add_version(connection, user_name):
+        connection.execute(
+            "INSERT INTO versions (user_name, version) VALUES (?, 1) ON CONFLICT (user_name) DO UPDATE SET version = version + 1",
+            (user_name,)
+        )
+
+    # Function to create the sections of new users (empty sections have no rows, so there is nothing to write)
+    def create_user_files(self, user_names):
+        self.connect()
+
+    # Function to add or replace a users password
+    def add_user(self, username, password):
+        connection = self.connect()
+
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO users (user_name, password) VALUES (?, ?)", (username, password))
+
+    # Function to add or replace many users passwords in a single transaction
+    def add_users(self, users):
+        connection = self.connect()
+
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO users (user_name, password) VALUES (?, ?)", users)
+
+    # Function to save the aggregates of a money section
+    def write_aggregates(self, user_name, file_name, aggregates):
+        connection = self.connect()
+
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO aggregates (user_name, section, total_cents, count, min_cents, max_cents) VALUES (?, ?, ?, ?, ?, ?)",
+                (user_name, file_name, aggregates["total_cents"], aggregates["count"], aggregates["min_cents"], aggregates["max_cents"])
+            )
+
+    # Function to read the saved aggregates of a money section, None if there are none
+    def read_aggregates(self, user_name, file_name):
+        connection = self.connect()
+        row = connection.execute(
+            "SELECT total_cents, count, min_cents, max_cents FROM aggregates WHERE user_name = ? AND section = ?",
+            (user_name, file_name)
+        ).fetchone()
+
+        if row is None:
+            return None
+        return dict(zip(("total_cents", "count", "min_cents", "max_cents"), row))
+
+    # Function to add a users transactions and their rollups in a single transaction
+    def append_transactions(self, user_name, transactions):
+        connection = self.connect()
+
+        with connection:
+            self.insert_transactions(connection, user_name, transactions)
+
+    # Function to add (key, transaction) pairs to a users transactions in a single transaction, skipping keys that
+    # were added before (see TextStorage.import_transactions). The pairs are read and inserted IMPORT_CHUNK_SIZE at a time
+    # Returns the number of transactions added and skipped
+    def import_transactions(self, user_name, keyed_transactions):
+        connection = self.connect()
+        keyed_transactions = iter(keyed_transactions)
+        added = skipped = 0
+
+        with connection:
+            while True:
+                chunk = list(itertools.islice(keyed_transactions, IMPORT_CHUNK_SIZE))
+                if not chunk:
+                    break
+
+                chunk_keys = [key for key, transaction in chunk if key is not None]
+                seen = {
+                    row[0] for row in connection.execute(
+                        f"SELECT key FROM transaction_keys WHERE user_name = ? AND key IN ({', '.join('?' * len(chunk_keys))})",
+                        (user_name, *chunk_keys)
+                    )
+                } if chunk_keys else set()
+
+                transactions = []
+                for key, transaction in chunk:
+                    if key is not None:
+                        if key in seen:
+                            skipped += 1
+                            continue
+                        seen.add(key)
+                        connection.execute("INSERT INTO transaction_keys (user_name, key) VALUES (?, ?)", (user_name, key))
+                    transactions.append(transaction)
+
+                if transactions:
+                    self.insert_transactions(connection, user_name, transactions)
+                    added += len(transactions)
+
+        return added, skipped
+
+    # Function to insert transactions and add them to the rollups inside the current transaction
+    @staticmethod
+    def insert_transactions(connection, user_name, transactions):
+        connection.executemany(
+            "INSERT INTO transactions (user_name, date, category, amount_cents, memo, kind) VALUES (?, ?, ?, ?, ?, ?)",
+            ((user_name, *transaction) for transaction in transactions)
+        )
+
+        # Added up first, so each month and category is one upsert however many transactions it has
+        rollups = add_to_rollups({}, transactions)
+        connection.executemany(
+            "INSERT INTO transaction_rollups (user_name, month, kind, category, total_cents, count) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (user_name, month, kind, category) DO UPDATE SET "
+            "total_cents = total_cents + excluded.total_cents, count = count + excluded.count",
+            (
+                (user_name, month, kind, category, total_cents, count)
+                for month, kinds in rollups.items()
+                for kind, categories in kinds.items()
+                for category, (total_cents, count) in categories.items()
+            )
+        )
+        SqliteStorage.add_version(connection, user_name)
+
+        if metrics.metrics_enabled:
+            metrics.add_count("bytes_written", sum(len(",".join(map(str, transaction))) + 1 for transaction in transactions))
+
+    # Function to read a users transactions in the order they were added, only those of 'month' ('YYYY-MM') if given
+    def read_transactions(self, user_name, month=None):
+        connection = self.connect()
+
+        if month is None:
+            rows = connection.execute(
+                "SELECT date, category, amount_cents, memo, kind FROM transactions WHERE user_name = ? ORDER BY id",
+                (user_name,)
+            )
+        else:
+            rows = connection.execute(
+                "SELECT date, category, amount_cents, memo, kind FROM transactions "
+                "WHERE user_name = ? AND date BETWEEN ? AND ? ORDER BY id",
+                (user_name, month + "-01", month + "-31")
+            )
+        return rows.fetchall()
+
+    # Function to change the category of a users transactions (see TextStorage.recategorize_transactions)
+    # The transactions are read IMPORT_CHUNK_SIZE at a time and their rollups are added up again, in one transaction
+    def recategorize_transactions(self, user_name, categorize):
+        connection = self.connect()
+        changed = 0
+        last_id = 0
+
+        with connection:
+            while True:
+                rows = connection.execute(
+                    "SELECT id, date, category, amount_cents, memo, kind FROM transactions "
+                    "WHERE user_name = ? AND id > ? ORDER BY id LIMIT ?",
+                    (user_name, last_id, IMPORT_CHUNK_SIZE)
+                ).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+
+                updates = []
+                for row in rows:
+                    new_category = categorize(row[1:])
+                    if new_category is not None and new_category != row[2]:
+                        updates.append((new_category, row[0]))
+
+                connection.executemany("UPDATE transactions SET category = ? WHERE id = ?", updates)
+                changed += len(updates)
+
+            if changed:
+                connection.execute("DELETE FROM transaction_rollups WHERE user_name = ?", (user_name,))
+                connection.execute(
+                    "INSERT INTO transaction_rollups (user_name, month, kind, category, total_cents, count) "
+                    "SELECT user_name, substr(date, 1, 7), kind, category, SUM(amount_cents), COUNT(*) FROM transactions "
+                    "WHERE user_name = ? GROUP BY substr(date, 1, 7), kind, category",
+                    (user_name,)
+                )
+                self.add_version(connection, user_name)
+
+        return changed
+
+    # Function to read a users monthly rollups (see add_to_rollups), only those of 'month' if given
+    def read_rollups(self, user_name, month=None):
+        connection = self.connect()
+
+        if month is None:
+            rows = connection.execute(
+                "SELECT month, kind, category, total_cents, count FROM transaction_rollups WHERE user_name = ?", (user_name,)
+            )
+        else:
+            rows = connection.execute(
+                "SELECT month, kind, category, total_cents, count FROM transaction_rollups WHERE user_name = ? AND month = ?",
+                (user_name, month)
+            )
+
+        rollups = {}
+        for month, kind, category, total_cents, count in rows:
+            rollups.setdefault(month, {}).setdefault(kind, {})[category] = [total_cents, count]
+        return rollups
+
+    # Function to save a users totals for a month (month, net income, expenses, credits, investments)
+    # Like TextStorage.record_history, months before the latest one recorded are left as they are
+    def record_history(self, user_name, row):
+        connection = self.connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO history (user_name, month, net_income, expenses, credits, investments) "
+                "SELECT ?, ?, ?, ?, ?, ? WHERE ? >= (SELECT COALESCE(MAX(month), ?) FROM history WHERE user_name = ?)",
+                (user_name, *row, row[0], row[0], user_name)
+            )
+
+    # Function to read a users history as an array of 'dtype' rows in month order, empty if they have no history yet
+    def read_history(self, user_name, dtype):
+        # Imported here so the menus start without loading NumPy
+        import numpy as np
+
+        connection = self.connect()
+        rows = connection.execute(
+            "SELECT month, net_income, expenses, credits, investments FROM history WHERE user_name = ? ORDER BY month",
+            (user_name,)
+        ).fetchall()
+        return np.array(rows, dtype=dtype) if rows else np.zeros(0, dtype=dtype)
+
+    # Function to get a value that changes whenever any of a users sections change (their version number)
+    def get_fingerprint(self, user_name):
+        connection = self.connect()
+        row = connection.execute("SELECT version FROM versions WHERE user_name = ?", (user_name,)).fetchone()
+        return f"version-{row[0] if row else 0}"
+
+    # Function to look up the password of a user by its primary key
+    def get_password(self, username):
+        connection = self.connect()
+        row = connection.execute("SELECT password FROM users WHERE user_name = ?", (username,)).fetchone()
+        return row[0] if row else None
+
+    # Function to list every registered user and every user with saved data
+    def list_users(self):
+        connection = self.connect()
+        rows = connection.execute("SELECT user_name FROM users UNION SELECT DISTINCT user_name FROM entries ORDER BY user_name")
+        return [row[0] for row in rows]
+
+
+# Function to select the storage engine used by read_from_file and write_to_file
+def configure_storage(name=None):
+    global storage_engine
+
+    name = name or DEFAULT_STORAGE
+
+    if name == "text":
+        storage_engine = TextStorage()
+    elif name == "sqlite":
+        storage_engine = SqliteStorage(SQLITE_DATABASE_PATH)
+    else:
+        raise ValueError(f"Unknown storage engine '{name}'. Use 'text' or 'sqlite'.")
+
+    return storage_engine
+
+
+# Function to get the active storage engine
+def get_storage():
+    if not data_folder_ready:
+        prepare_data_folder()
+    if storage_engine is None:
+        configure_storage()
+    return storage_engine
+
+
+# Function to find which user a folder from create_user_folder belongs to
+def get_user_from_folder(folder):
+    return os.path.basename(os.path.normpath(folder))
+
+
+# Function to bulk import the text file tree into the sqlite database
+def migrate_text_to_sqlite(database_path=SQLITE_DATABASE_PATH):
+
+    text_storage = TextStorage()
+    sqlite_storage = SqliteStorage(database_path)
+    connection = sqlite_storage.connect()
+
+    users = text_storage.read("data", "users.txt")
+    user_names = text_storage.list_users()
+    entry_count = 0
+    transaction_count = 0
+
+    # One transaction for the whole import so the database is only synced once
+    with connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO users (user_name, password) VALUES (?, ?)", users.items()
+        )
+
+        for user_name in user_names:
+            user_folder = os.path.join("data", "Users", user_name)
+
+            # A file may only have a journal so far, its checkpoint is written when the journal is compacted
+            file_names = sorted({
+                entry.name[:-len(".journal")] if entry.name.endswith(".journal") else entry.name
+                for entry in os.scandir(user_folder) if entry.name.endswith((".txt", ".txt.journal"))
+            })
+
+            for file_name in file_names:
+                data = text_storage.read(user_name, file_name)
+                sqlite_storage.add_version(connection, user_name)
+                connection.execute("DELETE FROM entries WHERE user_name = ? AND section = ?", (user_name, file_name))
+                connection.executemany(
+                    "INSERT INTO entries (user_name, section, position, key, value) VALUES (?, ?, ?, ?, ?)",
+                    ((user_name, file_name, position, key, value) for position, (key, value) in enumerate(data.items()))
+                )
+                entry_count += len(data)
+
+            # Transactions are imported in full, replacing any the database already had for the user
+            transactions = text_storage.read_transactions(user_name)
+            connection.execute("DELETE FROM transactions WHERE user_name = ?", (user_name,))
+            connection.execute("DELETE FROM transaction_rollups WHERE user_name = ?", (user_name,))
+            if transactions:
+                sqlite_storage.insert_transactions(connection, user_name, transactions)
+                transaction_count += len(transactions)
+
+            connection.execute("DELETE FROM transaction_keys WHERE user_name = ?", (user_name,))
+            connection.executemany(
+                "INSERT OR IGNORE INTO transaction_keys (user_name, key) VALUES (?, ?)",
+                ((user_name, key) for key in text_storage.iterate_transaction_keys(user_name))
+            )
+
+            # Monthly history rows, a row cut off part way through being written is left out
+            history_path = os.path.join(user_folder, HISTORY_FILE_NAME)
+            if os.path.exists(history_path):
+                with open(history_path, "rb") as file:
+                    history = file.read()
+                history = history[:len(history) - len(history) % HISTORY_ROW.size]
+                connection.execute("DELETE FROM history WHERE user_name = ?", (user_name,))
+                connection.executemany(
+                    "INSERT INTO history (user_name, month, net_income, expenses, credits, investments) VALUES (?, ?, ?, ?, ?, ?)",
+                    ((user_name, *row) for row in HISTORY_ROW.iter_unpack(history))
+                )
+
+            # Don't keep every users files in memory until the migration ends
+            text_storage.forget_user(user_name)
+
+    print(f"Migrated {len(users)} users, {len(user_names)} user folders, {entry_count} entries and "
+          f"{transaction_count} transactions into {database_path}.")
+
+
+# ------------------ General functions ------------------ #
+
+# Function to read data from a text file for a specific user and file
+@timed("storage.read_from_file")
+def read_from_file(user_name, file_name, create=False):
+    return get_storage().read(user_name, file_name, create)
+
+
+# Function to write data to a text file
+@timed("storage.write_to_file")
+def write_to_file(folder, file_name, data):
+    user_name = get_user_from_folder(folder)
+    unchanged_elsewhere = get_storage().write(user_name, file_name, data)
+
+    # Keep the totals of money files next to them so balances can be shown without reading every value
+    # (when another session's changes were merged in, the totals are worked out from the file when next needed)
+    if file_name in MONEY_FILES and unchanged_elsewhere:
+        get_storage().write_aggregates(user_name, file_name, get_money_aggregates(data, file_name))
+
+
+# Function to get the total, count, minimum and maximum (in cents) of a users money file
+# Uses the saved aggregates when they are up to date, otherwise adds up the file
+def read_section_aggregates(user_name, file_name):
+    aggregates = get_storage().read_aggregates(user_name, file_name)
+    if aggregates is None:
+        aggregates = get_money_aggregates(read_from_file(user_name, file_name), file_name)
+    return aggregates
+
+
+# Function to write user credentials to a text file
+@timed("storage.write_user_credentials_to_file")
+def write_user_credentials_to_file(folder, username, password):
+    get_storage().add_user(username, password)
+
+
+# Function to find the password of a registered user (None if the username is not registered)
+@timed("storage.find_user_password")
+def find_user_password(username):
+    return get_storage().get_password(username)
+
+
+# Function to register many users at once from (username, password) pairs
+# Usernames that are already registered or repeated are skipped, returns the usernames that were added
+def provision_users(users):
+    storage = get_storage()
+    new_users = {}
+
+    for username, password in users:
+        if username in new_users or storage.get_password(username) is not None:
+            print(f"Skipping '{username}': username already exists.")
+            continue
+        new_users[username] = password
+
+    storage.add_users(list(new_users.items()))
+    storage.create_user_files(list(new_users))
+
+    return list(new_users)
+
+
+# Function to register every user listed in a CSV file of 'username,password' rows (a header row is optional)
+def provision_users_from_file(file_path):
+    with open(file_path, "r", newline="") as file:
+        rows = [row for row in csv.reader(file) if row]
+
+    if rows and [value.strip().lower() for value in rows[0]] == ["username", "password"]:
+        rows = rows[1:]
+
+    users = []
+    for line_number, row in enumerate(rows, start=1):
+        if len(row) != 2 or not row[0].strip():
+            print(f"Skipping row {line_number}: expected 'username,password'.")
+            continue
+        users.append((row[0].strip(), row[1]))
+
+    added = provision_users(users)
+    print(f"Registered {len(added)} of {len(users)} users.")
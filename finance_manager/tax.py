@@ -0,0 +1,134 @@
+import os
+import json
+import threading
+import collections
+
+import numpy as np
+
+
+# ------------------ Tax functions ------------------ #
+
+# - Tax tables -
+
+# Folder of tax tables, one '<tax year>.json' file per tax year
+TAX_TABLES_FOLDER = os.environ.get(
+    "FINANCE_MANAGER_TAX_TABLES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "tax_tables")
+)
+
+# Tax year used when none is given (defaults to the newest tax table)
+DEFAULT_TAX_YEAR = os.environ.get("FINANCE_MANAGER_TAX_YEAR")
+
+# Compiled tax table, limits are annual income maximums and extra tax is the monthly amount per bracket
+TaxTable = collections.namedtuple(
+    "TaxTable",
+    ["tax_year", "average_hours", "months_per_year", "uif", "limits", "percentages", "extra_tax"]
+)
+
+tax_tables = {}
+tax_tables_lock = threading.Lock()
+
+
+# Function to list the tax years that have a tax table
+def list_tax_years():
+    if not os.path.isdir(TAX_TABLES_FOLDER):
+        return []
+    return sorted(file_name[:-5] for file_name in os.listdir(TAX_TABLES_FOLDER) if file_name.endswith(".json"))
+
+
+# Function to read a tax table file into read-only arrays
+def compile_tax_table(tax_year):
+    file_path = os.path.join(TAX_TABLES_FOLDER, f"{tax_year}.json")
+
+    if not os.path.exists(file_path):
+        raise ValueError(f"There is no tax table for the {tax_year} tax year. Available tax years: {', '.join(list_tax_years())}")
+
+    with open(file_path, "r") as file:
+        table = json.load(file)
+
+    brackets = table["brackets"]
+    columns = []
+    for field in ("limit", "percentage", "extra_tax"):
+        column = np.array([bracket[field] for bracket in brackets], dtype=np.float64)
+        column.flags.writeable = False
+        columns.append(column)
+
+    return TaxTable(str(tax_year), table["average_hours"], table["months_per_year"], table["uif"], *columns)
+
+
+# Function to get the compiled tax table of a tax year, each table is only read once per process
+def get_tax_table(tax_year=None):
+    if tax_year is None:
+        tax_year = DEFAULT_TAX_YEAR or max(list_tax_years(), default=None)
+
+    tax_year = str(tax_year)
+    table = tax_tables.get(tax_year)
+
+    if table is None:
+        with tax_tables_lock:
+            table = tax_tables.get(tax_year)
+            if table is None:
+                table = compile_tax_table(tax_year)
+                tax_tables[tax_year] = table
+
+    return table
+
+
+# Function to round an array to cents exactly like round(value, 2) does
+def round_cents(values):
+    rounded = np.round(values, 2)
+
+    # np.round can round the other way on values that land exactly on half a cent once scaled, so those use round()
+    scaled = values * 100
+    ties = np.flatnonzero(scaled - np.floor(scaled) == 0.5)
+    for index in ties:
+        rounded.flat[index] = round(float(values.flat[index]), 2)
+
+    return rounded
+
+
+# Function to calculate the monthly income, tax, UIF and net income of many people at once
+# 'worked' and 'double_worked' are days when 'by_days' is True (multiplied by 'hours_per_day') and hours otherwise
+# 'works_sundays' is True for people generally scheduled on Sundays/public holidays (1.5 pay instead of double pay)
+# Returns arrays of gross income, income tax, income less tax, UIF deduction and total net income
+def calculate_income_batch(hourly_rates, worked, double_worked, by_days=False, hours_per_day=1, works_sundays=False, tax_year=None):
+
+    tax_table = get_tax_table(tax_year)
+
+    hourly_rates = np.asarray(hourly_rates, dtype=np.float64)
+    worked = np.asarray(worked, dtype=np.float64)
+    double_worked = np.asarray(double_worked, dtype=np.float64)
+    by_days = np.asarray(by_days, dtype=bool)
+    hours_per_day = np.asarray(hours_per_day, dtype=np.float64)
+
+    # Value is the extra amount: 1 and a half pay for people scheduled on Sundays, double pay otherwise
+    double_day_percentage = np.where(np.asarray(works_sundays, dtype=bool), 0.5, 1.0)
+
+    # - Income calculations - (Adding only additional for double hours as all hours are included already)
+    paid_hours_per_day = np.where(by_days, hours_per_day, 1.0)
+    total_hours = paid_hours_per_day * worked
+    income = hourly_rates * total_hours + (double_worked * hourly_rates * paid_hours_per_day * double_day_percentage)
+
+    average_annual_income = hourly_rates * tax_table.average_hours * tax_table.months_per_year
+
+    # - Tax bracket calculations -
+
+    # First bracket whose maximum is at or above the annual income, annual incomes above every bracket are not taxed
+    bracket = np.searchsorted(tax_table.limits, average_annual_income, side="left")
+    in_bracket = bracket < len(tax_table.limits)
+    bracket = np.minimum(bracket, len(tax_table.limits) - 1)
+
+    previous_limit = np.where(bracket == 0, 0, tax_table.limits[bracket - 1])
+    percent = tax_table.percentages[bracket]
+    extra_tax = np.where(bracket == 0, 0, tax_table.extra_tax[bracket])
+
+    taxable_percentage_amount = income - previous_limit
+    Income_Less_Tax = np.where(in_bracket, income - (taxable_percentage_amount * percent) - extra_tax, 0)
+    Income_TAX = np.where(in_bracket, round_cents(income * percent), 0)
+
+    # Results
+
+    UIF_deduction = income * tax_table.uif
+    TOTAl_NET_INCOME = Income_Less_Tax - UIF_deduction  # UIF calculated on gross income not net.
+
+    return income, Income_TAX, Income_Less_Tax, UIF_deduction, TOTAl_NET_INCOME
@@ -0,0 +1,86 @@
+import time
+
+from finance_manager.metrics import timed
+from finance_manager.money import to_cents
+from finance_manager.storage import get_storage
+
+
+# ------------------ Transactions ------------------ #
+
+# What a transaction was for, and the name its totals are reported under
+TRANSACTION_KINDS = {
+    "expense": "expenses",
+    "income": "income",
+    "credit": "credits",
+    "investment": "investments"
+}
+
+# Whether each kind adds to or takes from the remaining balance, the same way as the net position
+TRANSACTION_SIGNS = {"expense": -1, "income": 1, "credit": 1, "investment": -1}
+
+# Category of transactions that haven't been given one
+UNCATEGORIZED = "Uncategorized"
+
+
+# Function to get the current month as 'YYYY-MM'
+def get_current_month():
+    return time.strftime("%Y-%m")
+
+
+# Function to check a month typed as 'YYYY-MM', returns it with a two digit month (raises ValueError if it isn't one)
+def parse_month(text):
+    return time.strftime("%Y-%m", time.strptime(text.strip(), "%Y-%m"))
+
+
+# Function to build a transaction (date, category, amount in cents, memo, kind) from what the user typed
+# Raises ValueError for a date that isn't 'YYYY-MM-DD', an amount that isn't a number or an unknown kind
+def make_transaction(date, category, amount, memo="", kind="expense"):
+    date = time.strftime("%Y-%m-%d", time.strptime(date.strip(), "%Y-%m-%d"))
+
+    if kind not in TRANSACTION_KINDS:
+        raise ValueError(f"Unknown kind '{kind}'. Use one of: {', '.join(TRANSACTION_KINDS)}.")
+
+    # Each transaction is one line of the transactions file, so line breaks are taken out
+    category = " ".join(str(category).split()) or UNCATEGORIZED
+    memo = " ".join(str(memo).split())
+
+    return (date, category, to_cents(amount), memo, kind)
+
+
+# Function to add transactions to a users ledger, the monthly rollups are updated in the same write
+@timed("transactions.add_transactions")
+def add_transactions(user_name, transactions):
+    if transactions:
+        get_storage().append_transactions(user_name, list(transactions))
+
+
+# Function to read a users transactions, only those of 'month' ('YYYY-MM') if given
+@timed("transactions.read_transactions")
+def read_transactions(user_name, month=None):
+    return get_storage().read_transactions(user_name, month)
+
+
+# Function to read the rollups of one month: {kind: {category: [total in cents, number of transactions]}}
+@timed("transactions.read_month_rollup")
+def read_month_rollup(user_name, month=None):
+    month = month or get_current_month()
+    return get_storage().read_rollups(user_name, month).get(month, {})
+
+
+# Function to read the rollups of every month: {month: {kind: {category: [total in cents, count]}}}
+@timed("transactions.read_rollups")
+def read_rollups(user_name):
+    return get_storage().read_rollups(user_name)
+
+
+# Function to add up a months rollups per kind, in cents
+def get_kind_totals(month_rollup):
+    return {
+        kind: sum(total_cents for total_cents, count in month_rollup.get(kind, {}).values())
+        for kind in TRANSACTION_KINDS
+    }
+
+
+# Function to work out what a months transactions add to (or take from) the remaining balance, in cents
+def get_net_cents(month_rollup):
+    return sum(TRANSACTION_SIGNS[kind] * total_cents for kind, total_cents in get_kind_totals(month_rollup).items())
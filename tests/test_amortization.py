@@ -0,0 +1,73 @@
+import pytest
+
+from finance_manager.amortization import build_schedules, iterate_schedule, iterate_schedule_pages
+
+
+LOANS = [
+    (250000, 11.5, 72, "monthly"),
+    (1500000, 10.75, 360, "weekly"),
+    (1200, 0, 12, "monthly"),
+    (5000, 20, 7, "quarterly"),
+    (100, 5, 1, "yearly")
+]
+
+
+# Function to work out a schedule one payment at a time with the usual loan formulas, to check the engine against
+def plain_schedule(principal, rate, payment_count, periods_per_year):
+    period_rate = rate / 100 / periods_per_year
+    payment = principal / payment_count if period_rate == 0 else principal * period_rate / (1 - (1 + period_rate) ** -payment_count)
+
+    balance = principal
+    for paid in range(1, payment_count + 1):
+        interest = balance * period_rate
+        repaid = balance if paid == payment_count else payment - interest
+        balance -= repaid
+        yield interest + repaid, interest, repaid, max(balance, 0)
+
+
+# The schedules of many loans built at once match each loan gone through a payment at a time
+def test_build_schedules_matches_iterate_schedule():
+    payments, interest, repaid, balances = build_schedules(*zip(*LOANS))
+
+    for index, loan in enumerate(LOANS):
+        rows = list(iterate_schedule(*loan))
+        count = len(rows)
+
+        assert [row[1] for row in rows] == payments[index, :count].tolist()
+        assert [row[2] for row in rows] == interest[index, :count].tolist()
+        assert [row[3] for row in rows] == repaid[index, :count].tolist()
+        assert [row[4] for row in rows] == balances[index, :count].tolist()
+
+        # Nothing is paid once a loan is paid off
+        assert not payments[index, count:].any() and not balances[index, count:].any()
+
+
+# A page of a schedule is the same as that part of the whole schedule
+def test_build_schedules_page():
+    payments, interest, repaid, balances = build_schedules([1500000], [10.75], [360], ["weekly"])
+    page = build_schedules([1500000], [10.75], [360], ["weekly"], first=1001, last=1024)
+
+    assert page[0].tolist() == payments[:, 1000:1024].tolist()
+    assert page[3].tolist() == balances[:, 1000:1024].tolist()
+
+
+# Each payment agrees with the usual loan formulas, and the loan is paid off in full
+@pytest.mark.parametrize("loan", LOANS)
+def test_schedule_matches_loan_formulas(loan):
+    rows = list(iterate_schedule(*loan))
+    periods_per_year = {"weekly": 52, "monthly": 12, "quarterly": 4, "yearly": 1}[loan[3]]
+    expected = list(plain_schedule(loan[0], loan[1], len(rows), periods_per_year))
+
+    for row, (payment, interest, repaid, balance) in zip(rows, expected):
+        assert row[1:] == pytest.approx((payment, interest, repaid, balance), abs=0.01)
+    assert rows[-1][4] == 0
+    assert sum(row[3] for row in rows) == pytest.approx(loan[0], abs=0.01 * len(rows))
+
+
+# Pages cover every payment in order
+def test_schedule_pages():
+    pages = list(iterate_schedule_pages("car", 250000, 11.5, 72, "monthly", page_size=24))
+
+    assert [len(page["rows"]) for page in pages] == [24, 24, 24]
+    assert [row["name"] for page in pages for row in page["rows"]] == [str(paid) for paid in range(1, 73)]
+    assert pages[-1]["rows"][-1]["balance"] == 0
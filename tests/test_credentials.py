@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from finance_manager.credentials import CredentialIndex
+
+
+@pytest.fixture
+def users_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return "users.txt"
+
+
+# Function to open a credential index over users.txt, as each process does
+def open_index(users_path):
+    index = CredentialIndex(users_path, "users.idx")
+    index.open()
+    return index
+
+
+# Users added are found, unknown users aren't, and the latest line of a username wins
+def test_add_and_find_users(users_path):
+    index = open_index(users_path)
+    index.add_user("alice", "secret")
+    index.add_users([("bob", "hunter2"), ("alice", "changed")])
+
+    assert index.get_password("alice") == "changed"
+    assert index.get_password("bob") == "hunter2"
+    assert index.get_password("carol") is None
+    assert open(users_path).read() == "alice,secret\nbob,hunter2\nalice,changed\n"
+
+
+# The index grows past its first size and is still found after being opened again
+def test_index_grows(users_path):
+    index = open_index(users_path)
+    index.add_users([(f"user{number}", str(number)) for number in range(2000)])
+    index.add_user("last", "one")
+
+    assert index.capacity > CredentialIndex.minimum_slots
+    reopened = open_index(users_path)
+    assert all(reopened.get_password(f"user{number}") == str(number) for number in range(0, 2000, 97))
+    assert reopened.get_password("last") == "one"
+
+
+# An existing users.txt is indexed when opened, and lines appended outside the program are picked up
+def test_lines_added_outside_the_program(users_path):
+    with open(users_path, "w") as users_file:
+        users_file.write("alice,secret\n")
+
+    index = open_index(users_path)
+    assert index.get_password("alice") == "secret"
+
+    with open(users_path, "a") as users_file:
+        users_file.write("bob,hunter2\ncarol,half")
+
+    assert index.get_password("bob") == "hunter2"
+    assert index.get_password("carol") is None  # Still being written
+
+
+# Users added through one index are found through another (another process)
+def test_indexes_share_users(users_path):
+    first = open_index(users_path)
+    second = open_index(users_path)
+
+    first.add_user("alice", "secret")
+    second.add_user("bob", "hunter2")
+
+    assert second.get_password("alice") == "secret"
+    assert first.get_password("bob") == "hunter2"
+
+
+# A users.txt replaced by a new file (e.g. restored from a backup) is read from then on
+def test_users_file_replaced(users_path):
+    first = open_index(users_path)
+    second = open_index(users_path)
+    first.add_user("alice", "secret")
+    assert second.get_password("alice") == "secret"
+
+    with open("restored.txt", "w") as restored:
+        restored.write("zed,1\n")
+    os.replace("restored.txt", users_path)
+
+    assert first.get_password("zed") == "1"
+    assert first.get_password("alice") is None
+    assert second.get_password("zed") == "1"
+    assert second.get_password("alice") is None
+
+    second.add_user("amy", "2")
+    assert first.get_password("amy") == "2"
+    assert open(users_path).read() == "zed,1\namy,2\n"
+
+
+# A users.txt rewritten shorter than what was indexed is indexed again from the start
+def test_users_file_truncated(users_path):
+    index = open_index(users_path)
+    index.add_users([("alice", "secret"), ("bob", "hunter2")])
+
+    with open(users_path, "r+") as users_file:
+        users_file.truncate(0)
+        users_file.write("bob,new\n")
+
+    assert index.get_password("bob") == "new"
+    assert index.get_password("alice") is None
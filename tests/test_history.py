@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from finance_manager import storage
+from finance_manager.history import build_history_report, read_history, record_month
+
+
+@pytest.fixture(params=["text", "sqlite"])
+def engine(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    storage.created_user_folders.clear()
+    storage.configure_storage(request.param)
+    return request.param
+
+
+# A month's row is replaced by later saves in the same month, earlier months can't change
+def test_record_month(engine):
+    record_month("erin", 1000, 200, 0, 100, month=24312)
+    record_month("erin", 1000, 300, 0, 100, month=24312)
+    record_month("erin", 2000, 400, 0, 100, month=24313)
+    record_month("erin", 9999, 999, 0, 999, month=24312)
+
+    history = read_history("erin")
+    assert history["month"].tolist() == [24312, 24313]
+    assert history["expenses"].tolist() == [300, 400]
+
+    report = build_history_report("erin", months=10 ** 6)
+    assert [month["name"] for month in report["months"]] == ["2026-01", "2026-02"]
+
+
+# Only the text engine keeps a history file, and replacing its last row never makes it shorter
+def test_history_file(engine):
+    record_month("erin", 1000, 200, 0, 100, month=24312)
+    history_path = os.path.join("data", "Users", "erin", storage.HISTORY_FILE_NAME)
+
+    if engine == "sqlite":
+        assert not os.path.exists(history_path)
+        return
+
+    mapped = read_history("erin")
+    record_month("erin", 1000, 250, 0, 100, month=24312)
+    assert os.path.getsize(history_path) == storage.HISTORY_ROW.size
+    assert mapped["expenses"].tolist() == [250]
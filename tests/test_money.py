@@ -0,0 +1,97 @@
+from finance_manager.money import MoneySection, get_money_aggregates, parse_ledger_section
+
+
+# Function to work the aggregates out again from the amounts a section holds, to check the running ones against
+def scanned_aggregates(section):
+    return get_money_aggregates({name: value for name, value in section.items() if name not in section.skipped})
+
+
+# The section acts like the dictionary of rand amounts it replaces, keeping them as cents
+def test_money_section_acts_like_a_dictionary():
+    section = MoneySection({"rent": "5000", "car": 1999.999, "gym": "300.10"})
+
+    assert list(section) == ["rent", "car", "gym"]
+    assert section["car"] == 2000.0
+    assert section.get_cents("gym") == 30010
+    assert dict(section) == {"rent": 5000.0, "car": 2000.0, "gym": 300.1}
+
+    section["rent"] = 5500
+    section["phone"] = 450
+    del section["car"]
+    assert list(section.items()) == [("rent", 5500.0), ("gym", 300.1), ("phone", 450.0)]
+    assert "car" not in section and len(section) == 3
+
+
+# The running total, count, minimum and maximum follow every change, as if worked out again each time
+def test_running_aggregates():
+    section = MoneySection({"rent": 5000, "car": 2000, "gym": 300})
+    changes = [
+        ("set", "phone", 450), ("set", "gym", 100), ("del", "gym", None), ("set", "rent", 50),
+        ("del", "rent", None), ("set", "car", 9000), ("del", "car", None), ("del", "phone", None),
+        ("set", "rent", 75)
+    ]
+
+    assert section.get_aggregates() == scanned_aggregates(section)
+    for change, name, value in changes:
+        if change == "set":
+            section[name] = value
+        else:
+            del section[name]
+        assert section.get_aggregates() == scanned_aggregates(section)
+
+    assert section.get_aggregates() == {"total_cents": 7500, "count": 1, "min_cents": 7500, "max_cents": 7500}
+
+
+# An empty section has no minimum or maximum
+def test_empty_aggregates():
+    section = MoneySection({"rent": 5000})
+    del section["rent"]
+
+    assert section.get_aggregates() == {"total_cents": 0, "count": 0, "min_cents": None, "max_cents": None}
+
+
+# The investment calculators budget is kept but left out of its aggregates
+def test_skipped_names():
+    section = parse_ledger_section("investment_calculator.txt", {"total_budget": "10000", "shares": "2500", "bonds": "500"})
+
+    assert section["total_budget"] == 10000.0
+    assert section.get_aggregates() == {"total_cents": 300000, "count": 2, "min_cents": 50000, "max_cents": 250000}
+
+    section["total_budget"] = 1
+    del section["bonds"]
+    assert section.get_aggregates() == {"total_cents": 250000, "count": 1, "min_cents": 250000, "max_cents": 250000}
+
+
+# Removed names leave gaps that are closed once they are half of the section, keeping the order of the others
+def test_gap_compaction():
+    section = MoneySection({f"item {number}": number for number in range(10)})
+
+    for number in range(0, 10, 2):
+        del section[f"item {number}"]
+    assert section.gaps == 5 and len(section.names) == 10
+
+    del section["item 1"]
+    assert section.gaps == 0
+    assert section.names == ["item 3", "item 5", "item 7", "item 9"]
+    assert [section.positions[name] for name in section.names] == [0, 1, 2, 3]
+    assert list(section.items_cents()) == [("item 3", 300), ("item 5", 500), ("item 7", 700), ("item 9", 900)]
+
+    # Names added after compaction go to the end and can be changed and removed as usual
+    section["item 1"] = 1
+    section["item 5"] = 55
+    del section["item 3"]
+    assert dict(section) == {"item 5": 55.0, "item 7": 7.0, "item 9": 9.0, "item 1": 1.0}
+    assert section.get_aggregates() == scanned_aggregates(section)
+
+
+# A copy has no gaps and doesn't change with the original
+def test_copy():
+    section = MoneySection({"rent": 5000, "car": 2000, "gym": 300})
+    del section["car"]
+
+    copy = section.copy()
+    section["rent"] = 1
+
+    assert copy.names == ["rent", "gym"]
+    assert dict(copy) == {"rent": 5000.0, "gym": 300.0}
+    assert copy.get_aggregates() == {"total_cents": 530000, "count": 2, "min_cents": 30000, "max_cents": 500000}
@@ -0,0 +1,76 @@
+import pytest
+
+from finance_manager import storage
+from finance_manager.statements import import_statements
+
+
+JANUARY = """Date,Description,Amount
+05/01/2026,Coffee Shop,-35.00
+05/01/2026,Coffee Shop,-35.00
+20/01/2026,Woolworths,-120.50
+31/01/2026,Salary,25000.00
+"""
+
+JANUARY_FEBRUARY = """Date,Description,Amount
+05/01/2026,Coffee Shop,-35.00
+05/01/2026,Coffee Shop,-35.00
+20/01/2026,Woolworths,-120.50
+31/01/2026,Salary,25000.00
+03/02/2026,Coffee Shop,-35.00
+14/02/2026,Florist,-300.00
+"""
+
+
+@pytest.fixture(params=["text", "sqlite"])
+def engine(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    storage.created_user_folders.clear()
+    storage.configure_storage(request.param)
+    return request.param
+
+
+# Overlapping statements imported in one call only add each transaction once, the same on both engines
+def test_overlapping_statements_in_one_import(engine, tmp_path):
+    (tmp_path / "jan.csv").write_text(JANUARY)
+    (tmp_path / "janfeb.csv").write_text(JANUARY_FEBRUARY)
+
+    assert import_statements("dave", ["jan.csv", "janfeb.csv"]) == (6, 4, 0)
+    assert len(storage.get_storage().read_transactions("dave")) == 6
+
+    # Both coffees of the same day are kept, and importing again adds nothing
+    assert import_statements("dave", ["janfeb.csv"]) == (0, 6, 0)
+    rollups = storage.get_storage().read_rollups("dave")
+    assert rollups["2026-01"]["expense"]["Uncategorized"] == [19050, 3]
+    assert rollups["2026-02"]["expense"]["Uncategorized"] == [33500, 2]
+
+
+# A repeat that comes back after another date in a statement that isn't sorted by date is still added
+def test_unsorted_statement_keeps_repeats(engine, tmp_path):
+    (tmp_path / "unsorted.csv").write_text(
+        "Date,Description,Amount\n"
+        "05/01/2026,Coffee Shop,-35.00\n"
+        "20/01/2026,Woolworths,-120.50\n"
+        "05/01/2026,Coffee Shop,-35.00\n"
+    )
+
+    assert import_statements("dave", ["unsorted.csv"]) == (3, 0, 0)
+    assert import_statements("dave", ["unsorted.csv"]) == (0, 3, 0)
+
+
+# Keys are found on disk across merges of the sorted keys file, and files of unsorted keys are converted
+def test_transaction_key_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "KEY_MERGE_SIZE", 7)
+    (tmp_path / storage.UNSORTED_TRANSACTION_KEYS_FILE_NAME).write_text("ffffffffffffffff\n0000000000000000\n")
+
+    keys = storage.TransactionKeyIndex(str(tmp_path))
+    added = [f"{number * 7919:016x}" for number in range(1, 51)]
+    for key in added:
+        assert key not in keys
+        keys.add(key)
+    keys.merge()
+
+    assert all(key in keys for key in added + ["ffffffffffffffff", "0000000000000000"])
+    assert "0123456789abcdef" not in keys
+    assert list(keys.iterate()) == sorted(set(added) | {"ffffffffffffffff", "0000000000000000"})
+    assert not (tmp_path / storage.UNSORTED_TRANSACTION_KEYS_FILE_NAME).exists()
+    keys.close()
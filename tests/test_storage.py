@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from finance_manager import storage
+
+
+@pytest.fixture
+def text_storage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    storage.created_user_folders.clear()
+    return storage.configure_storage("text")
+
+
+# Function to get the path of one of a users files
+def user_file(user_name, file_name):
+    return os.path.join("data", "Users", user_name, file_name)
+
+
+# Changes are appended to the journal, and reading replays the journal over the checkpoint
+def test_changes_go_to_the_journal(text_storage):
+    text_storage.write("fay", "credits.txt", {"rent": 5000, "car": 2000})
+    text_storage.write("fay", "credits.txt", {"rent": 5500, "car": 2000, "gym": 300})
+    text_storage.write("fay", "credits.txt", {"rent": 5500, "gym": 300})
+
+    assert not os.path.exists(user_file("fay", "credits.txt"))
+    assert open(user_file("fay", "credits.txt.journal")).read() == (
+        "+rent,5000\n+car,2000\n+rent,5500\n+gym,300\n-car\n"
+    )
+
+    text_storage.forget_user("fay")
+    assert text_storage.read("fay", "credits.txt") == {"rent": "5500", "gym": "300"}
+
+
+# Reordering keys can't be journalled, so the checkpoint is rewritten and the journal starts again
+def test_reordered_keys_rewrite_the_checkpoint(text_storage):
+    text_storage.write("fay", "credits.txt", {"rent": 5000, "car": 2000})
+    text_storage.write("fay", "credits.txt", {"car": 2000, "rent": 5000})
+
+    assert open(user_file("fay", "credits.txt")).read() == "car,2000\nrent,5000\n"
+    assert not os.path.exists(user_file("fay", "credits.txt.journal"))
+
+
+# A record cut off part way through being written is ignored
+def test_partial_journal_record_is_ignored(text_storage):
+    text_storage.write("fay", "credits.txt", {"rent": 5000})
+    with open(user_file("fay", "credits.txt.journal"), "a") as journal:
+        journal.write("+car,2000\n+gym,3")
+
+    assert text_storage.read("fay", "credits.txt") == {"rent": "5000", "car": "2000"}
+
+
+# Two sessions that each changed different keys keep both changes, and the second writer is told about the merge
+def test_sessions_changes_are_merged(text_storage):
+    text_storage.write("fay", "credits.txt", {"rent": 5000, "car": 2000})
+
+    other_session = storage.TextStorage()
+    other_data = other_session.read("fay", "credits.txt")
+
+    assert text_storage.write("fay", "credits.txt", {"rent": 5500, "car": 2000})
+    assert not other_session.write("fay", "credits.txt", {**other_data, "gym": "300"})
+
+    # Even a rewritten checkpoint keeps the other sessions change
+    assert not other_session.write("fay", "credits.txt", {"gym": "300", "rent": "5000", "car": "2000"})
+
+    text_storage.forget_user("fay")
+    assert text_storage.read("fay", "credits.txt") == {"gym": "300", "rent": "5500", "car": "2000"}
+
+
+# A journal over the size limit is folded back into the checkpoint, keeping aggregates that were up to date
+def test_journal_compaction(text_storage, monkeypatch):
+    monkeypatch.setattr(storage, "JOURNAL_COMPACTION_BYTES", 50)
+    started = []
+    monkeypatch.setattr(text_storage, "start_compaction", lambda *arguments: started.append(arguments))
+
+    data = {"rent": 5000}
+    text_storage.write("fay", "credits.txt", data)
+    for amount in range(1, 6):
+        data[f"loan {amount}"] = amount * 100
+        text_storage.write("fay", "credits.txt", data)
+
+    assert started == [("fay", "credits.txt")] * 2
+    text_storage.write_aggregates("fay", "credits.txt", {"total_cents": 1, "count": 1, "min_cents": 1, "max_cents": 1})
+
+    text_storage.compact("fay", "credits.txt")
+
+    assert not os.path.exists(user_file("fay", "credits.txt.journal"))
+    assert open(user_file("fay", "credits.txt")).read().splitlines() == [f"{key},{value}" for key, value in data.items()]
+    assert text_storage.read_aggregates("fay", "credits.txt") == {
+        "total_cents": 650000, "count": 6, "min_cents": 10000, "max_cents": 500000
+    }
+
+    # Writing after compaction journals against the new checkpoint
+    data["rent"] = 6000
+    text_storage.write("fay", "credits.txt", data)
+    assert open(user_file("fay", "credits.txt.journal")).read() == "+rent,6000\n"
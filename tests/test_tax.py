@@ -0,0 +1,70 @@
+import pytest
+
+from finance_manager.tax import calculate_income_batch
+
+
+# Tax brackets of the original income calculator: annual income maximum, percentage and monthly extra tax
+TAX_BRACKETS = [
+    (237100, 0.18, 0),
+    (370500, 0.26, 3556.50),
+    (512800, 0.31, 6446.83),
+    (673000, 0.36, 10122.92),
+    (857900, 0.39, 14928.92),
+    (1817000, 0.41, 20938.17),
+    (1817001, 0.45, 53707.42)
+]
+
+
+# Function to work out one persons income the way the original income calculator did
+def original_income(hourly_rate, worked, double_worked, by_days, hours_per_day, works_sundays):
+    double_day_percentage = 0.5 if works_sundays else 1.0
+
+    if by_days:
+        total_hours = hours_per_day * worked
+        income = hourly_rate * total_hours + (double_worked * hourly_rate * hours_per_day * double_day_percentage)
+    else:
+        income = hourly_rate * worked + (double_worked * hourly_rate * double_day_percentage)
+
+    average_annual_income = hourly_rate * 176 * 12
+
+    Income_TAX = 0
+    Income_Less_Tax = 0
+    for i, (bracket, percent, extra_tax) in enumerate(TAX_BRACKETS):
+        if average_annual_income <= bracket:
+            taxable_percentage_amount = income - (0 if i == 0 else TAX_BRACKETS[i - 1][0])
+            Income_Less_Tax = income - (taxable_percentage_amount * percent) - (extra_tax if i != 0 else 0)
+            Income_TAX = round(income * percent, 2)
+            break
+
+    UIF_deduction = income * 0.01
+    return income, Income_TAX, Income_Less_Tax, UIF_deduction, Income_Less_Tax - UIF_deduction
+
+
+# Hourly rates in every bracket, on the edges between brackets and above the last one
+HOURLY_RATES = [0, 50, 112.26, 112.27, 175.42, 242.8, 318.65, 406.2, 860.32, 860.33, 1000]
+
+PEOPLE = [
+    (rate, worked, double_worked, by_days, hours_per_day, works_sundays)
+    for rate in HOURLY_RATES
+    for worked, double_worked, by_days, hours_per_day in [(160, 8, False, 1), (21, 2, True, 8.5), (0, 0, True, 8)]
+    for works_sundays in (False, True)
+]
+
+
+# Everyone worked out at once gets the same figures as the original calculator worked out one at a time
+def test_calculate_income_batch_matches_original():
+    results = calculate_income_batch(*zip(*PEOPLE), tax_year="2025")
+
+    for index, person in enumerate(PEOPLE):
+        expected = original_income(*person)
+        assert [float(column[index]) for column in results] == pytest.approx(expected, abs=1e-9)
+
+        # Income tax is rounded to cents exactly like round() rounds it
+        assert float(results[1][index]) == expected[1]
+
+
+# A single person can be passed as plain numbers
+def test_calculate_income_batch_single_person():
+    income, Income_TAX, Income_Less_Tax, UIF_deduction, TOTAl_NET_INCOME = calculate_income_batch(150, 160, 8, tax_year="2025")
+
+    assert float(TOTAl_NET_INCOME) == pytest.approx(original_income(150, 160, 8, False, 1, False)[4])